@@ -0,0 +1,59 @@
+"""
+CPU spent per chat turn on building llm properties with and without the decrypted secret cache.
+
+Run from the backend folder:
+    python -m benchmarks.decrypt_secret --turns 50
+"""
+
+import argparse
+import time
+
+from src.auth.encrypt import encrypt_secret, secret_cache
+from src.schemas.ws.frontend import LLMPropertiesDecryptCreds
+
+
+def build_llm_props(encrypted_api_key: str) -> LLMPropertiesDecryptCreds:
+    # same properties as built by the frontend websocket handler on a chat turn
+    return LLMPropertiesDecryptCreds(
+        config_name="benchmark",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.7,
+        system_prompt="You are a helpful assistant",
+        user_prompt="",
+        credentials={"api_key": encrypted_api_key},
+        max_last_messages=5,
+    )
+
+
+def measure(turns: int, encrypted_api_key: str) -> float:
+    """Returns CPU seconds per turn."""
+    start = time.process_time()
+    for _ in range(turns):
+        build_llm_props(encrypted_api_key)
+    return (time.process_time() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    encrypted_api_key = encrypt_secret("sk-benchmark-api-key")
+
+    secret_cache.max_size = 0  # nothing is cached
+    uncached = measure(args.turns, encrypted_api_key)
+
+    secret_cache.max_size = 1024
+    secret_cache.clear()
+    cached = measure(args.turns, encrypted_api_key)
+
+    print(f"turns: {args.turns}")
+    print(f"uncached: {uncached * 1000:.3f}ms CPU per turn")
+    print(f"cached: {cached * 1000:.3f}ms CPU per turn")
+    print(f"saved: {(uncached - cached) * 1000:.3f}ms CPU per turn")
+    print(f"cache hits: {secret_cache.hits}, misses: {secret_cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,13 @@ from src.middleware.provider import ProviderLookupMiddleware
 from src.routes.api import api_router
 from src.routes.files.routes import files_router
 from src.routes.websocket import ws_router
+from src.utils.agent_log import AgentLogBuffer
+from src.utils.http_client import http_client
+from src.utils.invalidation import invalidation_bus
 from src.utils.jobs import run_startup_jobs
+from src.utils.log_subscriptions import LogSubscriptionHub
 from src.utils.message_handler_validator import message_handler_validator
+from src.utils.redis_client import redis_client
 from src.utils.setup_logger import init_logging
 
 init_logging()
@@ -51,7 +56,15 @@ async def lifespan(app: FastAPI):
         await run_startup_jobs()
 
         app.state.genai_session = session
-        app.state.frontend_ws = None
+        await invalidation_bus.start()
+
+        log_hub = LogSubscriptionHub()
+        app.state.log_hub = log_hub
+        await log_hub.start()
+
+        log_buffer = AgentLogBuffer(state=app.state)
+        app.state.log_buffer = log_buffer
+        await log_buffer.start()
 
         @session.bind()
         async def message_handler(
@@ -111,7 +124,15 @@ async def lifespan(app: FastAPI):
         yield
 
         events_task.cancel()
-        await events_task
+        try:
+            await events_task
+        finally:
+            # flush logs that are still buffered
+            await log_buffer.stop()
+            await log_hub.stop()
+            await invalidation_bus.stop()
+            await http_client.close()
+            await redis_client.close()
 
     except (asyncio.CancelledError, websockets.exceptions.ConnectionClosedError):
         pass
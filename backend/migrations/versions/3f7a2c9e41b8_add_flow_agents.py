@@ -0,0 +1,53 @@
+"""add flow_agents
+
+Revision ID: 3f7a2c9e41b8
+Revises: 8e2f4b61c0d7
+Create Date: 2026-10-19 16:21:48.512093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a2c9e41b8'
+down_revision: Union[str, None] = '8e2f4b61c0d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('flow_agents',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('flow_id', sa.UUID(), nullable=False),
+    sa.Column('agent_id', sa.UUID(), nullable=False),
+    sa.Column('agent_type', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['flow_id'], ['agentworkflows.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('flow_id', 'position', name='uq_flow_agent_position')
+    )
+    op.create_index(op.f('ix_flow_agents_flow_id'), 'flow_agents', ['flow_id'], unique=False)
+    op.create_index(op.f('ix_flow_agents_id'), 'flow_agents', ['id'], unique=False)
+    op.create_index('ix_flow_agents_agent_id_agent_type', 'flow_agents', ['agent_id', 'agent_type'], unique=False)
+
+    # backfill from the json arrays of existing flows, steps without a valid id or type are skipped
+    op.execute(
+        """
+        INSERT INTO flow_agents (flow_id, agent_id, agent_type, position)
+        SELECT f.id, (step.value ->> 'id')::uuid, step.value ->> 'type', step.ordinality - 1
+        FROM agentworkflows f
+        CROSS JOIN LATERAL json_array_elements(f.flow) WITH ORDINALITY AS step(value, ordinality)
+        WHERE step.value ->> 'type' IS NOT NULL
+          AND step.value ->> 'id' ~* '^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_flow_agents_agent_id_agent_type', table_name='flow_agents')
+    op.drop_index(op.f('ix_flow_agents_id'), table_name='flow_agents')
+    op.drop_index(op.f('ix_flow_agents_flow_id'), table_name='flow_agents')
+    op.drop_table('flow_agents')
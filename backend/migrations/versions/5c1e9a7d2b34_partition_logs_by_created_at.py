@@ -0,0 +1,115 @@
+"""partition logs by created_at
+
+Revision ID: 5c1e9a7d2b34
+Revises: bdf04422c056
+Create Date: 2026-10-19 10:12:41.318207
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d2b34'
+down_revision: Union[str, None] = 'bdf04422c056'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_INDEXES = ('agent_id', 'creator_id', 'id', 'request_id', 'session_id')
+# partitions created ahead of time, the backend keeps creating them afterwards
+PRECREATE_DAYS = 7
+
+
+def _drop_log_indexes(table_name: str) -> None:
+    for column in LOG_INDEXES:
+        op.drop_index(op.f(f'ix_logs_{column}'), table_name=table_name)
+
+
+def _create_log_indexes() -> None:
+    for column in LOG_INDEXES:
+        op.create_index(op.f(f'ix_logs_{column}'), 'logs', [column], unique=False)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # keep the old table and its id sequence aside, their names are reused by the partitioned table
+    op.rename_table('logs', 'logs_legacy')
+    op.execute('ALTER TABLE logs_legacy RENAME CONSTRAINT logs_pkey TO logs_legacy_pkey')
+    _drop_log_indexes('logs_legacy')
+
+    op.execute(
+        """
+        CREATE TABLE logs (
+            id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+            session_id UUID NOT NULL,
+            request_id UUID NOT NULL,
+            agent_id VARCHAR,
+            creator_id UUID REFERENCES users (id) ON DELETE CASCADE,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            message VARCHAR NOT NULL,
+            log_level VARCHAR NOT NULL,
+            CONSTRAINT logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE logs_id_seq OWNED BY logs.id')
+    _create_log_indexes()
+
+    today: date = conn.scalar(sa.text('SELECT CURRENT_DATE'))
+    days = set(
+        conn.scalars(
+            sa.text('SELECT DISTINCT created_at::date FROM logs_legacy')
+        ).all()
+    )
+    days.update(today + timedelta(days=offset) for offset in range(PRECREATE_DAYS + 1))
+    for day in sorted(days):
+        op.execute(
+            f"CREATE TABLE logs_p{day:%Y%m%d} PARTITION OF logs "
+            f"FOR VALUES FROM ('{day}') TO ('{day + timedelta(days=1)}')"
+        )
+
+    op.execute(
+        """
+        INSERT INTO logs (id, session_id, request_id, agent_id, creator_id, created_at, updated_at, message, log_level)
+        SELECT id, session_id, request_id, agent_id, creator_id, created_at, updated_at, message, log_level
+        FROM logs_legacy
+        """
+    )
+    op.drop_table('logs_legacy')
+
+
+def downgrade() -> None:
+    op.rename_table('logs', 'logs_partitioned')
+    op.execute('ALTER TABLE logs_partitioned RENAME CONSTRAINT logs_pkey TO logs_partitioned_pkey')
+    _drop_log_indexes('logs_partitioned')
+
+    op.create_table('logs',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('logs_id_seq')"), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('request_id', sa.UUID(), nullable=False),
+    sa.Column('agent_id', sa.String(), nullable=True),
+    sa.Column('creator_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('log_level', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('ALTER SEQUENCE logs_id_seq OWNED BY logs.id')
+    _create_log_indexes()
+
+    op.execute(
+        """
+        INSERT INTO logs (id, session_id, request_id, agent_id, creator_id, created_at, updated_at, message, log_level)
+        SELECT id, session_id, request_id, agent_id, creator_id, created_at, updated_at, message, log_level
+        FROM logs_partitioned
+        """
+    )
+    # drops all of the partitions as well
+    op.drop_table('logs_partitioned')
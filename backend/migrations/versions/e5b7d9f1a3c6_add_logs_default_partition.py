@@ -0,0 +1,27 @@
+"""add logs default partition
+
+Revision ID: e5b7d9f1a3c6
+Revises: d2f4a6c8e0b1
+Create Date: 2026-10-19 21:47:03.615902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7d9f1a3c6'
+down_revision: Union[str, None] = 'd2f4a6c8e0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # catches logs of days without a daily partition, e.g. when partition maintenance didn't run in time.
+    # maintenance moves them to daily partitions
+    op.execute('CREATE TABLE logs_default PARTITION OF logs DEFAULT')
+
+
+def downgrade() -> None:
+    op.execute('DROP TABLE logs_default')
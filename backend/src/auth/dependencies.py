@@ -1,4 +1,5 @@
-from typing import Annotated
+import secrets
+from typing import Annotated, Optional
 
 from pydantic import ValidationError
 
@@ -6,10 +7,13 @@ from src.schemas.api.agent.schemas import AgentJWTTokenPayload
 from src.models import User
 from src.db.session import AsyncDBSession
 from src.auth.jwt import validate_token, TokenLifespanType
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
+from src.core.settings import get_settings
 from fastapi.security import OAuth2PasswordBearer
 from src.repositories.user import user_repo
 
+settings = get_settings()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login/access-token")
 
 CREDENTIALS_EXCEPTION = HTTPException(
@@ -78,6 +82,19 @@ async def get_user_by_user_or_agent_token(
         )
 
 
+async def validate_master_be_api_key(
+    x_api_key: Annotated[Optional[str], Header(convert_underscores=True)] = None,
+):
+    """Authenticates internal requests of the master agent."""
+    if not x_api_key or not secrets.compare_digest(
+        x_api_key, settings.MASTER_BE_API_KEY
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Valid x-api-key header is required",
+        )
+
+
 CurrentUserDependency = Annotated[User, Depends(get_current_user)]
 CurrentUserByAgentOrUserTokenDependency = Annotated[
     User, Depends(get_user_by_user_or_agent_token)
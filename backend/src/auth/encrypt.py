@@ -1,15 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
 import cryptocode
 from src.core.settings import get_settings
 
 settings = get_settings()
 
 
+class DecryptedSecretCache:
+    """
+    TTL and size bounded LRU cache of decrypted secrets.
+
+    Decryption derives the key with scrypt on every call, which takes tens of milliseconds of CPU,
+    while the same provider api key is decrypted on every chat turn.
+    Entries are keyed by sha256 of the ciphertext, so the ciphertext itself is not kept in memory.
+    Plaintexts are stored as bytearrays and overwritten with zeros when evicted, expired or invalidated.
+    Strings handed out to callers are immutable python objects and are not zeroed.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bytearray]] = OrderedDict()
+        # decryption runs from sync code, which may be executed in a threadpool
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(encrypted_secret: str) -> str:
+        return hashlib.sha256(encrypted_secret.encode()).hexdigest()
+
+    def _evict(self, key: str):
+        _, secret = self._entries.pop(key)
+        secret[:] = bytes(len(secret))
+
+    def get(self, encrypted_secret: str) -> Optional[str]:
+        key = self._key(encrypted_secret)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                self.misses += 1
+                return None
+
+            expires_at, secret = entry
+            if expires_at <= time.monotonic():
+                self._evict(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return secret.decode()
+
+    def put(self, encrypted_secret: str, secret: str):
+        if self.max_size <= 0:
+            return
+        key = self._key(encrypted_secret)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (
+                time.monotonic() + self.ttl,
+                bytearray(secret.encode()),
+            )
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+
+    def invalidate(self, encrypted_secret: Optional[str]):
+        if not encrypted_secret:
+            return
+        key = self._key(encrypted_secret)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+
+secret_cache = DecryptedSecretCache(
+    ttl_seconds=settings.DECRYPTED_SECRET_CACHE_TTL_SECONDS,
+    max_size=settings.DECRYPTED_SECRET_CACHE_MAX_SIZE,
+)
+
+
 def encrypt_secret(secret: str) -> str:
     return cryptocode.encrypt(secret, settings.SECRET_KEY)
 
 
 def decrypt_secret(encrypted_secret: str) -> str:
+    if decrypted_secret := secret_cache.get(encrypted_secret):
+        return decrypted_secret
+
     decrypted_secret = cryptocode.decrypt(encrypted_secret, settings.SECRET_KEY)
     if not decrypted_secret:
         raise ValueError("Decryption failed. Invalid key or data.")
+
+    secret_cache.put(encrypted_secret, decrypted_secret)
     return decrypted_secret
@@ -17,8 +17,12 @@ celery_app = Celery(
 celery_app.conf.beat_schedule = {
     "run-periodic-task": {
         "task": "src.celery.tasks.singleton_mcp_a2a_lookup",
-        # schedule expects seconds
-        "schedule": settings.CELERY_BEAT_INTERVAL_MINUTES * 60,
+        # schedule expects seconds, only the servers that are due are probed on every tick
+        "schedule": settings.PROBE_SCHEDULER_TICK_SECONDS,
+    },
+    "log-partitions-maintenance": {
+        "task": "src.celery.tasks.singleton_log_partitions_maintenance",
+        "schedule": settings.LOG_PARTITIONS_MAINTENANCE_INTERVAL_MINUTES * 60,
     },
 }
 celery_app.conf.timezone = "UTC"
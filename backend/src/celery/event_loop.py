@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from logging import getLogger
+from typing import Any, Coroutine, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.core.settings import get_settings
+from src.db.session import async_session, create_pooled_engine
+from src.utils.http_client import http_client
+from src.utils.redis_client import redis_client
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+class WorkerEventLoop:
+    """
+    Long-lived event loop of a celery worker process, running in its own thread.
+
+    Tasks submit their coroutines to it instead of starting a new loop with `asyncio.run` on every run,
+    so db connections, the http connection pool and the redis client are reused between the runs.
+    `async_session` is rebound to a pooled engine when the loop starts,
+    sessions opened by the repositories in the worker reuse connections instead of reconnecting to postgres.
+    The loop is started lazily by the first task of the process, so it also works after the prefork pool forks.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=loop.run_forever, name="celery-event-loop", daemon=True
+            )
+            self._thread.start()
+
+            self._engine = create_pooled_engine(
+                pool_size=settings.CELERY_DB_POOL_SIZE,
+                max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+            )
+            async_session.configure(bind=self._engine)
+            self._loop = loop
+            logger.debug("Started worker event loop")
+            return loop
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run the coroutine on the worker loop and wait for its result."""
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _close_resources(self):
+        await http_client.close()
+        await redis_client.close()
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    self._close_resources(), self._loop
+                ).result(timeout=10)
+            except Exception:
+                logger.warning("Could not close resources of the worker event loop")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._engine = None
+
+
+worker_loop = WorkerEventLoop()
@@ -1,22 +1,41 @@
-import asyncio
 import logging
 
+from celery.signals import worker_process_shutdown
 from celery_singleton import Singleton
 from src.celery.celery_app import celery_app
-from src.utils.lookup_a2a_agent import lookup_a2a_agents
-from src.utils.lookup_mcp_server import lookup_mcp_servers
+from src.celery.event_loop import worker_loop
+from src.core.settings import get_settings
+from src.db.session import async_session
+from src.repositories.log import log_repo
+from src.utils.probe_scheduler import probe_scheduler
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 async def refresh_mcp_a2a_data():
-    tasks = [
-        asyncio.create_task(lookup_mcp_servers()),
-        asyncio.create_task(lookup_a2a_agents()),
-    ]
-    await asyncio.gather(*tasks)
+    await probe_scheduler.tick()
 
 
 @celery_app.task(base=Singleton, bind=True)
 def singleton_mcp_a2a_lookup(self):
-    asyncio.run(refresh_mcp_a2a_data())
+    worker_loop.run(refresh_mcp_a2a_data())
+
+
+async def maintain_log_partitions():
+    async with async_session() as db:
+        await log_repo.maintain_partitions(
+            db=db,
+            precreate_days=settings.LOG_PARTITIONS_PRECREATE_DAYS,
+            retention_days=settings.LOG_RETENTION_DAYS,
+        )
+
+
+@celery_app.task(base=Singleton, bind=True)
+def singleton_log_partitions_maintenance(self):
+    worker_loop.run(maintain_log_partitions())
+
+
+@worker_process_shutdown.connect
+def stop_worker_loop(*args, **kwargs):
+    worker_loop.stop()
@@ -3,6 +3,7 @@ from typing import Optional, Self
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from src.utils.enums import LogOverflowPolicy
 
 
 class Settings(BaseSettings):
@@ -27,8 +28,15 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = Field(default="postgres")
     POSTGRES_PORT: str = Field(default="5432")
     SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    # connection pool of the celery worker, which runs all of its tasks on one event loop
+    CELERY_DB_POOL_SIZE: int = Field(default=5)
+    CELERY_DB_MAX_OVERFLOW: int = Field(default=5)
 
     ROUTER_WS_URL: str = Field(default="ws://genai-router:8080/ws")
+    # messages of a single frontend websocket processed concurrently
+    FRONTEND_WS_MAX_IN_FLIGHT: int = Field(default=4)
+    # upper bound of staleness of per connection chat context, in case an invalidation was missed
+    SESSION_CONTEXT_CACHE_TTL_SECONDS: int = Field(default=300)
     MASTER_BE_API_KEY: str = Field(
         default="7a3fd399-3e48-46a0-ab7c-0eaf38020283::master_server_be"
     )
@@ -41,11 +49,55 @@ class Settings(BaseSettings):
 
     REDIS_BROKER_URI: str = Field(default="redis://genai-redis:6379/0")
     REDIS_BACKEND_URI: str = Field(default="redis://genai-redis:6379/0")
-
-    CELERY_BEAT_INTERVAL_MINUTES: int = Field(default=1)
+    # fan out of agent logs between backend replicas
+    REDIS_PUBSUB_URI: str = Field(default="redis://genai-redis:6379/0")
+
+    # mcp servers and a2a agents health probes, see ProbeScheduler
+    PROBE_SCHEDULER_TICK_SECONDS: int = Field(default=5)
+    PROBE_BASE_INTERVAL_SECONDS: int = Field(default=60)
+    PROBE_MAX_INTERVAL_SECONDS: int = Field(default=1800)
+    PROBE_FLAPPING_INTERVAL_SECONDS: int = Field(default=15)
+    PROBE_JITTER_RATIO: float = Field(default=0.2)
+    PROBE_MAX_CONCURRENCY: int = Field(default=16)
+    PROBE_MAX_PER_TICK: int = Field(default=256)
+    # progress of an interrupted mcp tool sync is kept this long to resume from the last cursor
+    MCP_TOOL_SYNC_PROGRESS_TTL_SECONDS: int = Field(default=3600)
+
+    # pooled http client of the a2a card lookups, see PooledHttpClient
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100)
+    HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST: int = Field(default=4)
+    HTTP_CLIENT_DNS_CACHE_SECONDS: int = Field(default=300)
+    HTTP_CLIENT_KEEPALIVE_SECONDS: int = Field(default=60)
+    HTTP_CLIENT_TIMEOUT_SECONDS: int = Field(default=30)
+
+    # decrypted provider api keys, decryption derives the key with scrypt on every call
+    DECRYPTED_SECRET_CACHE_TTL_SECONDS: int = Field(default=300)
+    DECRYPTED_SECRET_CACHE_MAX_SIZE: int = Field(default=1024)
+
+    # serialized active agent catalogs, versioned per user in redis
+    AGENT_CATALOG_CACHE_MAX_ENTRIES: int = Field(default=1024)
 
     GENAI_PROVIDER_URL: str = Field(default="https://proxy-openai.chi-6ec.workers.dev")
 
+    # agent log ingestion buffer
+    AGENT_LOG_BUFFER_MAX_SIZE: int = Field(default=10_000)
+    AGENT_LOG_FLUSH_BATCH_SIZE: int = Field(default=500)
+    AGENT_LOG_FLUSH_INTERVAL_MS: int = Field(default=250)
+    # what to do with new logs when the buffer is full: drop_oldest/drop_newest/spill
+    AGENT_LOG_OVERFLOW_POLICY: LogOverflowPolicy = Field(
+        default=LogOverflowPolicy.drop_oldest
+    )
+    AGENT_LOG_SPILL_FILE: str = Field(default="./agent_logs_spill.ndjson")
+    # agent logs are pushed to subscribed frontend sockets in batches, once per interval
+    AGENT_LOG_PUSH_INTERVAL_MS: int = Field(default=50)
+    # a batch is dropped when the socket stays busy with other frames for longer than the timeout
+    AGENT_LOG_PUSH_SEND_TIMEOUT_MS: int = Field(default=5000)
+
+    # logs table is partitioned by day, partitions older than retention are dropped, 0 disables retention
+    LOG_RETENTION_DAYS: int = Field(default=7)
+    LOG_PARTITIONS_PRECREATE_DAYS: int = Field(default=7)
+    LOG_PARTITIONS_MAINTENANCE_INTERVAL_MINUTES: int = Field(default=60)
+
     @model_validator(mode="after")
     def build_database_uri(self) -> Self:
         if not self.SQLALCHEMY_ASYNC_DATABASE_URI:
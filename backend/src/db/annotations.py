@@ -20,6 +20,10 @@ uuid_pk = Annotated[
     ),
 ]
 created_at = Annotated[datetime, mapped_column(server_default=func.now())]
+# for range partitioned tables, where the partition key must be a part of the primary key
+created_at_pk = Annotated[
+    datetime, mapped_column(primary_key=True, server_default=func.now())
+]
 updated_at = Annotated[
     datetime, mapped_column(server_default=func.now(), onupdate=datetime.now)
 ]
@@ -1,7 +1,12 @@
-from typing import Annotated, AsyncGenerator
+from typing import Annotated, Any, AsyncGenerator, Awaitable, Callable
 
 from fastapi import Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.pool import NullPool
 from src.core.settings import get_settings
 
@@ -17,11 +22,35 @@ engine = create_async_engine(
 async_session = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def create_pooled_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    """
+    Engine keeping its connections open between sessions.
+    asyncpg connections are bound to the event loop that opened them,
+    so it's only safe in processes running all of their db work on a single long-lived loop.
+    """
+    return create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        future=True,
+        pool_pre_ping=True,
+    )
+
+
 async def get_db() -> AsyncGenerator:
     async with async_session() as session:
         yield session
 
 
+async def run_in_session(fn: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+    """
+    Run a repository method in its own session.
+    An AsyncSession can't run queries concurrently, so queries gathered together need a session each.
+    """
+    async with async_session() as db:
+        return await fn(db=db, **kwargs)
+
+
 def get_middleware_db(request: Request) -> AsyncSession:
     return request.state.db
 
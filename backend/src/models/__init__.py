@@ -1,12 +1,13 @@
 import uuid
 from typing import List
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, true
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.annotations import (
     created_at,
+    created_at_pk,
     int_pk,
     last_invoked_at,
     not_null_json_array_column,
@@ -144,6 +145,22 @@ class Agent(Base):
         secondary="agent_project_associations", back_populates="agents"
     )
 
+    # trigram indexes of the catalog search, see AgentRepository.search_platform_agents
+    __table_args__ = (
+        Index(
+            "ix_agents_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_agents_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
+
 
 class AgentWorkflow(Base):
     id: Mapped[uuid_pk]
@@ -168,6 +185,29 @@ class AgentWorkflow(Base):
     )
 
 
+class FlowAgent(Base):
+    """
+    Agents of `AgentWorkflow.flow`, one row per step.
+    Kept in sync with the json array by agentflow_repo to look up flows by agent with an index.
+    """
+
+    __tablename__ = "flow_agents"
+    id: Mapped[int_pk]
+
+    flow_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("agentworkflows.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # genai agent, mcp tool or a2a card id, depending on agent_type
+    agent_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    agent_type: Mapped[str] = mapped_column(nullable=False)
+    position: Mapped[int] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("flow_id", "position", name="uq_flow_agent_position"),
+        Index("ix_flow_agents_agent_id_agent_type", "agent_id", "agent_type"),
+    )
+
+
 class Project(Base):
     id: Mapped[uuid_pk]
 
@@ -198,24 +238,28 @@ class Team(Base):
 class Log(Base):
     id: Mapped[int_pk]
 
-    session_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), index=True, nullable=False
-    )
-    request_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), index=True, nullable=False
-    )
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    request_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     agent_id: Mapped[str] = mapped_column(index=True, nullable=True)
     creator_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
     )
     creator: Mapped["User"] = relationship(back_populates="logs")
 
-    created_at: Mapped[created_at]
+    created_at: Mapped[created_at_pk]
     updated_at: Mapped[updated_at]
 
     message: Mapped[str] = mapped_column(nullable=False)
     log_level: Mapped[str] = mapped_column(nullable=False)  # TODO: enum
 
+    # daily partitions are managed by log_repo, see LogRepository.maintain_partitions
+    __table_args__ = (
+        # match the (created_at, id) keyset ordering of log pagination
+        Index("ix_logs_session_id_created_at", "session_id", "created_at", "id"),
+        Index("ix_logs_request_id_created_at", "request_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
 
 class File(Base):
     id: Mapped[uuid_pk]
@@ -298,8 +342,14 @@ class MCPServer(Base):
     description: Mapped[str] = mapped_column(nullable=True)
 
     server_url: Mapped[str] = mapped_column(nullable=False)
+    # hash of the tools listed by the server on the last sync, see lookup_and_update_mcp_server
+    tools_fingerprint: Mapped[str] = mapped_column(nullable=True)
 
-    mcp_tools: Mapped[List["MCPTool"]] = relationship(back_populates="mcp_server")
+    # retired tools are kept for the flows that reference them, but are not listed
+    mcp_tools: Mapped[List["MCPTool"]] = relationship(
+        back_populates="mcp_server",
+        primaryjoin="and_(MCPServer.id == MCPTool.mcp_server_id, MCPTool.is_active)",
+    )
 
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
@@ -328,6 +378,8 @@ class MCPTool(Base):
     annotations: Mapped[nullable_json_column]
 
     alias: Mapped[str] = mapped_column(nullable=True)
+    # False once the server stops listing the tool, the row is reused if the tool comes back
+    is_active: Mapped[bool] = mapped_column(default=True, server_default=true())
 
     mcp_server: Mapped["MCPServer"] = relationship(back_populates="mcp_tools")  # noqa: F821
 
@@ -338,6 +390,21 @@ class MCPTool(Base):
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
 
+    __table_args__ = (
+        Index(
+            "ix_mcptools_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_mcptools_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
+
 
 class A2ACard(Base):
     id: Mapped[uuid_pk]
@@ -361,6 +428,18 @@ class A2ACard(Base):
     )
     __table_args__ = (
         UniqueConstraint("creator_id", "server_url", name="uq_a2a_card_server_url"),
+        Index(
+            "ix_a2acards_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_a2acards_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -4,10 +4,10 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from aiohttp import ClientSession
 from fastapi import HTTPException
 from pydantic import AnyHttpUrl
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, cast, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.models import A2ACard, User
@@ -21,6 +21,7 @@ from src.schemas.a2a.schemas import (
 )
 from src.schemas.base import AgentDTOPayload
 from src.utils.enums import AgentType
+from src.utils.http_client import http_client
 from src.utils.helpers import (
     generate_alias,
     get_agent_description_from_skills,
@@ -30,23 +31,35 @@ from src.utils.helpers import (
 logger = logging.getLogger(__name__)
 
 
+def well_known_url(url: AnyHttpUrl | str) -> str:
+    return f"{strip_endpoints_from_url(url=url)}/.well-known/agent.json"
+
+
 async def lookup_agent_well_known(
-    url: AnyHttpUrl | str, headers: Optional[dict] = None
+    url: AnyHttpUrl | str, headers: Optional[dict] = None, conditional: bool = False
 ) -> Optional[A2AAgentCardSchema]:
-    url = strip_endpoints_from_url(url=url)
-    async with ClientSession(base_url=url, headers=headers) as session:
-        try:
-            async with session.get("/.well-known/agent.json", ssl=False) as resp:
-                if resp.status == 200:
-                    json_resp = await resp.json()
-                    card = A2AAgentCard(**json_resp)
-                    return A2AAgentCardSchema(card=card, is_active=True)
+    """
+    Fetch the agent card from the well-known endpoint of the agent.
+    With `conditional`, a card unchanged since the previous lookup is returned as `is_modified=False` without content.
+    """
+    try:
+        resp = await http_client.get_json(
+            url=well_known_url(url),
+            headers=headers,
+            conditional=conditional,
+        )
+    except OSError:
+        logger.warning(f"Could not connect to agent on {url}")
+        return A2AAgentCardSchema(is_active=False)
 
-                return None
+    if resp.status == 304:
+        return A2AAgentCardSchema(is_active=True, is_modified=False)
 
-        except OSError:
-            logger.warning(f"Could not connect to agent on {url}")
-            return A2AAgentCardSchema(is_active=False)
+    if resp.status == 200:
+        card = A2AAgentCard(**resp.body)
+        return A2AAgentCardSchema(card=card, is_active=True)
+
+    return None
 
 
 class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
@@ -54,6 +67,16 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
         q = await db.scalars(select(self.model.server_url))
         return q.all()
 
+    async def list_creator_ids_by_url(
+        self, db: AsyncSession, server_url: str
+    ) -> list[UUID]:
+        q = await db.scalars(
+            select(self.model.creator_id)
+            .where(self.model.server_url == server_url)
+            .distinct()
+        )
+        return q.all()
+
     async def get_card_by_server_url(
         self, db: AsyncSession, server_url: str
     ) -> A2ACard:
@@ -64,17 +87,32 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
 
     async def update_card(
         self, db: AsyncSession, server_url: str, card_in: A2AAgentCardSchema
-    ):
-        card = await self.get_card_by_server_url(db=db, server_url=server_url)
-
-        if card_in.card:
-            setattr(card, "card_content", card_in.card.model_dump(mode="json"))
-            setattr(card, "is_active", card_in.is_active)
+    ) -> list[UUID]:
+        """
+        Returns:
+            ids of the rows whose card content has changed
+        """
+        if not card_in.card:
+            return []
 
-            db.add(card)
-            await db.commit()
-            await db.refresh(card)
-        return card
+        card_content = card_in.card.model_dump(mode="json")
+        q = await db.execute(
+            update(self.model)
+            .where(
+                and_(
+                    self.model.server_url == server_url,
+                    # json has no equality operator, compare as jsonb
+                    cast(self.model.card_content, JSONB).is_distinct_from(
+                        cast(card_content, JSONB)
+                    ),
+                )
+            )
+            .values({"card_content": card_content})
+            .returning(self.model.id)
+        )
+        changed_ids = q.scalars().all()
+        await db.commit()
+        return changed_ids
 
     async def add_url(
         self, db: AsyncSession, user_model: User, data_in: A2ACreateAgentSchema
@@ -229,14 +267,29 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
             is_active=True,
         )
 
-    async def set_as_inactive(self, db: AsyncSession, server_url: str):
-        await db.execute(
+    async def set_is_active(
+        self, db: AsyncSession, server_url: str, is_active: bool
+    ) -> list[UUID]:
+        """
+        Returns:
+            ids of the rows whose is_active has changed
+        """
+        q = await db.execute(
             update(self.model)
-            .where(self.model.server_url == server_url)
-            .values({"is_active": False})
+            .where(
+                and_(
+                    self.model.server_url == server_url,
+                    self.model.is_active.is_not(is_active),
+                )
+            )
+            .values({"is_active": is_active})
+            .returning(self.model.id)
         )
+        changed_ids = q.scalars().all()
         await db.commit()
-        logger.info(f"Set {server_url} as inactive")
+        if changed_ids:
+            logger.info(f"Set {server_url} as {'active' if is_active else 'inactive'}")
+        return changed_ids
 
 
 a2a_repo = A2ARepository(A2ACard)
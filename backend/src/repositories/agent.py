@@ -1,13 +1,25 @@
+from copy import deepcopy
 from typing import Optional, Union
 from uuid import UUID
 
 from fastapi import HTTPException
 from mcp.types import Tool, ToolAnnotations
 from pydantic import BaseModel
-from sqlalchemy import and_, select, text, update
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.jwt import TokenLifespanType, create_access_token, validate_token
-from src.models import A2ACard, Agent, AgentWorkflow, MCPTool, User
+from src.models import A2ACard, Agent, AgentWorkflow, MCPServer, MCPTool, User
 from src.repositories.a2a import a2a_repo
 from src.repositories.base import CRUDBase
 from src.repositories.mcp import mcp_repo
@@ -17,11 +29,12 @@ from src.schemas.api.agent.dto import (
     ActiveAgentsDTO,
     ActiveGenAIAgentDTO,
     AgentDTOWithJWT,
+    AgentSearchResultDTO,
     MLAgentJWTDTO,
     MLAgentSchema,
 )
 from src.schemas.api.agent.schemas import AgentCreate, AgentRegister, AgentUpdate
-from src.schemas.api.flow.schemas import AgentFlowAlias, FlowAgentId, FlowSchema
+from src.schemas.api.flow.schemas import FlowSchema
 from src.schemas.base import AgentDTOPayload
 from src.schemas.mcp.dto import ActiveMCPToolDTO, MCPToolDTO
 from src.utils.enums import ActiveAgentTypeFilter, AgentType
@@ -32,6 +45,7 @@ from src.utils.helpers import (
     map_agent_model_to_dto,
     map_genai_agent_to_unified_dto,
     mcp_tool_to_json_schema,
+    resolve_flow_dependencies,
 )
 
 
@@ -209,25 +223,24 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
             ],
         )
 
-    async def set_all_agents_inactive(self, db: AsyncSession) -> None:
+    async def set_all_agents_inactive(self, db: AsyncSession) -> int:
         """
-        Set is_active=False for all agents in the database on startup of the backend
+        Set is_active=False for all agents in the database on startup of the backend.
+        Single UPDATE of the active rows only, agents are not loaded into the session.
 
         Args:
             db: The database session.
 
-        Returns: None
+        Returns: number of agents set as inactive
         """
-        q = await db.execute(select(self.model))
-        agents = q.scalars().all()
-        if not agents:
-            return
-
-        for agent in agents:
-            agent.is_active = False
-
+        q = await db.execute(
+            update(self.model)
+            .where(self.model.is_active.is_(True))
+            .values({"is_active": False})
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        return
+        return q.rowcount
 
     async def set_agent_as_inactive(
         self, db: AsyncSession, id_: str, user_id: str
@@ -282,6 +295,26 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         )
         return q.scalars().first()
 
+    @staticmethod
+    def _search_match(name: ColumnElement, description: ColumnElement, query: str):
+        """
+        Substring or fuzzy match of the query on name or description.
+        Every condition can be served by the trigram gin indexes of the columns.
+        """
+        return or_(
+            name.icontains(query, autoescape=True),
+            description.icontains(query, autoescape=True),
+            name.op("%")(query),
+            literal(query).op("<%")(description),
+        )
+
+    @staticmethod
+    def _search_rank(name: ColumnElement, description: ColumnElement, query: str):
+        return func.greatest(
+            func.similarity(name, query),
+            func.word_similarity(query, description),
+        )
+
     async def list_agents_by_name(
         self,
         db: AsyncSession,
@@ -290,32 +323,35 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         limit: int = 100,
         offset: int = 0,
     ) -> list[Optional[Agent]]:
+        """Agents with names similar to `agent_name`, exact matches first."""
         q = await db.execute(
             select(self.model)
             .where(
                 and_(
-                    self.model.name == agent_name,
+                    or_(
+                        self.model.name.icontains(agent_name, autoescape=True),
+                        self.model.name.op("%")(agent_name),
+                    ),
                     self.model.creator_id == str(user_model.id),
                 )
             )
             .limit(limit=limit)
             .offset(offset=offset)
-            .order_by(self.model.created_at.desc())
+            .order_by(
+                (self.model.name == agent_name).desc(),
+                func.similarity(self.model.name, agent_name).desc(),
+                self.model.created_at.desc(),
+            )
         )
         return q.scalars().all()
 
     async def find_agent_by_description(
         self, db: AsyncSession, description_query: str, user_model: User
     ) -> Optional[Agent]:
-        q = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.description.ilike(f"%{description_query}%"),
-                    self.model.creator_id == str(user_model.id),
-                )
-            )
+        agents = await self.search_agents_by_description(
+            db=db, description_query=description_query, user_model=user_model, limit=1
         )
-        return q.scalars().first()
+        return agents[0] if agents else None
 
     async def search_agents_by_description(
         self,
@@ -325,20 +361,105 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         limit: int = 100,
         offset: int = 0,
     ):
+        """Agents matching `description_query` on name or description, best matches first."""
         q = await db.execute(
             select(self.model)
             .where(
                 and_(
-                    self.model.description.ilike(f"%{description_query}%"),
+                    self._search_match(
+                        self.model.name, self.model.description, description_query
+                    ),
                     self.model.creator_id == str(user_model.id),
                 )
             )
             .limit(limit=limit)
             .offset(offset=offset)
-            .order_by(self.model.created_at.desc())
+            .order_by(
+                self._search_rank(
+                    self.model.name, self.model.description, description_query
+                ).desc(),
+                self.model.created_at.desc(),
+            )
         )
         return q.scalars().all()
 
+    async def search_platform_agents(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        query: str,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[AgentSearchResultDTO]:
+        """
+        Ranked search of genai agents, mcp tools and a2a cards of the user in a single query.
+        Results are ordered by trigram similarity of the query to their names and descriptions.
+        """
+        genai_agents = select(
+            literal(AgentType.genai.value).label("type"),
+            Agent.id,
+            Agent.name,
+            Agent.alias,
+            Agent.description,
+            null().label("url"),
+            Agent.is_active,
+            Agent.created_at,
+            self._search_rank(Agent.name, Agent.description, query).label("rank"),
+        ).where(
+            and_(
+                Agent.creator_id == user_id,
+                self._search_match(Agent.name, Agent.description, query),
+            )
+        )
+        mcp_tools = (
+            select(
+                literal(AgentType.mcp.value).label("type"),
+                MCPTool.id,
+                MCPTool.name,
+                MCPTool.alias,
+                MCPTool.description,
+                MCPServer.server_url.label("url"),
+                MCPServer.is_active,
+                MCPTool.created_at,
+                self._search_rank(MCPTool.name, MCPTool.description, query).label(
+                    "rank"
+                ),
+            )
+            .join(MCPServer, MCPServer.id == MCPTool.mcp_server_id)
+            .where(
+                and_(
+                    MCPServer.creator_id == user_id,
+                    MCPTool.is_active.is_(True),
+                    self._search_match(MCPTool.name, MCPTool.description, query),
+                )
+            )
+        )
+        a2a_cards = select(
+            literal(AgentType.a2a.value).label("type"),
+            A2ACard.id,
+            A2ACard.name,
+            A2ACard.alias,
+            A2ACard.description,
+            A2ACard.server_url.label("url"),
+            A2ACard.is_active,
+            A2ACard.created_at,
+            self._search_rank(A2ACard.name, A2ACard.description, query).label("rank"),
+        ).where(
+            and_(
+                A2ACard.creator_id == user_id,
+                self._search_match(A2ACard.name, A2ACard.description, query),
+            )
+        )
+
+        results = union_all(genai_agents, mcp_tools, a2a_cards).subquery()
+        q = await db.execute(
+            select(results)
+            .order_by(results.c.rank.desc(), results.c.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [AgentSearchResultDTO(**row._asdict()) for row in q.all()]
+
     async def filter_out_empty_agents(
         self, db: AsyncSession, user_model: User, limit: int, offset: int
     ):
@@ -514,48 +635,58 @@ LIMIT :limit OFFSET :offset;
             first_existing_agent = first_a2a_card
 
         if first_existing_agent:
-            input_params = None
-            if isinstance(first_existing_agent, Agent):
-                input_params = first_existing_agent.input_parameters
-                # TODO: check is genai_agent
-                if func := input_params.get("function"):
-                    if func.get("name"):
-                        input_params["function"]["name"] = flow.alias
-
-                    if func.get("description"):
-                        input_params["function"]["description"] = flow.description
-
-            if isinstance(first_existing_agent, MCPTool):
-                input_params = mcp_tool_to_json_schema(
-                    MCPToolDTO(
-                        id=first_existing_agent.id,
-                        name=flow.name,
-                        description=flow.description,
-                        alias=flow.alias,
-                        inputSchema=first_existing_agent.inputSchema,
-                        annotations=first_existing_agent.annotations,
-                        mcp_server_id=first_existing_agent.mcp_server_id,
-                    )
+            return self._flow_to_dto(flow=flow, first_agent=first_existing_agent)
+
+    def _flow_to_dto(
+        self, flow: AgentWorkflow, first_agent: Agent | MCPTool | A2ACard
+    ) -> AgentDTOPayload:
+        input_params = None
+        if isinstance(first_agent, Agent):
+            # input_parameters of the orm object must not be modified, the agent may be listed as well
+            input_params = deepcopy(first_agent.input_parameters)
+            # TODO: check is genai_agent
+            if func := input_params.get("function"):
+                if func.get("name"):
+                    input_params["function"]["name"] = flow.alias
+
+                if func.get("description"):
+                    input_params["function"]["description"] = flow.description
+
+        if isinstance(first_agent, MCPTool):
+            input_params = mcp_tool_to_json_schema(
+                MCPToolDTO(
+                    id=first_agent.id,
+                    name=flow.name,
+                    description=flow.description,
+                    alias=flow.alias,
+                    inputSchema=first_agent.inputSchema,
+                    annotations=first_agent.annotations,
+                    mcp_server_id=first_agent.mcp_server_id,
                 )
-                input_params["title"] = flow.alias
-                input_params["description"] = flow.description
-
-            if isinstance(first_existing_agent, A2ACard):
-                input_params = A2AFirstAgentInFlow(
-                    name=flow.alias, description=flow.description
-                ).model_dump(mode="json")
-
-            flow_schema = AgentDTOPayload(
-                id=flow.id,
-                name=flow.alias,
-                type=AgentType.flow,
-                agent_schema=input_params,
-                created_at=flow.created_at,
-                updated_at=flow.updated_at,
-                flow=[agent.get("id") for agent in flow.flow],
-                is_active=flow.is_active,
             )
-            return flow_schema
+            input_params["title"] = flow.alias
+            input_params["description"] = flow.description
+
+        if isinstance(first_agent, A2ACard):
+            input_params = A2AFirstAgentInFlow(
+                name=flow.alias, description=flow.description
+            ).model_dump(mode="json")
+
+        flow_schema = AgentDTOPayload(
+            id=flow.id,
+            name=flow.alias,
+            type=AgentType.flow,
+            agent_schema=input_params,
+            created_at=flow.created_at,
+            updated_at=flow.updated_at,
+            flow=[agent.get("id") for agent in flow.flow],
+            flow_dependencies=resolve_flow_dependencies(flow.flow),
+            flow_bindings=[agent.get("bindings") for agent in flow.flow]
+            if any(agent.get("bindings") for agent in flow.flow)
+            else None,
+            is_active=flow.is_active,
+        )
+        return flow_schema
 
     async def _get_all_active_flows_by_user(
         self, db: AsyncSession, user_id: UUID
@@ -571,29 +702,19 @@ LIMIT :limit OFFSET :offset;
         if not flows:
             return []
 
-        valid_flows = []
+        # agents of all flows are resolved at once, flow dtos are built in memory
         flow_validator = FlowValidator()
+        active_agents = await flow_validator.resolve_active_flow_agents(
+            db=db, flows=flows, user_id=user_id
+        )
 
+        valid_flows = []
         for f in flows:
-            flow = AgentFlowAlias(
-                name=f.name,
-                description=f.description,
-                flow=[FlowAgentId(**a) for a in f.flow],
-                alias=f.alias,
-            )
-            valid_agents = await flow_validator.validate_is_active_of_all_agent_types(
-                flow_agents=flow.flow, user_id=user_id
-            )
-
-            if len(valid_agents) < len(flow.flow):
-                continue
-
-            flow = await self.orm_flow_to_dto(f, db=db)
-
-            if not flow:
+            if not flow_validator.is_flow_active(flow=f, active_agents=active_agents):
                 continue
 
-            valid_flows.append(flow)
+            first_agent = active_agents[flow_validator.flow_agent_key(f.flow[0])]
+            valid_flows.append(self._flow_to_dto(flow=f, first_agent=first_agent))
 
         return valid_flows
 
@@ -55,6 +55,24 @@ class ChatRepository(
             messages=[GetChatMessage(**msg.__dict__) for msg in chat.messages],
         )
 
+    async def get_last_messages(
+        self, db: AsyncSession, user_id: UUID, session_id: UUID, limit: int
+    ) -> list[GetChatMessage]:
+        """Last `limit` messages of the chat, oldest first."""
+        q = await db.scalars(
+            select(ChatMessage)
+            .join(self.model.messages)
+            .where(
+                and_(
+                    self.model.session_id == session_id,
+                    self.model.creator_id == user_id,
+                )
+            )
+            .order_by(ChatMessage.created_at.desc())
+            .limit(limit)
+        )
+        return [GetChatMessage(**msg.__dict__) for msg in reversed(q.all())]
+
     async def get_paginated_chat_history(
         self,
         db: AsyncSession,
@@ -2,9 +2,9 @@ from typing import List, Optional, Union
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import and_, delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models import Agent, AgentWorkflow, User
+from src.models import Agent, AgentWorkflow, FlowAgent, User
 from src.repositories.base import CRUDBase
 from src.schemas.api.flow.schemas import (
     AgentFlowAlias,
@@ -12,6 +12,7 @@ from src.schemas.api.flow.schemas import (
     AgentFlowUpdate,
     FlowAgentId,
 )
+from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator, generate_alias
 
 
@@ -109,10 +110,43 @@ class AgentWorkflowRepository(
         )
 
         db.add(db_obj)
+        await db.flush()
+        await self._replace_flow_agents(db=db, flow_id=db_obj.id, flow=db_obj.flow)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
+    async def _replace_flow_agents(
+        self, db: AsyncSession, flow_id: UUID, flow: list[dict]
+    ):
+        """
+        Rewrite flow_agents rows of the flow, must be called in the same transaction as the write of `flow`.
+        """
+        await db.execute(delete(FlowAgent).where(FlowAgent.flow_id == flow_id))
+        rows = [
+            {
+                "flow_id": flow_id,
+                "agent_id": agent["id"],
+                "agent_type": agent["type"],
+                "position": position,
+            }
+            for position, agent in enumerate(flow)
+        ]
+        if rows:
+            await db.execute(insert(FlowAgent).values(rows))
+
+    async def get_flow_ids_by_agent_ids(
+        self,
+        db: AsyncSession,
+        agent_ids: list[Union[str, UUID]],
+        agent_type: Optional[AgentType] = None,
+    ) -> list[UUID]:
+        q = select(FlowAgent.flow_id).where(FlowAgent.agent_id.in_(agent_ids))
+        if agent_type:
+            q = q.where(FlowAgent.agent_type == agent_type.value)
+        flow_ids = await db.scalars(q.distinct())
+        return flow_ids.all()
+
     async def delete_multiple(
         self, db: AsyncSession, flow_ids: list[str], user_id: str
     ):
@@ -128,44 +162,35 @@ class AgentWorkflowRepository(
         self, db: AsyncSession, agent_id: str, user_model: User
     ):
         """
-            Deletes all flows that contain the specified agent ID.
+        Sets all active flows that contain the specified agent ID as inactive.
 
-            Args:
-                db: The database session.
-                agent_id: The ID of the agent to search for in flows.
+        Args:
+            db: The database session.
+            agent_id: The ID of the agent to search for in flows.
 
-            Returns:
-                A list of Flow IDs that were deleted, or None if no flows were found containing
-        the agent.
+        Returns:
+            A list of Flow IDs that were set as inactive.
 
-            Note:
-                This function identifies and deletes flows containing the provided agent ID.
+        Note:
+            Flows are looked up by the agent through the flow_agents index.
         """
         q = await db.execute(
-            select(self.model).where(
+            update(self.model)
+            .where(
                 and_(
                     self.model.creator_id == str(user_model.id),
                     self.model.is_active.is_(True),
+                    self.model.id.in_(
+                        select(FlowAgent.flow_id).where(FlowAgent.agent_id == agent_id)
+                    ),
                 )
             )
+            .values(is_active=False)
+            .returning(self.model.id)
         )
-        flows = q.scalars().all()
-
-        flow_ids_to_update: list[Optional[str]] = []
-        for flow in flows:
-            flow_list = flow.flow
-            agent_ids = [agent["id"] for agent in flow_list]
-            if agent_id in agent_ids:
-                flow_ids_to_update.append({"id": str(flow.id), "is_active": False})
-
-        if flow_ids_to_update:
-            await db.run_sync(
-                lambda sync_db: sync_db.bulk_update_mappings(
-                    self.model, flow_ids_to_update
-                )
-            )
-            await db.commit()
-        return None
+        flow_ids = [str(flow_id) for flow_id in q.scalars().all()]
+        await db.commit()
+        return flow_ids
 
     async def set_multiple_flow_as_inactive(
         self, db: AsyncSession, flow_ids: list[Optional[str]], user_id: UUID | str
@@ -221,12 +246,17 @@ class AgentWorkflowRepository(
         upd_data: AgentFlowUpdate,
         user_model: User,
     ):
+        flow = await self.get_by_user(db=db, id_=flow_id, user_model=user_model)
+        if not flow:
+            return None
+
         flow_upd_data = upd_data.model_dump(mode="json")
         flow_upd_data["alias"] = generate_alias(upd_data.name)
         flow_upd_data["is_active"] = True
-        return await self.update_by_user(
-            db=db, id_=flow_id, obj_in=flow_upd_data, user=user_model
+        await self._replace_flow_agents(
+            db=db, flow_id=flow.id, flow=flow_upd_data["flow"]
         )
+        return await self.update(db=db, db_obj=flow, obj_in=flow_upd_data)
 
     async def get_flow_and_validate_all_flow_agents(
         self, db: AsyncSession, flow_id: UUID, user_model: User
@@ -241,11 +271,10 @@ class AgentWorkflowRepository(
                 status_code=400, detail=f"Flow with id '{flow_id}' does not exist"
             )
 
-        validator = FlowValidator()
-        updated_flow = await validator.trigger_flow_state_lookup_of_all_agents(
-            flow=flow, user_id=user_model.id
+        [validated_flow] = await self.validate_flows(
+            db=db, flows=[flow], user_model=user_model
         )
-        return updated_flow
+        return validated_flow
 
     async def get_all_flows_and_validate_all_flow_agents(
         self,
@@ -257,12 +286,27 @@ class AgentWorkflowRepository(
         flows = await self.get_multiple_by_user(
             db=db, user_model=user_model, offset=offset, limit=limit
         )
-        return [
-            await self.get_flow_and_validate_all_flow_agents(
-                db=db, flow_id=f.id, user_model=user_model
+        return await self.validate_flows(db=db, flows=flows, user_model=user_model)
+
+    async def validate_flows(
+        self, db: AsyncSession, flows: list[AgentWorkflow], user_model: User
+    ) -> list[AgentWorkflow]:
+        """
+        Set is_active of already loaded flows from the current state of their agents.
+        Agents of all flows are resolved together, with one query per agent type.
+        """
+        if not flows:
+            return flows
+
+        validator = FlowValidator()
+        active_agents = await validator.resolve_active_flow_agents(
+            db=db, flows=flows, user_id=user_model.id
+        )
+        for flow in flows:
+            flow.is_active = validator.is_flow_active(
+                flow=flow, active_agents=active_agents
             )
-            for f in flows
-        ]
+        return flows
 
 
 agentflow_repo = AgentWorkflowRepository(AgentWorkflow)
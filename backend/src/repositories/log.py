@@ -1,23 +1,322 @@
-from typing import Optional
-from src.schemas.ws.log import LogCreate, LogUpdate, LogEntryDTO
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from typing import AsyncIterator, Optional
+from src.schemas.ws.log import (
+    LogCreate,
+    LogCursorPageDTO,
+    LogUpdate,
+    LogEntry,
+    LogEntryDTO,
+)
 from src.repositories.base import CRUDBase
-from src.models import Log
+from src.models import ChatConversation, Log
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, func, insert, select, text, tuple_
+from src.utils.enums import LogLevel
+from src.utils.pagination import decode_cursor, encode_cursor
+
+logger = getLogger(__name__)
+
+# serializes partition maintenance between backend replicas and celery workers
+PARTITIONS_MAINTENANCE_LOCK_ID = 72_417_001
 
 
 class LogRepository(CRUDBase[Log, LogCreate, LogUpdate]):
+    async def create_many(
+        self, db: AsyncSession, objs_in: list[LogCreate]
+    ) -> list[LogEntry]:
+        """
+        Insert a batch of logs with a single multi-row INSERT ... RETURNING statement.
+        Entries are mapped before commit, since commit expires the returned ORM objects.
+        """
+        if not objs_in:
+            return []
+
+        values = [obj.model_dump() for obj in objs_in]
+        creators = await self._get_session_creators(
+            db=db, session_ids={str(v["session_id"]) for v in values}
+        )
+        for v in values:
+            v["creator_id"] = v["creator_id"] or creators.get(str(v["session_id"]))
+
+        q = await db.scalars(insert(self.model).returning(self.model), values)
+        logs = [LogEntry(**log.__dict__) for log in q.all()]
+        await db.commit()
+        return logs
+
+    async def _get_session_creators(
+        self, db: AsyncSession, session_ids: set[str]
+    ) -> dict[str, str]:
+        """Agents don't know the user they run for, logs are owned by the creator of the chat."""
+        q = await db.execute(
+            select(ChatConversation.session_id, ChatConversation.creator_id).where(
+                ChatConversation.session_id.in_(session_ids)
+            )
+        )
+        return {str(session_id): creator_id for session_id, creator_id in q.all()}
+
+    def _retention_horizon(self, retention_days: int):
+        # start of the oldest day that is still kept, matches the lower bound of the oldest partition
+        # localtimestamp has the same type as created_at, so postgres can prune partitions with it
+        return func.date_trunc("day", func.localtimestamp()) - timedelta(
+            days=retention_days
+        )
+
+    async def _session_lower_bound(self, db: AsyncSession, session_id: str):
+        """
+        Logs of a session can't be older than its conversation,
+        bounding created_at lets postgres skip partitions created before the chat has started.
+        """
+        conversation_created_at = await db.scalar(
+            select(ChatConversation.created_at).where(
+                ChatConversation.session_id == session_id
+            )
+        )
+        return conversation_created_at
+
+    async def _build_lookup_query(
+        self,
+        db: AsyncSession,
+        session_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        min_level: Optional[LogLevel] = None,
+        retention_days: int = 0,
+    ) -> Select:
+        q = select(self.model)
+
+        if session_id:
+            q = q.where(self.model.session_id == session_id)
+            lower_bound = await self._session_lower_bound(db=db, session_id=session_id)
+            if lower_bound:
+                q = q.where(self.model.created_at >= lower_bound)
+        if request_id:
+            q = q.where(self.model.request_id == request_id)
+        if user_id:
+            q = q.where(self.model.creator_id == user_id)
+        if min_level:
+            levels = [level.value for level in LogLevel]
+            q = q.where(
+                self.model.log_level.in_(levels[levels.index(min_level.value) :])
+            )
+        if retention_days > 0:
+            q = q.where(
+                self.model.created_at >= self._retention_horizon(retention_days)
+            )
+
+        return q.order_by(self.model.created_at, self.model.id)
+
     async def list_by_session_id(
-        self, db: AsyncSession, id_: str
+        self, db: AsyncSession, id_: str, retention_days: int = 0
     ) -> list[Optional[Log]]:
-        q = await db.execute(select(self.model).where(self.model.session_id == id_))
+        q = await self._build_lookup_query(
+            db=db, session_id=id_, retention_days=retention_days
+        )
+        q = await db.execute(q)
         return [LogEntryDTO(**log.__dict__) for log in q.scalars().all()]
 
     async def list_by_request_id(
-        self, db: AsyncSession, id_: str
+        self, db: AsyncSession, id_: str, retention_days: int = 0
     ) -> list[Optional[Log]]:
-        q = await db.execute(select(self.model).where(self.model.request_id == id_))
+        q = await self._build_lookup_query(
+            db=db, request_id=id_, retention_days=retention_days
+        )
+        q = await db.execute(q)
         return [LogEntryDTO(**log.__dict__) for log in q.scalars().all()]
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        session_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        min_level: Optional[LogLevel] = None,
+        retention_days: int = 0,
+    ) -> LogCursorPageDTO:
+        """
+        Keyset pagination over (created_at, id).
+        Unlike offset pagination every page costs the same, no matter how deep it is.
+        """
+        q = await self._build_lookup_query(
+            db=db,
+            session_id=session_id,
+            request_id=request_id,
+            user_id=user_id,
+            min_level=min_level,
+            retention_days=retention_days,
+        )
+        if cursor:
+            created_at, id_ = decode_cursor(cursor)
+            q = q.where(
+                tuple_(self.model.created_at, self.model.id) > (created_at, id_)
+            )
+
+        # one extra row tells whether there is a next page without counting
+        logs = (await db.scalars(q.limit(limit + 1))).all()
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(logs[-1].created_at, logs[-1].id)
+
+        return LogCursorPageDTO(
+            items=[LogEntryDTO(**log.__dict__) for log in logs],
+            next_cursor=next_cursor,
+        )
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        session_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        min_level: Optional[LogLevel] = None,
+        retention_days: int = 0,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[LogEntryDTO]:
+        """
+        Yield logs one by one from a server-side cursor,
+        only `chunk_size` rows are held in memory at a time.
+        """
+        q = await self._build_lookup_query(
+            db=db,
+            session_id=session_id,
+            request_id=request_id,
+            user_id=user_id,
+            min_level=min_level,
+            retention_days=retention_days,
+        )
+        logs = await db.stream_scalars(q.execution_options(yield_per=chunk_size))
+        async for log in logs:
+            yield LogEntryDTO(**log.__dict__)
+
+    def _partition_name(self, day: date) -> str:
+        return f"{self.model.__tablename__}_p{day:%Y%m%d}"
+
+    def _default_partition_name(self) -> str:
+        return f"{self.model.__tablename__}_default"
+
+    def _partition_day(self, partition_name: str) -> Optional[date]:
+        prefix = f"{self.model.__tablename__}_p"
+        if not partition_name.startswith(prefix):
+            return None
+        try:
+            return datetime.strptime(partition_name[len(prefix) :], "%Y%m%d").date()
+        except ValueError:
+            return None
+
+    async def list_partitions(self, db: AsyncSession) -> list[str]:
+        q = await db.execute(
+            text(
+                """
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = :table_name
+                """
+            ),
+            {"table_name": self.model.__tablename__},
+        )
+        return list(q.scalars().all())
+
+    async def _create_partition(self, db: AsyncSession, day: date) -> str:
+        name = self._partition_name(day)
+        await db.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {self.model.__tablename__} "
+                f"FOR VALUES FROM ('{day}') TO ('{day + timedelta(days=1)}')"
+            )
+        )
+        return name
+
+    async def _split_default_partition(
+        self, db: AsyncSession, existing: set[str]
+    ) -> list[str]:
+        """
+        Move logs that landed in the default partition (maintenance didn't run in time) to daily partitions.
+        A daily partition can't be created while the default one holds rows of its day,
+        so the default partition is detached while its days get their partitions and is emptied.
+
+        Returns:
+            names of created partitions
+        """
+        table_name = self.model.__tablename__
+        default_name = self._default_partition_name()
+        if default_name not in existing:
+            return []
+
+        days = (
+            await db.scalars(
+                text(f"SELECT DISTINCT created_at::date FROM {default_name}")
+            )
+        ).all()
+        if not days:
+            return []
+
+        columns = ", ".join(column.name for column in self.model.__table__.columns)
+        await db.execute(
+            text(f"ALTER TABLE {table_name} DETACH PARTITION {default_name}")
+        )
+        created = []
+        for day in sorted(days):
+            if self._partition_name(day) not in existing:
+                created.append(await self._create_partition(db=db, day=day))
+        await db.execute(
+            text(
+                f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {default_name}"
+            )
+        )
+        await db.execute(text(f"TRUNCATE {default_name}"))
+        await db.execute(
+            text(f"ALTER TABLE {table_name} ATTACH PARTITION {default_name} DEFAULT")
+        )
+        logger.warning(
+            f"Moved logs of {len(days)} days out of the default partition of {table_name}"
+        )
+        return created
+
+    async def maintain_partitions(
+        self, db: AsyncSession, precreate_days: int, retention_days: int
+    ) -> tuple[list[str], list[str]]:
+        """
+        Create daily partitions from today up to `precreate_days` ahead
+        and drop partitions that only contain logs older than `retention_days`.
+        Logs inserted into the default partition while no daily partition existed are moved to daily partitions.
+        Dropping a partition is instant and doesn't bloat the table the way DELETE does.
+
+        Returns:
+            names of created and dropped partitions
+        """
+        await db.execute(
+            select(func.pg_advisory_xact_lock(PARTITIONS_MAINTENANCE_LOCK_ID))
+        )
+        today: date = await db.scalar(select(func.current_date()))
+        existing = set(await self.list_partitions(db=db))
+
+        created = await self._split_default_partition(db=db, existing=existing)
+        for offset in range(precreate_days + 1):
+            day = today + timedelta(days=offset)
+            name = self._partition_name(day)
+            if name in existing or name in created:
+                continue
+            created.append(await self._create_partition(db=db, day=day))
+
+        dropped = []
+        if retention_days > 0:
+            oldest_kept = today - timedelta(days=retention_days)
+            for name in sorted(existing):
+                day = self._partition_day(name)
+                if day and day < oldest_kept:
+                    await db.execute(text(f"DROP TABLE {name}"))
+                    dropped.append(name)
+
+        await db.commit()
+        if created or dropped:
+            logger.info(
+                f"Log partitions maintenance complete, created: {created}, dropped: {dropped}"
+            )
+        return created, dropped
+
 
 log_repo = LogRepository(Log)
@@ -1,8 +1,9 @@
+import hashlib
+import json
 import logging
 import traceback
-import uuid
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional
 from uuid import UUID
 
 import httpx
@@ -10,6 +11,7 @@ from fastapi import HTTPException
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.shared.exceptions import McpError
+from mcp.types import ListToolsResult, Tool
 from pydantic import AnyHttpUrl
 from sqlalchemy import and_, select, update
 from sqlalchemy.exc import IntegrityError
@@ -27,6 +29,44 @@ from src.utils.helpers import generate_alias, mcp_tool_to_json_schema
 logger = logging.getLogger(__name__)
 
 
+class ToolsPageChanges(NamedTuple):
+    # number of inserted, updated and restored tools
+    changed: int
+    # ids of retired tools that are listed by the server again
+    restored_tool_ids: list[UUID]
+
+
+async def list_mcp_server_tool_pages(
+    url: str | AnyHttpUrl,
+    on_page: Callable[[ListToolsResult], Awaitable[None]],
+    headers: Optional[dict] = None,
+    timeout: int = 60,
+    cursor: Optional[str] = None,
+):
+    """
+    List tools of the mcp server page by page, following `nextCursor` starting from `cursor`.
+    Every page is passed to `on_page` before the next one is requested,
+    so callers can process tools of large servers without holding all of them in memory.
+    """
+    async with streamablehttp_client(
+        url=str(url),
+        headers=headers,
+        timeout=timedelta(seconds=timeout),
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(
+            write_stream=write_stream, read_stream=read_stream
+        ) as session:
+            logger.debug(f"Initializing conn with MCP server: {url}")
+            await session.initialize()
+
+            while True:
+                page = await session.list_tools(cursor=cursor)
+                await on_page(page)
+                cursor = page.nextCursor
+                if not cursor:
+                    return
+
+
 async def lookup_mcp_server(
     url: str | AnyHttpUrl,
     headers: Optional[dict] = None,
@@ -46,26 +86,21 @@ async def lookup_mcp_server(
     # `url` will be of string type only whenever celery beat task will invoke this lookup function.
     # In this case, trailing slash is trimmed
     try:
-        async with streamablehttp_client(
-            url=str(url),
-            headers=headers,
-            timeout=timedelta(seconds=timeout),
-        ) as (read_stream, write_stream, _):
-            async with ClientSession(
-                write_stream=write_stream, read_stream=read_stream
-            ) as session:
-                logger.debug(f"Initializing conn with MCP server: {url}")
-                await session.initialize()
-
-                tools = await session.list_tools()
-
-                logger.debug(f"Successfully got the mcp server data of: {url}")
-
-                return MCPServerData(
-                    mcp_tools=tools.tools,
-                    server_url=str(url),
-                    is_active=True,
-                )
+        tools: list[Tool] = []
+
+        async def collect(page: ListToolsResult):
+            tools.extend(page.tools)
+
+        await list_mcp_server_tool_pages(
+            url=url, on_page=collect, headers=headers, timeout=timeout, cursor=cursor
+        )
+
+        logger.debug(f"Successfully got the mcp server data of: {url}")
+        return MCPServerData(
+            mcp_tools=tools,
+            server_url=str(url),
+            is_active=True,
+        )
 
     except* (OSError, httpx.ConnectError, httpx.HTTPStatusError, McpError):
         logger.warning(f"Could not connect to {url}. Details: {traceback.format_exc()}")
@@ -73,6 +108,35 @@ async def lookup_mcp_server(
     return MCPServerData(is_active=False)
 
 
+def _tool_digest(tool: Tool) -> int:
+    tool_data = [
+        tool.name,
+        tool.description,
+        tool.inputSchema,
+        tool.annotations.model_dump(mode="json") if tool.annotations else None,
+    ]
+    return int.from_bytes(
+        hashlib.sha256(
+            json.dumps(tool_data, sort_keys=True, default=str).encode()
+        ).digest()
+    )
+
+
+def combine_tool_digests(digest: int, tools: list[Tool]) -> int:
+    """
+    Add tools to a running digest. The sum of per tool hashes does not depend on the order of the tools,
+    so the digest of a paginated tool list can be computed page by page.
+    """
+    for tool in tools:
+        digest = (digest + _tool_digest(tool)) % 2**256
+    return digest
+
+
+def tools_fingerprint(tools: list[Tool], digest: int = 0) -> str:
+    """Hash of names, descriptions, schemas and annotations of the tools, independent of their order."""
+    return f"{combine_tool_digests(digest, tools):064x}"
+
+
 class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
     async def get_mcp_server_by_url(self, db: AsyncSession, mcp_server_url: str):
         q = await db.scalars(
@@ -84,74 +148,165 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
         )
         return q.first()
 
-    async def update_mcp_server_with_tools(
-        self, db: AsyncSession, db_obj: MCPServer, obj_in: MCPServerData
-    ):
-        tools_in = obj_in.mcp_tools
-        tool_names = [t.name for t in tools_in]
+    @staticmethod
+    def _tool_values(tool: Tool) -> dict:
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": tool.inputSchema,
+            "annotations": tool.annotations.model_dump(mode="json")
+            if tool.annotations
+            else None,
+        }
 
+    async def list_server_ids_by_url(
+        self, db: AsyncSession, server_url: str
+    ) -> list[UUID]:
         q = await db.scalars(
-            select(MCPTool)
-            .where(
-                and_(MCPTool.name.in_(tool_names), MCPTool.mcp_server_id == db_obj.id)
-            )
-            .order_by(MCPTool.created_at.desc())
+            select(self.model.id).where(self.model.server_url == server_url)
         )
+        return q.all()
+
+    async def upsert_tools_page(
+        self, db: AsyncSession, server_ids: list[UUID], tools: list[Tool]
+    ) -> ToolsPageChanges:
+        """
+        Insert new and update changed tools of a page of `list_tools` for every server in `server_ids`.
+        Retired tools listed again are restored under their ids, so flows referencing them work again.
+        Unchanged tools are not written.
+        """
+        tools_in = {t.name: t for t in tools if t}
+        if not server_ids or not tools_in:
+            return ToolsPageChanges(changed=0, restored_tool_ids=[])
 
-        tool_alias_container = {
-            t.name: {"id": t.id, "alias": t.alias}
-            for t in q.all()
-            if t.name in tool_names
+        q = await db.scalars(
+            select(MCPTool).where(
+                and_(
+                    MCPTool.mcp_server_id.in_(server_ids),
+                    MCPTool.name.in_(tools_in.keys()),
+                )
+            )
+        )
+        # an active row takes precedence over retired rows of the same name
+        existing_tools = {
+            (t.mcp_server_id, t.name): t
+            for t in sorted(q.all(), key=lambda t: t.is_active)
         }
 
-        tools_batch = [
-            {
-                **t.model_dump(mode="json"),
-                "id": tool_alias_container.get(t.name, {}).get("id", str(uuid.uuid4())),
-                "alias": tool_alias_container.get(t.name, {}).get(
-                    "alias", generate_alias(t.name)
-                ),
-                "mcp_server_id": db_obj.id,
-                "updated_at": datetime.now(),
-            }
-            for t in tools_in
-        ]
+        changes = 0
+        restored_tool_ids = []
+        for server_id in server_ids:
+            for name, tool in tools_in.items():
+                values = self._tool_values(tool)
+                db_tool = existing_tools.get((server_id, name))
+                if not db_tool:
+                    db.add(
+                        MCPTool(
+                            **values,
+                            alias=generate_alias(name),
+                            mcp_server_id=server_id,
+                        )
+                    )
+                    changes += 1
+                elif not db_tool.is_active or any(
+                    getattr(db_tool, k) != v for k, v in values.items()
+                ):
+                    if not db_tool.is_active:
+                        db_tool.is_active = True
+                        restored_tool_ids.append(db_tool.id)
+                    for k, v in values.items():
+                        setattr(db_tool, k, v)
+                    changes += 1
+
+        if changes:
+            await db.commit()
+        return ToolsPageChanges(changed=changes, restored_tool_ids=restored_tool_ids)
 
-        await db.run_sync(
-            lambda sync_db: sync_db.bulk_update_mappings(MCPTool, tools_batch)
+    async def list_tool_ids_and_names(
+        self, db: AsyncSession, server_ids: list[UUID]
+    ) -> list[tuple[UUID, str]]:
+        q = await db.execute(
+            select(MCPTool.id, MCPTool.name).where(
+                and_(
+                    MCPTool.mcp_server_id.in_(server_ids),
+                    MCPTool.is_active.is_(True),
+                )
+            )
+        )
+        return [tuple(row) for row in q.all()]
+
+    async def retire_tools(self, db: AsyncSession, tool_ids: list[UUID]):
+        """
+        Mark tools that are no longer listed by their server as inactive.
+        Rows are kept, so flows referencing them recover when the tools are listed again.
+        """
+        if not tool_ids:
+            return
+        await db.execute(
+            update(MCPTool).where(MCPTool.id.in_(tool_ids)).values({"is_active": False})
         )
         await db.commit()
-        await db.refresh(db_obj)
 
-        db_obj.is_active = True
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
-
-    async def update_mcp_server_resources(
-        self,
-        db: AsyncSession,
-        mcp_server_url: str,
-        obj_in: MCPServerData,
-    ):
-        mcp_server = await self.get_mcp_server_by_url(
-            db=db, mcp_server_url=mcp_server_url
+    async def get_tools_fingerprint(
+        self, db: AsyncSession, server_url: str
+    ) -> Optional[str]:
+        """
+        Fingerprint of the stored tools of the server, None if its rows are not synced to the same tools.
+        """
+        q = await db.scalars(
+            select(self.model.tools_fingerprint)
+            .where(self.model.server_url == server_url)
+            .distinct()
         )
-        if not mcp_server:
-            return None
+        fingerprints = q.all()
+        return fingerprints[0] if len(fingerprints) == 1 else None
 
-        return await self.update_mcp_server_with_tools(
-            db=db, db_obj=mcp_server, obj_in=obj_in
+    async def set_tools_fingerprint(
+        self, db: AsyncSession, server_url: str, fingerprint: str
+    ):
+        await db.execute(
+            update(self.model)
+            .where(
+                and_(
+                    self.model.server_url == server_url,
+                    self.model.tools_fingerprint.is_distinct_from(fingerprint),
+                )
+            )
+            .values({"tools_fingerprint": fingerprint})
         )
+        await db.commit()
 
-    async def set_as_inactive(self, db: AsyncSession, server_url: str):
-        await db.execute(
+    async def set_is_active(
+        self, db: AsyncSession, server_url: str, is_active: bool
+    ) -> list[UUID]:
+        """
+        Returns:
+            ids of the rows whose is_active has changed
+        """
+        q = await db.execute(
             update(self.model)
-            .where(self.model.server_url == server_url)
-            .values({"is_active": False})
+            .where(
+                and_(
+                    self.model.server_url == server_url,
+                    self.model.is_active.is_not(is_active),
+                )
+            )
+            .values({"is_active": is_active})
+            .returning(self.model.id)
         )
+        changed_ids = q.scalars().all()
         await db.commit()
-        logger.info(f"Set {server_url} as inactive")
+        if changed_ids:
+            logger.info(f"Set {server_url} as {'active' if is_active else 'inactive'}")
+        return changed_ids
+
+    async def list_tool_ids_by_server_ids(
+        self, db: AsyncSession, server_ids: list[UUID]
+    ) -> list[UUID]:
+        q = await db.scalars(
+            select(MCPTool.id).where(MCPTool.mcp_server_id.in_(server_ids))
+        )
+        return q.all()
 
     async def list_active_mcp_servers(
         self, db: AsyncSession, user_id: UUID, limit: int, offset: int
@@ -191,6 +346,16 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
         q = await db.scalars(select(self.model.server_url))
         return q.all()
 
+    async def list_creator_ids_by_url(
+        self, db: AsyncSession, server_url: str
+    ) -> list[UUID]:
+        q = await db.scalars(
+            select(self.model.creator_id)
+            .where(self.model.server_url == server_url)
+            .distinct()
+        )
+        return q.all()
+
     async def add_url(
         self, db: AsyncSession, data_in: MCPCreateServer, user_model: User
     ):
@@ -219,6 +384,9 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
                 server_url=server_url,
                 creator_id=user_id,
                 is_active=mcp_server.is_active,
+                tools_fingerprint=tools_fingerprint(
+                    [t for t in mcp_server.mcp_tools if t]
+                ),
             )
             db.add(mcp_in)
             await db.flush()
@@ -5,7 +5,7 @@ from fastapi import HTTPException
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from src.auth.encrypt import decrypt_secret
+from src.auth.encrypt import decrypt_secret, secret_cache
 from src.models import ModelConfig, ModelProvider, User
 from src.repositories.base import CRUDBase
 from src.schemas.api.model_config.dto import (
@@ -289,6 +289,9 @@ class ModelConfigRepository(
         provider_obj: ModelProvider,
         upd_in: ProviderCRUDUpdate,
     ) -> ModelProvider:
+        # previous api key must not be served from the cache anymore
+        secret_cache.invalidate(provider_obj.api_key)
+
         # if provider == ollama, do not validate api_key
         if provider_obj.name.lower().strip() == "ollama":
             upd_in.api_key = None
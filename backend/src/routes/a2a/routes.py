@@ -8,6 +8,9 @@ from src.auth.dependencies import CurrentUserDependency
 from src.db.session import AsyncDBSession
 from src.repositories.a2a import a2a_repo
 from src.schemas.a2a.schemas import A2ACreateAgentSchema
+from src.utils.catalog_cache import catalog_cache
+from src.utils.enums import AgentType
+from src.utils.probe_scheduler import probe_scheduler
 
 a2a_router = APIRouter(tags=["a2a"], prefix="/a2a")
 
@@ -19,10 +22,14 @@ async def add_agent_url(
     data_in: A2ACreateAgentSchema,
 ):
     try:
-        return await a2a_repo.add_url(db=db, user_model=user_model, data_in=data_in)
+        result = await a2a_repo.add_url(db=db, user_model=user_model, data_in=data_in)
     except ValidationError as e:
         return JSONResponse(content=json.loads(e.json()), status_code=400)
 
+    await catalog_cache.bump(user_model.id)
+    await probe_scheduler.schedule(kind=AgentType.a2a.value, url=result["server_url"])
+    return result
+
 
 @a2a_router.get("/agents")
 async def list_all_agent_cards(db: AsyncDBSession, user_model: CurrentUserDependency):
@@ -52,4 +59,8 @@ async def delete_mcp_server(
             status_code=400, detail=f"MCP server with ID {str(agent_id)} was not found"
         )
 
+    await catalog_cache.bump(user_model.id)
+    # the url is probed as long as any user has it registered
+    if not await a2a_repo.list_creator_ids_by_url(db=db, server_url=is_ok.server_url):
+        await probe_scheduler.unschedule(kind=AgentType.a2a.value, url=is_ok.server_url)
     return Response(status_code=204)
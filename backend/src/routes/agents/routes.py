@@ -15,8 +15,13 @@ from src.core.settings import get_settings
 from src.db.session import AsyncDBSession
 from src.repositories.agent import agent_repo
 from src.repositories.flow import agentflow_repo
-from src.schemas.api.agent.dto import AgentDTOWithJWT, MLAgentJWTDTO
+from src.schemas.api.agent.dto import (
+    AgentDTOWithJWT,
+    AgentSearchResultDTO,
+    MLAgentJWTDTO,
+)
 from src.schemas.api.agent.schemas import AgentCRUDUpdate, AgentRegister
+from src.utils.catalog_cache import catalog_cache
 from src.utils.enums import ActiveAgentTypeFilter
 from src.utils.filters import AgentFilter
 from src.utils.helpers import get_user_id_from_jwt, map_agent_model_to_dto
@@ -38,6 +43,7 @@ async def get_active_connections(
     user_id: Optional[UUID] = Query(None),
     offset: int = 0,
     limit: int = 100,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     if not any((user_id, authorization)):
         raise HTTPException(
@@ -68,8 +74,23 @@ async def get_active_connections(
     if authorization:
         user_id = get_user_id_from_jwt(token=authorization.split(" ")[-1])
 
-    return await agent_repo.get_active_agents_by_filter(
-        db=db, agent_type=agent_type, user_id=user_id, limit=limit, offset=offset
+    catalog = await catalog_cache.get_or_build(
+        user_id=user_id,
+        agent_type=agent_type,
+        limit=limit,
+        offset=offset,
+        build=lambda: agent_repo.get_active_agents_by_filter(
+            db=db, agent_type=agent_type, user_id=user_id, limit=limit, offset=offset
+        ),
+    )
+    headers = {"ETag": catalog.etag}
+    if if_none_match and catalog.etag in (
+        tag.strip() for tag in if_none_match.split(",")
+    ):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=catalog.body, media_type="application/json", headers=headers
     )
 
 
@@ -105,6 +126,20 @@ async def list_all_agents(
     return response
 
 
+@agent_router.get("/search", response_model=list[AgentSearchResultDTO])
+async def search_agents(
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+    q: str = Query(min_length=1),
+    offset: int = 0,
+    limit: int = 100,
+):
+    """Genai agents, MCP tools and A2A cards matching the query, best matches first."""
+    return await agent_repo.search_platform_agents(
+        db=db, user_id=user.id, query=q, limit=limit, offset=offset
+    )
+
+
 @agent_router.get("/{agent_id}")
 async def get_data(
     db: AsyncDBSession,
@@ -140,6 +175,7 @@ async def register_agent(
         agent_with_token = await agent_repo.create_by_user(
             db=db, obj_in=agent_in, user_model=user
         )
+        await catalog_cache.bump(user.id)
         return agent_with_token
     except IntegrityError:
         logger.debug(traceback.format_exc())
@@ -175,6 +211,7 @@ async def update_agent(
     agent = await agent_repo.update_by_user(
         db=db, id_=agent_id, user=user, obj_in=agent_upd_data
     )
+    await catalog_cache.bump(user.id)
     return map_agent_model_to_dto(agent=agent).model_dump(
         mode="json", exclude_none=True
     )
@@ -193,4 +230,5 @@ async def delete_agent(
     if not is_ok:
         raise HTTPException(status_code=400, detail=f"Agent {agent_id} was not found")
 
+    await catalog_cache.bump(user.id)
     return Response(status_code=204)
@@ -8,6 +8,7 @@ from src.db.session import AsyncDBSession
 from src.repositories.chat import chat_repo
 from src.schemas.api.chat.schemas import CreateConversation, UpdateConversation
 from src.utils.helpers import get_user_id_from_jwt
+from src.utils.invalidation import invalidation_bus
 
 chat_router = APIRouter(tags=["chat"])
 settings = get_settings()
@@ -123,4 +124,5 @@ async def delete_chat(
             detail=f"Chat with session_id: '{session_id}' does not exist",
         )
 
+    await invalidation_bus.invalidate(user_id=user_model.id, reason="chat deleted")
     return Response(status_code=204)
@@ -9,6 +9,7 @@ from src.db.session import AsyncDBSession
 from src.repositories.flow import agentflow_repo
 from src.schemas.api.flow.dto import AgentFlowDTO
 from src.schemas.api.flow.schemas import AgentFlowCreate, AgentFlowUpdate
+from src.utils.catalog_cache import catalog_cache
 
 flow_router = APIRouter(tags=["agentflows"], prefix="/agentflows")
 
@@ -48,6 +49,7 @@ async def register_agentflow(
     result = await agentflow_repo.create_by_user(
         db=db, obj_in=agentflow_in, user_model=user
     )
+    await catalog_cache.bump(user.id)
     return result
 
 
@@ -66,6 +68,7 @@ async def update_agentflow(
             status_code=400, detail=f"Agentflow with ID '{agentflow_id}' was not found"
         )
 
+    await catalog_cache.bump(user.id)
     return agentflow
 
 
@@ -81,4 +84,5 @@ async def delete_agentflow(
             status_code=400, detail=f"agentflow {agentflow_id} was not found"
         )
 
+    await catalog_cache.bump(user.id)
     return Response(status_code=204)
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from src.auth.dependencies import validate_master_be_api_key
+from src.db.session import run_in_session
+from src.repositories.agent import agent_repo
+from src.repositories.chat import chat_repo
+from src.repositories.files import files_repo
+from src.schemas.api.chat.dto import TurnContextDTO
+from src.utils.catalog_cache import catalog_cache
+from src.utils.enums import ActiveAgentTypeFilter
+
+internal_router = APIRouter(
+    tags=["Internal"],
+    prefix="/internal",
+    dependencies=[Depends(validate_master_be_api_key)],
+)
+
+
+@internal_router.get("/turn-context", response_model=TurnContextDTO)
+async def get_turn_context(
+    session_id: UUID = Query(),
+    user_id: UUID = Query(),
+    request_id: Optional[UUID] = Query(None),
+    max_last_messages: int = Query(5, ge=1),
+    agent_type: ActiveAgentTypeFilter = Query(ActiveAgentTypeFilter.all),
+    limit: int = 100,
+):
+    """
+    Everything the master agent needs to run a chat turn in one response:
+    last messages of the chat, active agents catalog and files of the request.
+    Each part is queried concurrently in its own db session, the catalog is served from cache when unchanged.
+    """
+    get_messages = run_in_session(
+        chat_repo.get_last_messages,
+        user_id=user_id,
+        session_id=session_id,
+        limit=max_last_messages,
+    )
+    get_catalog = catalog_cache.get_or_build(
+        user_id=user_id,
+        agent_type=agent_type,
+        limit=limit,
+        offset=0,
+        build=lambda: run_in_session(
+            agent_repo.get_active_agents_by_filter,
+            agent_type=agent_type,
+            user_id=user_id,
+            limit=limit,
+            offset=0,
+        ),
+    )
+    if request_id:
+        get_files = run_in_session(
+            files_repo.list_files_by_request_id, request_id=str(request_id)
+        )
+    else:
+        get_files = asyncio.sleep(0, result=[])
+
+    messages, catalog, files = await asyncio.gather(
+        get_messages, get_catalog, get_files
+    )
+    return TurnContextDTO(
+        messages=messages,
+        agents=catalog.agents,
+        files=files,
+        catalog_version=catalog.etag,
+    )
@@ -25,6 +25,7 @@ from src.schemas.api.model_config.schemas import (
 )
 from src.utils.constants import DEFAULT_SYSTEM_PROMPT
 from src.utils.helpers import prettify_integrity_error_details
+from src.utils.invalidation import invalidation_bus
 
 logger = logging.getLogger(__name__)
 llm_router = APIRouter(prefix="/llm", tags=["LLM"])
@@ -112,9 +113,13 @@ async def update_model_config(
     model_config_id: UUID,
     model_config_in: ModelConfigUpdate,
 ):
-    return await model_config_repo.update_model_config_with_encryption(
+    model_config = await model_config_repo.update_model_config_with_encryption(
         db=db, id_=model_config_id, user_model=user_model, obj_in=model_config_in
     )
+    await invalidation_bus.invalidate(
+        user_id=user_model.id, reason="model config updated"
+    )
+    return model_config
 
 
 @llm_router.patch("/model/providers/{provider_name}")
@@ -135,6 +140,7 @@ async def update_provider(
     p = await model_config_repo.update_provider(
         db=db, provider_obj=provider, upd_in=provider_upd_in
     )
+    await invalidation_bus.invalidate(user_id=user_model.id, reason="provider updated")
     return ModelProviderUpdateDTO(
         id=p.id,
         api_key=p.api_key,
@@ -155,6 +161,9 @@ async def delete_model_config(
         db=db, id_=model_config_id, user=user_model
     )
     if is_ok:
+        await invalidation_bus.invalidate(
+            user_id=user_model.id, reason="model config deleted"
+        )
         return Response(status_code=204)
 
 
@@ -1,21 +1,20 @@
-from typing import Optional, Union, Annotated
+from typing import AsyncIterator, Optional, Union, Annotated
 from uuid import UUID
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from src.auth.dependencies import CurrentUserDependency
-from src.schemas.ws.log import LogEntryDTO
-from src.db.session import AsyncDBSession
+from src.schemas.ws.log import LogCursorPageDTO, LogEntryDTO, LogIngestionStatsDTO
+from src.db.session import AsyncDBSession, async_session
+from src.utils.enums import LogLevel
 from src.repositories.log import log_repo
+from src.core.settings import get_settings
+
+settings = get_settings()
 
 log_router = APIRouter(tags=["Logs"], prefix="/logs")
 
 
-@log_router.get("/list")
-async def get_logs_by_session_id(
-    db: AsyncDBSession,
-    user: CurrentUserDependency,
-    request_id: Annotated[Union[UUID, None], Query] = None,
-    session_id: Annotated[Union[UUID, None], Query] = None,
-) -> list[Optional[LogEntryDTO]]:
+def validate_lookup_params(request_id: Optional[UUID], session_id: Optional[UUID]):
     params = (request_id, session_id)
     if all(params):
         raise HTTPException(
@@ -28,12 +27,82 @@ async def get_logs_by_session_id(
             detail="Either 'request_id' or 'session_id' must be provided",
         )
 
+
+@log_router.get("/list")
+async def get_logs_by_session_id(
+    db: AsyncDBSession,
+    user: CurrentUserDependency,
+    request_id: Annotated[Union[UUID, None], Query] = None,
+    session_id: Annotated[Union[UUID, None], Query] = None,
+) -> list[Optional[LogEntryDTO]]:
+    validate_lookup_params(request_id=request_id, session_id=session_id)
+
     if session_id:
         session_id = str(session_id)
         # TODO: lookup by user
-        return await log_repo.list_by_session_id(db=db, id_=session_id)
+        return await log_repo.list_by_session_id(
+            db=db, id_=session_id, retention_days=settings.LOG_RETENTION_DAYS
+        )
 
     if request_id:
         request_id = str(request_id)
         # TODO: lookup by user
-        return await log_repo.list_by_request_id(db=db, id_=request_id)
+        return await log_repo.list_by_request_id(
+            db=db, id_=request_id, retention_days=settings.LOG_RETENTION_DAYS
+        )
+
+
+@log_router.get("/page", response_model=LogCursorPageDTO)
+async def get_logs_page(
+    db: AsyncDBSession,
+    user: CurrentUserDependency,
+    request_id: Annotated[Union[UUID, None], Query] = None,
+    session_id: Annotated[Union[UUID, None], Query] = None,
+    min_level: Annotated[Union[LogLevel, None], Query] = None,
+    cursor: Annotated[Union[str, None], Query] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    validate_lookup_params(request_id=request_id, session_id=session_id)
+    return await log_repo.get_page(
+        db=db,
+        user_id=user.id,
+        limit=limit,
+        cursor=cursor,
+        session_id=str(session_id) if session_id else None,
+        request_id=str(request_id) if request_id else None,
+        min_level=min_level,
+        retention_days=settings.LOG_RETENTION_DAYS,
+    )
+
+
+@log_router.get("/stream")
+async def stream_logs(
+    user: CurrentUserDependency,
+    request_id: Annotated[Union[UUID, None], Query] = None,
+    session_id: Annotated[Union[UUID, None], Query] = None,
+    min_level: Annotated[Union[LogLevel, None], Query] = None,
+):
+    """Stream logs as newline delimited json, one log per line."""
+    validate_lookup_params(request_id=request_id, session_id=session_id)
+    user_id = user.id
+
+    async def ndjson_logs() -> AsyncIterator[str]:
+        # request scoped db session is closed before the response body is sent,
+        # so the stream has to own its session
+        async with async_session() as db:
+            async for log in log_repo.stream(
+                db=db,
+                user_id=user_id,
+                session_id=str(session_id) if session_id else None,
+                request_id=str(request_id) if request_id else None,
+                min_level=min_level,
+                retention_days=settings.LOG_RETENTION_DAYS,
+            ):
+                yield f"{log.model_dump_json()}\n"
+
+    return StreamingResponse(ndjson_logs(), media_type="application/x-ndjson")
+
+
+@log_router.get("/ingestion/stats", response_model=LogIngestionStatsDTO)
+async def get_log_ingestion_stats(request: Request, user: CurrentUserDependency):
+    return request.app.state.log_buffer.stats()
@@ -8,6 +8,9 @@ from src.auth.dependencies import CurrentUserDependency
 from src.db.session import AsyncDBSession
 from src.repositories.mcp import mcp_repo
 from src.schemas.mcp.schemas import MCPCreateServer
+from src.utils.catalog_cache import catalog_cache
+from src.utils.enums import AgentType
+from src.utils.probe_scheduler import probe_scheduler
 
 mcp_router = APIRouter(tags=["mcp"], prefix="/mcp")
 
@@ -17,10 +20,14 @@ async def add_server_url(
     db: AsyncDBSession, user_model: CurrentUserDependency, data_in: MCPCreateServer
 ):
     try:
-        return await mcp_repo.add_url(db=db, user_model=user_model, data_in=data_in)
+        result = await mcp_repo.add_url(db=db, user_model=user_model, data_in=data_in)
     except ValidationError as e:
         return JSONResponse(content=json.loads(e.json()), status_code=400)
 
+    await catalog_cache.bump(user_model.id)
+    await probe_scheduler.schedule(kind=AgentType.mcp.value, url=result.server_url)
+    return result
+
 
 @mcp_router.get("/servers")
 async def list_all_mcp_servers(
@@ -53,4 +60,8 @@ async def delete_mcp_server(
             status_code=400, detail=f"MCP server with ID {str(server_id)} was not found"
         )
 
+    await catalog_cache.bump(user_model.id)
+    # the url is probed as long as any user has it registered
+    if not await mcp_repo.list_creator_ids_by_url(db=db, server_url=is_ok.server_url):
+        await probe_scheduler.unschedule(kind=AgentType.mcp.value, url=is_ok.server_url)
     return Response(status_code=204)
@@ -1,3 +1,4 @@
+import asyncio
 import copy
 import logging
 import traceback
@@ -8,9 +9,11 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
 from genai_session.session import AgentResponse, GenAISession
 from genai_session.utils.naming_enums import MasterServerName
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.settings import get_settings
-from src.db.session import AsyncDBSession
+from src.db.session import AsyncDBSession, async_session
+from src.models import User
 from src.repositories.chat import chat_repo
 from src.repositories.files import files_repo
 from src.repositories.model_config import model_config_repo
@@ -22,10 +25,13 @@ from src.schemas.ws.frontend import (
     LLMPropertiesDecryptCreds,
 )
 from src.schemas.ws.ml import OutgoingMLRequestSchema
+from src.utils.agent_invoke import invoke_agent
 from src.utils.enums import SenderType
+from src.utils.log_subscriptions import LogSubscriptionHub
+from src.utils.session_context import SessionContext
 from src.utils.validate_uuid import is_valid_uuid
 from src.utils.validation_error_handler import validation_exception_handler
-from src.utils.websocket import get_current_ws_user
+from src.utils.websocket import FrontendConnection, get_current_ws_user
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -136,10 +142,20 @@ async def handle_frontend_ws(
             )
             return
 
-    websocket.app.state.frontend_ws = websocket
     await websocket.accept()
+    connection = FrontendConnection(websocket=websocket)
+    # agent logs of this session are pushed to the socket while it is connected
+    log_hub: LogSubscriptionHub = websocket.app.state.log_hub
+    log_hub.subscribe(session_id=session_id, connection=connection)
 
     session: GenAISession = websocket.app.state.genai_session
+    context = SessionContext(
+        user_id=user_model.id, ttl_seconds=settings.SESSION_CONTEXT_CACHE_TTL_SECONDS
+    )
+
+    # messages are handled concurrently, a slow master agent run doesn't block the next messages
+    in_flight = asyncio.Semaphore(settings.FRONTEND_WS_MAX_IN_FLIGHT)
+    tasks: set[asyncio.Task] = set()
 
     try:
         while True:
@@ -148,170 +164,254 @@ async def handle_frontend_ws(
                     await websocket.receive_text()
                 )
             except ValidationError as e:
-                await websocket.send_text(
+                await connection.send_text(
                     f"Message validation failed. Details: {validation_exception_handler(exc=e)}"  # noqa: E501
                 )
-            chat_title = message_obj.message[:20]
-            if not chat_title:
-                chat_title = "New Chat"
+                continue
 
-            chat = await chat_repo.get_chat_by_session_id(
-                db=db, session_id=session_id, user_model=user_model
-            )
-            if not chat:
-                await chat_repo.create_chat_by_session_id(
-                    db=db,
-                    user_model=user_model,
-                    session_id=session_id,
-                    initial_user_message=chat_title,
-                )
-
-            request_id = str(uuid4())
-            file_ids = message_obj.files
-            if file_ids:
-                files = await files_repo.enrich_files_with_session_request_id(
-                    db=db,
-                    file_ids=file_ids,
+            # stop reading from the socket until one of the in flight requests completes
+            await in_flight.acquire()
+            task = asyncio.create_task(
+                handle_frontend_message(
+                    connection=connection,
+                    session=session,
+                    message_obj=message_obj,
                     session_id=session_id,
-                    request_id=request_id,
                     user_model=user_model,
+                    context=context,
                 )
-            else:
-                files = []
-
-            provider = await model_config_repo.get_provider_by_name(
-                db=db, provider_name=message_obj.provider, user_id=user_model.id
             )
-            if not provider:
-                await websocket.send_json(
-                    {"error": f"Provider {message_obj.provider} does not exist"}
-                )
-                await websocket.close(
-                    code=status.WS_1003_UNSUPPORTED_DATA,
-                    reason=f"Provider {message_obj.provider} does not exist",
-                )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda _: in_flight.release())
 
-            config = await model_config_repo.find_model_by_config_name(
-                db=db, config_name=message_obj.llm_name, user_model=user_model
-            )
-            if not config:
-                await websocket.send_json(
-                    {"error": f"Config {message_obj.llm_name} does not exist"}
-                )
-                await websocket.close(
-                    code=status.WS_1003_UNSUPPORTED_DATA,
-                    reason=f"Config {message_obj.llm_name} does not exist",
-                )
-            try:
-                enriched_llm_props = LLMPropertiesDecryptCreds(
-                    config_name=config.name,
-                    provider=provider.name,
-                    model=config.model,
-                    temperature=config.temperature,
-                    system_prompt=config.system_prompt,
-                    user_prompt=config.user_prompt,
-                    credentials={
-                        **config.credentials,
-                        **provider.provider_metadata,
-                        "api_key": provider.api_key,
-                    },
-                    max_last_messages=config.max_last_messages,
-                )
-            except ValueError:
-                await websocket.send_json(
-                    {
-                        "error": "Could not decrypt api_key. Make sure 'api_key' exists and model config was created beforehand "  # noqa: E501
-                    }
-                )
-                return
+    except ValueError as e:
+        await connection.send_text(
+            f"Message validation failed. Incorrect value was provided. Details: {str(e)}"
+        )
 
-            await chat_repo.add_message_to_conversation(
+    except WebSocketDisconnect:
+        logger.warning("Frontend client disconnected")
+
+    except Exception:
+        logger.error(
+            f"Unexpected error occured. Traceback: {traceback.format_exc(limit=600)}"
+        )
+
+    finally:
+        log_hub.unsubscribe(session_id=session_id, connection=connection)
+        # let the requests in flight finish, so that master agent responses are still saved to the chat
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def handle_frontend_message(
+    connection: FrontendConnection,
+    session: GenAISession,
+    message_obj: IncomingFrontendMessage,
+    session_id: str,
+    user_model: User,
+    context: SessionContext,
+):
+    """
+    Proxy a single frontend message to the master agent and send its response back.
+    Runs concurrently with other messages of the same socket, so it uses its own db session
+    and tags every frame it sends with the request_id.
+    """
+    request_id = str(uuid4())
+    try:
+        async with async_session() as db:
+            await process_frontend_message(
                 db=db,
-                user_model=user_model,
+                connection=connection,
+                session=session,
+                message_obj=message_obj,
                 session_id=session_id,
                 request_id=request_id,
-                message_in=CreateChatMessage(
-                    sender_type=SenderType.user, content=message_obj.message
-                ),
+                user_model=user_model,
+                context=context,
             )
+    except ConnectionRefusedError:
+        logger.critical(
+            f"Cannot connect to the router service at '{settings.ROUTER_WS_URL}'. Make sure it is running and envs are configured correctly"  # noqa: E501
+        )
+        await send_error(
+            connection=connection,
+            request_id=request_id,
+            error="Cannot connect to router service. Try again later",
+        )
+        # none of the requests of the socket can be served without the router
+        await connection.close(code=status.WS_1011_INTERNAL_ERROR)
+    except Exception:
+        logger.error(f"Unexpected error occured: {traceback.format_exc()}")
+        await send_error(
+            connection=connection,
+            request_id=request_id,
+            error="Unexpected error occured. Try again later",
+        )
+        # the socket stays open for the other requests in flight and the log subscription
 
-            ml_request = OutgoingMLRequestSchema(
-                user_id=user_model.id,
-                session_id=session_id,
-                timestamp=int(datetime.now().timestamp()),
-                configs=enriched_llm_props.to_json(),
-                files=files,
-            )
-            req_body = ml_request.model_dump(exclude_none=True)
 
-            try:
-                session.request_id = request_id
-                session.session_id = session_id
-                response: AgentResponse = await session.send(
-                    client_id=MasterServerName.MASTER_SERVER_ML.value,
-                    message=req_body,
-                )
-                agent_response = AgentResponseDTO(
-                    execution_time=response.execution_time,
-                    response=response.response,
-                    request_id=request_id,
-                    session_id=session_id,
-                )
-                await chat_repo.add_message_to_conversation(
+async def send_error(connection: FrontendConnection, request_id: str, error: str):
+    try:
+        await connection.send_json({"error": error, "request_id": request_id})
+    except Exception:
+        # socket is already closed
+        logger.debug(f"Could not send error of request '{request_id}' to frontend")
+
+
+async def process_frontend_message(
+    db: AsyncSession,
+    connection: FrontendConnection,
+    session: GenAISession,
+    message_obj: IncomingFrontendMessage,
+    session_id: str,
+    request_id: str,
+    user_model: User,
+    context: SessionContext,
+):
+    """
+    Provider, model config and chat existence are taken from the connection's `context`
+    and only looked up on the first turn or after they were invalidated.
+    """
+    chat_title = message_obj.message[:20]
+    if not chat_title:
+        chat_title = "New Chat"
+
+    if not context.chat_exists:
+        async with context.chat_lock:
+            generation = context.generation
+            chat = await chat_repo.get_chat_by_session_id(
+                db=db, session_id=session_id, user_model=user_model
+            )
+            if not chat:
+                await chat_repo.create_chat_by_session_id(
                     db=db,
                     user_model=user_model,
                     session_id=session_id,
-                    request_id=request_id,
-                    message_in=CreateChatMessage(
-                        sender_type=SenderType.master_agent,
-                        content=agent_response.response,
-                    ),
+                    initial_user_message=chat_title,
                 )
+            context.set_chat_exists(generation=generation)
 
-                files_by_request_id = await files_repo.list_files_by_request_id(
-                    db=db, request_id=request_id
-                )
-                response_with_files = AgentResponseWithFilesDTO(
-                    **agent_response.model_dump(mode="json"),
-                    files=files_by_request_id,
-                )
+    file_ids = message_obj.files
+    if file_ids:
+        files = await files_repo.enrich_files_with_session_request_id(
+            db=db,
+            file_ids=file_ids,
+            session_id=session_id,
+            request_id=request_id,
+            user_model=user_model,
+        )
+    else:
+        files = []
 
-                response_structure = AgentTypeResponseDTO(
-                    type="agent_response", response=response_with_files
-                )
-                await websocket.send_text(response_structure.model_dump_json())
-            except ConnectionRefusedError:
-                logger.critical(
-                    f"Cannot connect to the router service at '{settings.ROUTER_WS_URL}'. Make sure it is running and envs are configured correctly"  # noqa: E501
-                )
-                await websocket.send_json(
-                    {"error": "Cannot connect to router service. Try again later"}
-                )
-                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
-                raise ConnectionRefusedError(
-                    "Cannot connect to router service. Make sure it is running and envs are configured correctly"
-                )
-            except Exception:
-                logger.error(f"Unexpected error occured: {traceback.format_exc()}")
-                await websocket.send_json(
-                    {"error": "Unexpected error occured. Try again later"}
-                )
-                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    enriched_llm_props = context.get_llm_props(
+        provider=message_obj.provider, config_name=message_obj.llm_name
+    )
+    if not enriched_llm_props:
+        generation = context.generation
+        provider = await model_config_repo.get_provider_by_name(
+            db=db, provider_name=message_obj.provider, user_id=user_model.id
+        )
+        if not provider:
+            await send_error(
+                connection=connection,
+                request_id=request_id,
+                error=f"Provider {message_obj.provider} does not exist",
+            )
+            return
 
-    except ValidationError as e:
-        logger.debug(traceback.format_exc())
-        await websocket.send_text(
-            f"Message validation failed. Details: {validation_exception_handler(exc=e)}"  # TODO: returned message on exc is not informative # noqa: E501
+        config = await model_config_repo.find_model_by_config_name(
+            db=db, config_name=message_obj.llm_name, user_model=user_model
         )
-    except ValueError as e:
-        await websocket.send_text(
-            f"Message validation failed. Incorrect value was provided. Details: {str(e)}"
+        if not config:
+            await send_error(
+                connection=connection,
+                request_id=request_id,
+                error=f"Config {message_obj.llm_name} does not exist",
+            )
+            return
+        try:
+            enriched_llm_props = LLMPropertiesDecryptCreds(
+                config_name=config.name,
+                provider=provider.name,
+                model=config.model,
+                temperature=config.temperature,
+                system_prompt=config.system_prompt,
+                user_prompt=config.user_prompt,
+                credentials={
+                    **config.credentials,
+                    **provider.provider_metadata,
+                    "api_key": provider.api_key,
+                },
+                max_last_messages=config.max_last_messages,
+            )
+        except ValueError:
+            await send_error(
+                connection=connection,
+                request_id=request_id,
+                error="Could not decrypt api_key. Make sure 'api_key' exists and model config was created beforehand ",  # noqa: E501
+            )
+            return
+        context.set_llm_props(
+            provider=message_obj.provider,
+            config_name=message_obj.llm_name,
+            props=enriched_llm_props,
+            generation=generation,
         )
 
-    except WebSocketDisconnect:
-        logger.warning("Frontend client disconnected")
+    await chat_repo.add_message_to_conversation(
+        db=db,
+        user_model=user_model,
+        session_id=session_id,
+        request_id=request_id,
+        message_in=CreateChatMessage(
+            sender_type=SenderType.user, content=message_obj.message
+        ),
+    )
 
-    except Exception:
-        logger.error(
-            f"Unexpected error occured. Traceback: {traceback.format_exc(limit=600)}"
-        )
+    ml_request = OutgoingMLRequestSchema(
+        user_id=user_model.id,
+        session_id=session_id,
+        timestamp=int(datetime.now().timestamp()),
+        configs=enriched_llm_props.to_json(),
+        files=files,
+    )
+    req_body = ml_request.model_dump(exclude_none=True)
+
+    response: AgentResponse = await invoke_agent(
+        session=session,
+        client_id=MasterServerName.MASTER_SERVER_ML.value,
+        message=req_body,
+        request_id=request_id,
+        session_id=session_id,
+    )
+    agent_response = AgentResponseDTO(
+        execution_time=response.execution_time,
+        response=response.response,
+        request_id=request_id,
+        session_id=session_id,
+    )
+    await chat_repo.add_message_to_conversation(
+        db=db,
+        user_model=user_model,
+        session_id=session_id,
+        request_id=request_id,
+        message_in=CreateChatMessage(
+            sender_type=SenderType.master_agent,
+            content=agent_response.response,
+        ),
+    )
+
+    files_by_request_id = await files_repo.list_files_by_request_id(
+        db=db, request_id=request_id
+    )
+    response_with_files = AgentResponseWithFilesDTO(
+        **agent_response.model_dump(mode="json"),
+        files=files_by_request_id,
+    )
+
+    response_structure = AgentTypeResponseDTO(
+        type="agent_response", response=response_with_files
+    )
+    await connection.send_text(response_structure.model_dump_json())
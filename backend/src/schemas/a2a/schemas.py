@@ -65,6 +65,8 @@ class A2AAgentCard(BaseModel):
 class A2AAgentCardSchema(BaseModel):
     card: Optional[A2AAgentCard] = None
     is_active: bool
+    # False when the agent responded with 304, card is not sent again
+    is_modified: bool = True
 
 
 class A2ACreateAgentSchema(BaseModel):
@@ -37,6 +37,19 @@ class AgentsDTO(BaseModel):
     agents: List[AgentDTO]
 
 
+class AgentSearchResultDTO(BaseModel):
+    type: AgentType
+    id: UUID
+    name: Optional[str] = None
+    alias: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+    is_active: bool
+    created_at: datetime
+    # trigram similarity of the query, from 0 to 1
+    rank: float
+
+
 class ActiveAgentsDTO(BaseModel):
     count_active_connections: int
     active_connections: List[Optional[Dict[str, Any]]]
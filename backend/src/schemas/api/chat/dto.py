@@ -1,7 +1,11 @@
 from datetime import datetime
 
+from typing import Optional
+
 from pydantic import BaseModel
+from src.schemas.api.agent.dto import ActiveAgentsDTO
 from src.schemas.api.chat.schemas import GetChatMessage
+from src.schemas.api.files.dto import FileDTO
 from src.schemas.base import CastSessionIDToStrModel
 
 
@@ -17,3 +21,12 @@ class ListChatsDTO(BaseModel):
 
 class ChatDetailsDTO(BaseChatDTO):
     messages: list[GetChatMessage]
+
+
+class TurnContextDTO(BaseModel):
+    # last messages of the chat, oldest first
+    messages: list[GetChatMessage]
+    agents: ActiveAgentsDTO
+    files: Optional[list[FileDTO]] = []
+    # etag of the agents catalog, changes whenever the catalog does
+    catalog_version: Optional[str] = None
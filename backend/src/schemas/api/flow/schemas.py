@@ -1,15 +1,81 @@
 from datetime import datetime
-from typing import Optional, Self, Union
+from typing import Iterator, Optional, Self, Union
 from uuid import UUID
 
+import jmespath
 from fastapi import HTTPException
-from pydantic import BaseModel, field_validator, model_validator
+from jmespath.exceptions import JMESPathError
+from pydantic import BaseModel, field_validator, model_serializer, model_validator
 from src.utils.enums import AgentType
 
 
+def binding_step_references(
+    node: dict, at_root: bool = True
+) -> Iterator[Optional[int]]:
+    """
+    Steps referenced by a parsed jmespath binding: the index of every `steps[<index>]` evaluated against
+    the root of the binding context, None for any other access to `steps` (the whole list, projections,
+    slices, negative indexes, the whole context as `@`), which would read outputs of steps that may not be done yet.
+    """
+    node_type = node["type"]
+    # children of slices are their bounds
+    children = [child for child in node.get("children", []) if isinstance(child, dict)]
+    if node_type == "field":
+        if at_root and node["value"] == "steps":
+            yield None
+        return
+    if node_type in ("current", "identity"):
+        if at_root:
+            yield None
+        return
+    if not children:
+        return
+
+    left, *rest = children
+    if (
+        node_type == "index_expression"
+        and at_root
+        and left["type"] == "field"
+        and left["value"] == "steps"
+    ):
+        index = rest[0]
+        yield (
+            index["value"] if index["type"] == "index" and index["value"] >= 0 else None
+        )
+        rest = rest[1:]
+        rest_at_root = False
+    elif node_type in ("subexpression", "pipe", "index_expression"):
+        # the right side is evaluated against the result of the left one, `@.steps` is the same as `steps`
+        if left["type"] not in ("current", "identity"):
+            yield from binding_step_references(left, at_root)
+        rest_at_root = at_root and left["type"] in ("current", "identity")
+    elif node_type in (
+        "projection",
+        "value_projection",
+        "filter_projection",
+        "flatten",
+    ):
+        # the right side and the filter are evaluated against the projected elements
+        yield from binding_step_references(left, at_root)
+        rest_at_root = False
+    elif node_type == "expref":
+        rest, rest_at_root = children, False
+    else:
+        rest, rest_at_root = children, at_root
+
+    for child in rest:
+        yield from binding_step_references(child, rest_at_root)
+
+
 class FlowAgentId(BaseModel):
     id: str = None
     type: str = None
+    # positions of the earlier steps of the flow this step waits for.
+    # None: the previous step, as in a linear flow. Empty list: no dependencies, starts with the flow
+    depends_on: Optional[list[int]] = None
+    # arguments of the step as jmespath expressions over the flow input and outputs of earlier steps,
+    # e.g. {"field": "input.field", "data": "steps[0].records"}. Steps with bindings are called without the LLM
+    bindings: Optional[dict[str, str]] = None
 
     @field_validator("id")
     def validate_id_is_uuid(cls, v) -> str:
@@ -32,11 +98,22 @@ class FlowAgentId(BaseModel):
 
         return v
 
+    @model_serializer(mode="wrap")
+    def drop_unset_flow_options(self, handler) -> dict:
+        # steps of linear flows are stored and returned as {"id", "type"}, as before dependencies and bindings
+        data = handler(self)
+        for option in ("depends_on", "bindings"):
+            if data.get(option) is None:
+                data.pop(option, None)
+        return data
+
     def to_json(self) -> dict:
-        return {
-            "id": self.id,
-            "type": self.type
-        }
+        data = {"id": self.id, "type": self.type}
+        if self.depends_on is not None:
+            data["depends_on"] = self.depends_on
+        if self.bindings is not None:
+            data["bindings"] = self.bindings
+        return data
 
 
 class AgentFlowBase(BaseModel):
@@ -59,6 +136,59 @@ class AgentFlowCreate(AgentFlowBase):
             return v
         raise ValueError("Agentflow must contain more than 1 agent")
 
+    @model_validator(mode="after")
+    def check_flow_dependencies(self) -> Self:
+        # steps may only depend on earlier steps, so the flow is acyclic and its order is a valid execution order
+        for position, agent in enumerate(self.flow):
+            depends_on = agent.depends_on or []
+            if len(set(depends_on)) != len(depends_on) or any(
+                not 0 <= dependency < position for dependency in depends_on
+            ):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Step {position} of the flow must depend only on earlier steps, got {depends_on}",
+                )
+        return self
+
+    @model_validator(mode="after")
+    def check_flow_bindings(self) -> Self:
+        # bindings may only reference outputs of the steps that are done before the step starts
+        ancestors: list[set[int]] = []
+        for position, agent in enumerate(self.flow):
+            if agent.depends_on is not None:
+                depends_on = agent.depends_on
+            else:
+                depends_on = [position - 1] if position else []
+            ancestors.append(set(depends_on).union(*(ancestors[d] for d in depends_on)))
+
+            for argument, expression in (agent.bindings or {}).items():
+                if not expression.strip():
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Binding '{argument}' of step {position} must not be empty",
+                    )
+                try:
+                    parsed = jmespath.compile(expression).parsed
+                except JMESPathError as e:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Binding '{argument}' of step {position} is not a valid JMESPath expression: {e}",
+                    )
+                steps = set(binding_step_references(parsed))
+                if None in steps:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Binding '{argument}' of step {position} must reference outputs of steps"
+                        f" by a literal non-negative index, e.g. steps[0]",
+                    )
+                if unknown_steps := steps - ancestors[position]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Binding '{argument}' of step {position} references steps {sorted(unknown_steps)}"
+                        f" the step does not depend on",
+                    )
+        return self
+
     @model_validator(mode="after")
     def check_if_inputs_are_empty(self) -> Self:
         if not self.name:
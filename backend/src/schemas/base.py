@@ -37,6 +37,10 @@ class AgentDTOPayload(BaseUUIDToStrModel):
     url: Optional[AnyHttpUrl] = None
     agent_schema: dict
     flow: Optional[list] = None
+    # positions of the steps each step of the flow depends on, None for linear flows
+    flow_dependencies: Optional[list[list[int]]] = None
+    # argument bindings of each step of the flow, None if no step has them
+    flow_bindings: Optional[list[Optional[dict[str, str]]]] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     is_active: Optional[bool] = None
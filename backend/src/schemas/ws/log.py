@@ -12,7 +12,7 @@ class LogBase(BaseModel):
 
 
 class LogCreate(LogBase):
-    creator_id: Optional[str] = None
+    creator_id: Optional[Union[str, UUID]] = None
     agent_id: str
 
 
@@ -29,6 +29,37 @@ class LogEntryDTO(LogEntry):
     pass
 
 
+class LogCursorPageDTO(BaseModel):
+    items: list[LogEntryDTO]
+    # opaque cursor of the last returned log, None when there are no more logs
+    next_cursor: Optional[str] = None
+
+
 class FrontendLogEntryDTO(BaseModel):
     type: str  # TODO: enum
     log: LogEntry
+
+
+class FrontendLogBatchDTO(BaseModel):
+    type: str  # TODO: enum
+    logs: list[LogEntry]
+
+
+class LogIngestionStatsDTO(BaseModel):
+    queue_size: int
+    max_size: int
+    overflow_policy: str
+    enqueued: int
+    inserted: int
+    dropped: int
+    spilled: int
+    # spilled logs inserted by replays
+    replayed: int
+    failed_flushes: int
+    last_batch_size: int
+    last_flush_at: Optional[datetime] = None
+    # age of the oldest log of the last flushed batch at the moment it was committed
+    ingestion_lag_ms: float
+    max_ingestion_lag_ms: float
+    # age of the oldest log which is still waiting in the buffer
+    oldest_pending_ms: float
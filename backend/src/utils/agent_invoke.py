@@ -0,0 +1,67 @@
+import asyncio
+import json
+from typing import Optional
+
+import websockets
+from genai_session.session import AgentResponse, GenAISession
+from genai_session.utils.naming_enums import WSMessageType
+
+
+async def invoke_agent(
+    session: GenAISession,
+    client_id: str,
+    message: dict,
+    request_id: str,
+    session_id: str,
+    close_timeout: Optional[int] = None,
+) -> AgentResponse:
+    """
+    Request scoped counterpart of `GenAISession.send`.
+
+    `GenAISession.send` takes request_id and session_id from the session object itself,
+    so concurrent requests sharing one session overwrite each other's ids.
+    Here they are passed per call and the shared session is only used for its credentials and router url.
+    """
+    headers = {"x-custom-invoke-key": f"{session.agent_id}:{client_id}"}
+
+    async with websockets.connect(session.ws_url, additional_headers=headers) as ws:
+        await ws.send(
+            json.dumps(
+                {
+                    "message_type": WSMessageType.AGENT_INVOKE.value,
+                    "agent_uuid": client_id,
+                    "request_payload": {**message},
+                    "request_metadata": {
+                        "request_id": request_id,
+                        "session_id": session_id,
+                    },
+                }
+            )
+        )
+
+        while True:
+            try:
+                msg = (
+                    await asyncio.wait_for(ws.recv(), timeout=close_timeout)
+                    if close_timeout
+                    else await ws.recv()
+                )
+            except asyncio.TimeoutError:
+                return AgentResponse(
+                    is_success=False, execution_time=0, response="Request timed out"
+                )
+
+            body = json.loads(msg)
+            message_type = body.get("message_type")
+            if message_type == WSMessageType.AGENT_RESPONSE.value:
+                return AgentResponse(
+                    is_success=True,
+                    execution_time=body.get("execution_time", 0),
+                    response=body.get("response", ""),
+                )
+            if message_type == WSMessageType.AGENT_ERROR.value:
+                return AgentResponse(
+                    is_success=False,
+                    execution_time=body.get("execution_time", 0),
+                    response=body.get("error", {}).get("error_message", ""),
+                )
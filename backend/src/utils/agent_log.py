@@ -0,0 +1,300 @@
+import asyncio
+import os
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+from src.core.settings import get_settings
+from src.db.session import async_session
+from src.repositories.log import log_repo
+from src.schemas.ws.log import (
+    LogCreate,
+    LogEntry,
+    LogIngestionStatsDTO,
+)
+from src.utils.enums import LogOverflowPolicy
+from src.utils.log_subscriptions import LogSubscriptionHub
+from starlette.datastructures import State
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+class AgentLogBuffer:
+    """
+    In-process buffer for AGENT_LOG events.
+
+    Logs are queued in memory and flushed to the database by a single background worker,
+    either when `batch_size` logs are pending or every `flush_interval_ms`, whichever comes first.
+    Every flush is one session and one multi-row INSERT, instead of one session and commit per log.
+
+    The buffer is bounded by `max_size`. When it is full (e.g. postgres is slow), `overflow_policy` decides:
+        * drop_oldest - evict the oldest pending log to make room for the new one
+        * drop_newest - discard the incoming log
+        * spill - append the incoming log to `spill_file`, it is replayed after a successful flush.
+          Spilled logs are written to the file by the worker, off the event loop.
+    """
+
+    def __init__(
+        self,
+        state: State,
+        max_size: int = settings.AGENT_LOG_BUFFER_MAX_SIZE,
+        batch_size: int = settings.AGENT_LOG_FLUSH_BATCH_SIZE,
+        flush_interval_ms: int = settings.AGENT_LOG_FLUSH_INTERVAL_MS,
+        overflow_policy: LogOverflowPolicy = settings.AGENT_LOG_OVERFLOW_POLICY,
+        spill_file: str = settings.AGENT_LOG_SPILL_FILE,
+    ):
+        self.state = state
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow_policy = overflow_policy
+        self.spill_file = spill_file
+        self.replay_file = f"{spill_file}.replay"
+
+        # (enqueue time, log) pairs, enqueue time is monotonic and used for lag reporting
+        self._queue: deque[tuple[float, LogCreate]] = deque()
+        # logs to be appended to `spill_file` by the worker
+        self._spill_pending: list[LogCreate] = []
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._worker: Optional[asyncio.Task] = None
+        # the last insert failed, spilled logs are not replayed until an insert succeeds again
+        self._insert_failing = False
+
+        # metrics
+        self._enqueued = 0
+        self._inserted = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._replayed = 0
+        self._failed_flushes = 0
+        self._last_batch_size = 0
+        self._last_flush_at: Optional[datetime] = None
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    def put(self, log_in: LogCreate) -> bool:
+        """
+        Enqueue a log without waiting for the database.
+
+        Returns:
+            True if the log was buffered, False if it was dropped or spilled to disk
+        """
+        if len(self._queue) >= self.max_size:
+            if self.overflow_policy == LogOverflowPolicy.drop_newest:
+                self._dropped += 1
+                return False
+
+            if self.overflow_policy == LogOverflowPolicy.spill:
+                self._spill_pending.append(log_in)
+                self._wakeup.set()
+                return False
+
+            self._queue.popleft()
+            self._dropped += 1
+
+        self._queue.append((time.monotonic(), log_in))
+        self._enqueued += 1
+
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        self._closing = False
+        self._worker = asyncio.create_task(self._run())
+        logger.debug("Agent log buffer started")
+
+    async def stop(self):
+        """Stop the worker, flushing everything that is still pending."""
+        self._closing = True
+        self._wakeup.set()
+        if self._worker:
+            await self._worker
+            self._worker = None
+        logger.debug("Agent log buffer stopped")
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self._drain()
+            except Exception:
+                logger.error(
+                    f"Unexpected error while flushing agent logs: {traceback.format_exc()}"
+                )
+
+        await self._drain()
+
+    async def _drain(self):
+        while self._queue:
+            size = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(size)]
+            await self._flush(batch)
+
+        if self._spill_pending:
+            await self._spill()
+
+        if (
+            not self._closing
+            and not self._insert_failing
+            and (os.path.exists(self.replay_file) or os.path.exists(self.spill_file))
+        ):
+            await self._replay_spilled()
+
+    async def _flush(self, batch: list[tuple[float, LogCreate]]):
+        logs_in = [log_in for _, log_in in batch]
+        try:
+            async with async_session() as db:
+                logs = await log_repo.create_many(db=db, objs_in=logs_in)
+        except Exception:
+            self._insert_failing = True
+            self._failed_flushes += 1
+            logger.error(
+                f"Could not insert {len(logs_in)} agent logs. Details: {traceback.format_exc()}"
+            )
+            if self.overflow_policy == LogOverflowPolicy.spill:
+                self._spill_pending.extend(logs_in)
+            else:
+                self._dropped += len(logs_in)
+            return
+
+        self._insert_failing = False
+        lag = time.monotonic() - batch[0][0]
+        self._last_lag = lag
+        self._max_lag = max(self._max_lag, lag)
+        self._inserted += len(logs)
+        self._last_batch_size = len(logs)
+        self._last_flush_at = datetime.now()
+        logger.debug(f"Inserted {len(logs)} agent logs, lag: {lag * 1000:.1f}ms")
+
+        await self._push_to_frontend(logs)
+
+    async def _push_to_frontend(self, logs: list[LogEntry]):
+        log_hub: Optional[LogSubscriptionHub] = getattr(self.state, "log_hub", None)
+        if not log_hub:
+            return
+
+        try:
+            await log_hub.publish(logs)
+        except Exception:
+            logger.debug(
+                f"Could not push agent logs to frontend: {traceback.format_exc()}"
+            )
+
+    async def _spill(self):
+        logs_in, self._spill_pending = self._spill_pending, []
+        lines = [f"{log_in.model_dump_json()}\n" for log_in in logs_in]
+        try:
+            await asyncio.to_thread(self._append_lines, self.spill_file, lines)
+            self._spilled += len(logs_in)
+        except OSError:
+            self._dropped += len(logs_in)
+            logger.error(f"Could not spill agent logs to '{self.spill_file}'")
+
+    async def _replay_spilled(self):
+        """
+        Insert spilled logs in batches, bypassing the queue, so they don't count as enqueued again.
+        Malformed lines (e.g. written during a crash) are skipped. Logs which could not be inserted
+        are kept in `replay_file` and replayed after the next successful flush.
+        """
+        try:
+            # a replay file left by a failed replay is finished before new spills are taken
+            if not os.path.exists(self.replay_file):
+                os.replace(self.spill_file, self.replay_file)
+            lines = await asyncio.to_thread(self._read_lines, self.replay_file)
+        except OSError:
+            logger.error(
+                f"Could not replay spilled agent logs from '{self.replay_file}'"
+            )
+            return
+
+        logs_in: list[LogCreate] = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                logs_in.append(LogCreate.model_validate_json(line))
+            except ValueError:
+                self._dropped += 1
+                logger.warning(
+                    f"Skipping malformed spilled agent log on line {number} of '{self.replay_file}'"
+                )
+
+        logger.debug(f"Replaying {len(logs_in)} spilled agent logs")
+        for start in range(0, len(logs_in), self.batch_size):
+            batch = logs_in[start : start + self.batch_size]
+            try:
+                async with async_session() as db:
+                    logs = await log_repo.create_many(db=db, objs_in=batch)
+            except Exception:
+                self._insert_failing = True
+                self._failed_flushes += 1
+                logger.error(
+                    f"Could not replay {len(logs_in) - start} spilled agent logs. Details: {traceback.format_exc()}"
+                )
+                await self._keep_for_replay(logs_in[start:])
+                return
+
+            self._replayed += len(logs)
+            await self._push_to_frontend(logs)
+
+        try:
+            os.remove(self.replay_file)
+        except OSError:
+            logger.error(f"Could not remove '{self.replay_file}'")
+
+    async def _keep_for_replay(self, logs_in: list[LogCreate]):
+        lines = [f"{log_in.model_dump_json()}\n" for log_in in logs_in]
+        try:
+            await asyncio.to_thread(self._write_lines, self.replay_file, lines)
+        except OSError:
+            self._dropped += len(logs_in)
+            logger.error(
+                f"Could not keep agent logs for replay in '{self.replay_file}'"
+            )
+
+    @staticmethod
+    def _read_lines(path: str) -> list[str]:
+        with open(path) as f:
+            return f.readlines()
+
+    @staticmethod
+    def _append_lines(path: str, lines: list[str]):
+        with open(path, "a") as f:
+            f.writelines(lines)
+
+    @staticmethod
+    def _write_lines(path: str, lines: list[str]):
+        # written next to the file and swapped, so a crash doesn't leave it truncated
+        with open(f"{path}.tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(f"{path}.tmp", path)
+
+    def stats(self) -> LogIngestionStatsDTO:
+        oldest_pending = time.monotonic() - self._queue[0][0] if self._queue else 0.0
+        return LogIngestionStatsDTO(
+            queue_size=len(self._queue),
+            max_size=self.max_size,
+            overflow_policy=self.overflow_policy.value,
+            enqueued=self._enqueued,
+            inserted=self._inserted,
+            dropped=self._dropped,
+            spilled=self._spilled,
+            replayed=self._replayed,
+            failed_flushes=self._failed_flushes,
+            last_batch_size=self._last_batch_size,
+            last_flush_at=self._last_flush_at,
+            ingestion_lag_ms=self._last_lag * 1000,
+            max_ingestion_lag_ms=self._max_lag * 1000,
+            oldest_pending_ms=oldest_pending * 1000,
+        )
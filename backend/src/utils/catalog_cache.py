@@ -0,0 +1,145 @@
+import hashlib
+import traceback
+from collections import OrderedDict
+from logging import getLogger
+from typing import Awaitable, Callable, NamedTuple, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
+from src.schemas.api.agent.dto import ActiveAgentsDTO
+from src.utils.enums import ActiveAgentTypeFilter
+from src.utils.redis_client import LoopScopedRedis, redis_client
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+CATALOG_EPOCH_KEY = "catalog_version:epoch"
+CATALOG_VERSION_KEY = "catalog_version:user:{user_id}"
+LOOKUP_FINGERPRINT_KEY = "catalog_fingerprint:{kind}:{url}"
+
+
+def fingerprint(model: BaseModel) -> str:
+    return hashlib.sha256(model.model_dump_json().encode()).hexdigest()
+
+
+class CachedCatalog(NamedTuple):
+    agents: ActiveAgentsDTO
+    body: bytes
+    etag: str
+
+
+class AgentCatalogCache:
+    """
+    Cache of serialized active agent catalogs, keyed by (user, catalog version, agent_type, limit, offset).
+
+    Catalog version of a user is a redis counter bumped whenever something that ends up in the catalog changes:
+    agent registers/unregisters, agent/flow/mcp/a2a CRUD, mcp/a2a lookups finding a different server state.
+    A global epoch is bumped when all the catalogs change at once (e.g. all agents set inactive on startup).
+    Versions live in redis, which is shared with celery workers and other replicas,
+    so serving a cached catalog costs a single MGET instead of the catalog queries.
+    When redis is unavailable the catalog is built on every call.
+    """
+
+    def __init__(
+        self,
+        redis: LoopScopedRedis = redis_client,
+        max_entries: int = settings.AGENT_CATALOG_CACHE_MAX_ENTRIES,
+    ):
+        self.redis = redis
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CachedCatalog] = OrderedDict()
+
+    def _client(self) -> aioredis.Redis:
+        return self.redis.client()
+
+    async def get_version(self, user_id: Union[str, UUID]) -> Optional[str]:
+        try:
+            epoch, version = await self._client().mget(
+                CATALOG_EPOCH_KEY, CATALOG_VERSION_KEY.format(user_id=user_id)
+            )
+        except Exception:
+            logger.error(f"Could not get catalog version: {traceback.format_exc()}")
+            return None
+        return f"{int(epoch or 0)}.{int(version or 0)}"
+
+    async def bump(self, *user_ids: Union[str, UUID]):
+        if not user_ids:
+            return
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                for user_id in set(str(user_id) for user_id in user_ids):
+                    pipe.incr(CATALOG_VERSION_KEY.format(user_id=user_id))
+                await pipe.execute()
+        except Exception:
+            logger.error(f"Could not bump catalog version: {traceback.format_exc()}")
+
+    async def bump_all(self):
+        try:
+            await self._client().incr(CATALOG_EPOCH_KEY)
+        except Exception:
+            logger.error(f"Could not bump catalog epoch: {traceback.format_exc()}")
+
+    async def bump_on_fingerprint_change(
+        self,
+        kind: str,
+        url: str,
+        fingerprint: str,
+        user_ids: list[Union[str, UUID]],
+    ) -> bool:
+        """
+        Bump catalog versions of `user_ids` if the state of the server at `url`
+        differs from the one seen by the previous lookup.
+
+        Returns:
+            True if the fingerprint has changed
+        """
+        try:
+            previous = await self._client().set(
+                LOOKUP_FINGERPRINT_KEY.format(kind=kind, url=url), fingerprint, get=True
+            )
+        except Exception:
+            logger.error(f"Could not compare {kind} fingerprint of '{url}'")
+            # unknown -> assume changed
+            await self.bump(*user_ids)
+            return True
+
+        if previous is not None and previous.decode() == fingerprint:
+            return False
+
+        await self.bump(*user_ids)
+        return True
+
+    async def get_or_build(
+        self,
+        user_id: Union[str, UUID],
+        agent_type: ActiveAgentTypeFilter,
+        limit: int,
+        offset: int,
+        build: Callable[[], Awaitable[ActiveAgentsDTO]],
+    ) -> CachedCatalog:
+        version = await self.get_version(user_id=user_id)
+        key = (str(user_id), version, agent_type.value, limit, offset)
+
+        if version is not None and (cached := self._entries.get(key)):
+            self._entries.move_to_end(key)
+            return cached
+
+        agents = await build()
+        body = agents.model_dump_json().encode()
+        catalog = CachedCatalog(
+            agents=agents,
+            body=body,
+            # etag depends on the content only, so it stays valid across restarts and replicas
+            etag=f'"{hashlib.sha256(body).hexdigest()}"',
+        )
+
+        if version is not None:
+            self._entries[key] = catalog
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return catalog
+
+
+catalog_cache = AgentCatalogCache()
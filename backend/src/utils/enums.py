@@ -30,6 +30,21 @@ class ActiveAgentTypeFilter(Enum):
     all = "all"
 
 
+class LogOverflowPolicy(Enum):
+    drop_oldest = "drop_oldest"
+    drop_newest = "drop_newest"
+    spill = "spill"
+
+
+class LogLevel(Enum):
+    # ordered by severity, values match the levels sent by genai_session
+    debug = "debug"
+    info = "info"
+    warning = "warning"
+    error = "error"
+    critical = "critical"
+
+
 class AgentIdType(Enum):
     agent_id = "agent_id"
     mcp_tool_id = "mcp_tool_id"
@@ -2,6 +2,7 @@ import asyncio
 import random
 import re
 import string
+from collections import defaultdict
 from typing import Any, Optional
 from urllib.parse import urlparse, urlunparse
 from uuid import UUID
@@ -9,12 +10,12 @@ from uuid import UUID
 from fastapi import HTTPException
 from mcp.types import Tool
 from pydantic import AnyHttpUrl
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, not_, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.encrypt import encrypt_secret
 from src.auth.jwt import TokenLifespanType, validate_token
 from src.db.session import async_session
-from src.models import A2ACard, Agent, AgentWorkflow, MCPServer, MCPTool
+from src.models import A2ACard, Agent, AgentWorkflow, FlowAgent, MCPServer, MCPTool
 from src.schemas.api.agent.dto import MLAgentJWTDTO
 from src.schemas.api.exceptions import IntegrityErrorDetails
 from src.schemas.api.flow.schemas import FlowAgentId
@@ -166,6 +167,26 @@ def strip_endpoints_from_url(url: AnyHttpUrl | str) -> str:
     )
 
 
+def resolve_flow_dependencies(flow: list[dict]) -> Optional[list[list[int]]]:
+    """
+    Dependencies of every step of `AgentWorkflow.flow`, steps without `depends_on` depend on the previous step.
+
+    Returns:
+        positions of the steps each step depends on, None if the flow is linear
+    """
+    dependencies = [
+        agent["depends_on"]
+        if agent.get("depends_on") is not None
+        else ([position - 1] if position else [])
+        for position, agent in enumerate(flow)
+    ]
+    is_linear = all(
+        deps == ([position - 1] if position else [])
+        for position, deps in enumerate(dependencies)
+    )
+    return None if is_linear else dependencies
+
+
 class FlowValidator:
     async def _validate_genai_ids(self, genai_ids: list[Optional[str]], user_id: UUID):
         async with async_session() as db:
@@ -190,6 +211,7 @@ class FlowValidator:
                 .where(
                     and_(
                         MCPTool.id.in_(mcp_tools_ids),
+                        MCPTool.is_active.is_(True),
                         MCPServer.is_active.is_(True),
                         MCPServer.creator_id == user_id,
                     )
@@ -260,140 +282,171 @@ class FlowValidator:
             genai_ids=genai_ids, mcp_ids=mcp_ids, a2a_ids=a2a_ids, user_id=user_id
         )
 
-    async def trigger_flow_validation_on_agent_state_change(
-        self, db: AsyncSession, agent_type: AgentType
-    ):
+    async def resolve_active_flow_agents(
+        self, db: AsyncSession, flows: list[AgentWorkflow], user_id: UUID
+    ) -> dict[tuple[str, str], Agent | MCPTool | A2ACard]:
         """
-        Unified helper method to run during mcp/a2a lookups to set flows with inactive tools/cards as inactive
+        Resolve agents of all steps of `flows` with one query per agent type, instead of a validation per flow.
+
+        Returns:
+            active agents owned by the user, keyed by (agent type, agent id)
         """
-        active_flows = await db.scalars(
-            select(AgentWorkflow)
-            .order_by(AgentWorkflow.created_at)
-            .order_by(AgentWorkflow.created_at.desc())
-        )
-        agentflows: list[AgentWorkflow] = active_flows.all()
-        flow_ids = [f.id for f in agentflows]
-        flows = [f.flow for f in agentflows]
-        for flow_id, flow in zip(flow_ids, flows):
-            flow_agent_ids = []  # either mcp/a2a ids
-            for tool in flow:
-                if tool["type"] == agent_type.value:
-                    flow_agent_ids.append(tool)
-
-            if AgentType.mcp == agent_type:
-                active_tools = await db.scalars(
-                    select(MCPTool)
-                    .join(MCPServer, MCPServer.id == MCPTool.mcp_server_id)
-                    .where(
-                        and_(
-                            MCPTool.id.in_([a["id"] for a in flow_agent_ids]),
-                            MCPServer.is_active.is_(True),
-                        )
+        ids: dict[str, set[str]] = defaultdict(set)
+        for flow in flows:
+            for agent in flow.flow:
+                agent_type, agent_id = self.flow_agent_key(agent)
+                ids[agent_type].add(agent_id)
+
+        resolved: dict[tuple[str, str], Agent | MCPTool | A2ACard] = {}
+        if genai_ids := ids[AgentType.genai.value]:
+            q = await db.scalars(
+                select(Agent).where(
+                    and_(
+                        Agent.id.in_(genai_ids),
+                        Agent.is_active.is_(True),
+                        Agent.creator_id == user_id,
                     )
                 )
+            )
+            resolved.update({(AgentType.genai.value, str(a.id)): a for a in q.all()})
 
-                if len(active_tools.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.mcp.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
-
-            if AgentType.a2a == agent_type:
-                active_cards = await db.scalars(
-                    select(A2ACard).where(
-                        and_(
-                            A2ACard.id.in_([a["id"] for a in flow_agent_ids]),
-                            A2ACard.is_active.is_(True),
-                        )
+        if mcp_ids := ids[AgentType.mcp.value]:
+            q = await db.scalars(
+                select(MCPTool)
+                .join(MCPServer, MCPTool.mcp_server_id == MCPServer.id)
+                .where(
+                    and_(
+                        MCPTool.id.in_(mcp_ids),
+                        MCPTool.is_active.is_(True),
+                        MCPServer.is_active.is_(True),
+                        MCPServer.creator_id == user_id,
                     )
                 )
-                if len(active_cards.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.a2a.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
-
-            if AgentType.genai == agent_type:
-                active_agents = await db.scalars(
-                    select(Agent).where(
-                        and_(
-                            Agent.id.in_([a["id"] for a in flow_agent_ids]),
-                            Agent.is_active.is_(True),
-                        )
+            )
+            resolved.update({(AgentType.mcp.value, str(t.id)): t for t in q.all()})
+
+        if a2a_ids := ids[AgentType.a2a.value]:
+            q = await db.scalars(
+                select(A2ACard).where(
+                    and_(
+                        A2ACard.id.in_(a2a_ids),
+                        A2ACard.is_active.is_(True),
+                        A2ACard.creator_id == user_id,
                     )
                 )
-                if len(active_agents.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.genai.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
+            )
+            resolved.update({(AgentType.a2a.value, str(c.id)): c for c in q.all()})
 
-    async def trigger_flow_state_lookup_of_all_agents(
-        self,
+        return resolved
+
+    @staticmethod
+    def is_flow_active(
         flow: AgentWorkflow,
-        user_id: UUID,
-    ) -> AgentWorkflow:
-        agents = []
-        for a in flow.flow:
-            agent_id = FlowAgentId(**a)
-            agents.append(agent_id)
-
-        active_agents = await self.validate_is_active_of_all_agent_types(
-            flow_agents=agents, user_id=user_id
+        active_agents: dict[tuple[str, str], Agent | MCPTool | A2ACard],
+    ) -> bool:
+        return bool(flow.flow) and all(
+            FlowValidator.flow_agent_key(agent) in active_agents for agent in flow.flow
         )
 
-        # lookup via all() is covering the cases when there are multiple tools in the flow with the same id
-        if all([a["id"] in active_agents for a in flow.flow]):
-            flow.is_active = True
-        else:
-            flow.is_active = False
+    @staticmethod
+    def flow_agent_key(agent: dict) -> tuple[str, str]:
+        """(type, id) of a step of `AgentWorkflow.flow`, with the id in the canonical uuid form."""
+        agent_id = agent.get("id")
+        try:
+            agent_id = str(UUID(agent_id))
+        except (ValueError, TypeError):
+            pass
+        return agent.get("type"), agent_id
+
+    @staticmethod
+    def _is_flow_agent_active():
+        """
+        Condition on the correlated flow_agents row: the step agent is active and owned by the flow creator.
+        """
+        genai_active = (
+            select(Agent.id)
+            .where(
+                Agent.id == FlowAgent.agent_id,
+                Agent.is_active.is_(True),
+                Agent.creator_id == AgentWorkflow.creator_id,
+            )
+            .correlate(FlowAgent, AgentWorkflow)
+            .exists()
+        )
+        mcp_active = (
+            select(MCPTool.id)
+            .join(MCPServer, MCPTool.mcp_server_id == MCPServer.id)
+            .where(
+                MCPTool.id == FlowAgent.agent_id,
+                MCPTool.is_active.is_(True),
+                MCPServer.is_active.is_(True),
+                MCPServer.creator_id == AgentWorkflow.creator_id,
+            )
+            .correlate(FlowAgent, AgentWorkflow)
+            .exists()
+        )
+        a2a_active = (
+            select(A2ACard.id)
+            .where(
+                A2ACard.id == FlowAgent.agent_id,
+                A2ACard.is_active.is_(True),
+                A2ACard.creator_id == AgentWorkflow.creator_id,
+            )
+            .correlate(FlowAgent, AgentWorkflow)
+            .exists()
+        )
+        return or_(
+            and_(FlowAgent.agent_type == AgentType.genai.value, genai_active),
+            and_(FlowAgent.agent_type == AgentType.mcp.value, mcp_active),
+            and_(FlowAgent.agent_type == AgentType.a2a.value, a2a_active),
+        )
+
+    async def revalidate_flows_of_agents(
+        self,
+        db: AsyncSession,
+        agent_ids: list[UUID | str],
+        agent_type: AgentType,
+    ) -> list[UUID]:
+        """
+        Recompute is_active of the flows containing `agent_ids`, to be called once is_active of these agents
+        has actually changed (agent registered, mcp server or a2a card went up or down).
+        Flows are found through the flow_agents index and updated with a single statement,
+        so the cost depends on the number of affected flows and not on the total number of flows.
+
+        Returns:
+            ids of the flows whose is_active has changed
+        """
+        if not agent_ids:
+            return []
 
-        return flow
+        affected_flow_ids = select(FlowAgent.flow_id).where(
+            FlowAgent.agent_id.in_([str(agent_id) for agent_id in agent_ids]),
+            FlowAgent.agent_type == agent_type.value,
+        )
+        has_inactive_agents = (
+            select(FlowAgent.id)
+            .where(
+                FlowAgent.flow_id == AgentWorkflow.id,
+                not_(self._is_flow_agent_active()),
+            )
+            .correlate(AgentWorkflow)
+            .exists()
+        )
+        is_active = not_(has_inactive_agents)
+
+        q = await db.execute(
+            update(AgentWorkflow)
+            .where(
+                AgentWorkflow.id.in_(affected_flow_ids),
+                AgentWorkflow.is_active.is_distinct_from(is_active),
+            )
+            .values(is_active=is_active)
+            .returning(AgentWorkflow.id)
+            .execution_options(synchronize_session=False)
+        )
+        flow_ids = q.scalars().all()
+        await db.commit()
+        return flow_ids
 
 
 def validate_and_encrypt_provider_api_key(api_key: str) -> str:
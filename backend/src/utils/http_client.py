@@ -0,0 +1,103 @@
+import asyncio
+from logging import getLogger
+from typing import Any, NamedTuple, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from src.core.settings import get_settings
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+class ConditionalResponse(NamedTuple):
+    status: int
+    # parsed json body, None on 304 and on error statuses
+    body: Optional[Any]
+
+
+class PooledHttpClient:
+    """
+    Process wide http client for polling remote endpoints (a2a agent cards).
+
+    Connections are pooled per host and kept alive between polls, resolved hosts are cached,
+    so polling a known endpoint doesn't pay for DNS and TCP/TLS handshakes every time.
+    ETag and Last-Modified of the last response of every url are remembered
+    and sent back on the next poll, an unchanged resource costs a 304 without a body.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        max_connections_per_host: int = settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+        dns_cache_seconds: int = settings.HTTP_CLIENT_DNS_CACHE_SECONDS,
+        keepalive_seconds: int = settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+        timeout_seconds: int = settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+        self._session: Optional[ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._validators: dict[str, dict[str, str]] = {}
+
+    def _client(self) -> ClientSession:
+        # aiohttp sessions are bound to the event loop they were created in
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.max_connections_per_host,
+                    ttl_dns_cache=self.dns_cache_seconds,
+                    keepalive_timeout=self.keepalive_seconds,
+                    ssl=False,
+                ),
+                timeout=ClientTimeout(total=self.timeout_seconds),
+            )
+            self._loop = loop
+        return self._session
+
+    async def get_json(
+        self, url: str, headers: Optional[dict] = None, conditional: bool = True
+    ) -> ConditionalResponse:
+        """
+        GET json from `url`. With `conditional`, validators of the previous response of the url are sent along.
+        """
+        request_headers = {
+            **(headers or {}),
+            **(self._validators.get(url, {}) if conditional else {}),
+        }
+        async with self._client().get(url, headers=request_headers) as resp:
+            if resp.status == 304:
+                return ConditionalResponse(status=resp.status, body=None)
+
+            if resp.status != 200:
+                self.forget(url)
+                return ConditionalResponse(status=resp.status, body=None)
+
+            body = await resp.json()
+            validators = {}
+            if etag := resp.headers.get("ETag"):
+                validators["If-None-Match"] = etag
+            if last_modified := resp.headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = last_modified
+            if validators:
+                self._validators[url] = validators
+            else:
+                self.forget(url)
+            return ConditionalResponse(status=resp.status, body=body)
+
+    def forget(self, url: str):
+        """Drop validators of the url, so the next request fetches the full resource."""
+        self._validators.pop(url, None)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+http_client = PooledHttpClient()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import traceback
+from collections import defaultdict
+from logging import getLogger
+from typing import Optional, Union
+from uuid import UUID, uuid4
+
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+
+class InvalidationBus:
+    """
+    Keeps a generation number per user, bumped whenever user data cached by the backend changes
+    (e.g. model configs, providers, chats). A cached value remembers the generation it was built with
+    and is stale as soon as the current generation differs, so checking it is a dict lookup.
+
+    Bumps are published to redis, so caches of the other backend replicas are invalidated as well.
+    """
+
+    def __init__(self, redis_uri: str = settings.REDIS_PUBSUB_URI):
+        # distinguishes invalidations published by this replica, these are already applied locally
+        self.origin = uuid4().hex
+        self._redis_uri = redis_uri
+        self._redis: Optional[aioredis.Redis] = None
+        self._generations: dict[str, int] = defaultdict(int)
+        self._listener: Optional[asyncio.Task] = None
+
+    def generation(self, user_id: Union[str, UUID]) -> int:
+        return self._generations[str(user_id)]
+
+    async def invalidate(self, user_id: Union[str, UUID], reason: str = ""):
+        user_id = str(user_id)
+        self._generations[user_id] += 1
+        logger.debug(f"Invalidated cached data of user '{user_id}': {reason}")
+
+        if not self._redis:
+            return
+        try:
+            await self._redis.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"origin": self.origin, "user_id": user_id}),
+            )
+        except Exception:
+            logger.error(
+                f"Could not publish cache invalidation: {traceback.format_exc()}"
+            )
+
+    async def start(self):
+        self._redis = aioredis.from_url(self._redis_uri)
+        self._listener = asyncio.create_task(self._run_listener())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _run_listener(self):
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    self._handle_remote_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error(
+                    f"Cache invalidation listener failed, reconnecting: {traceback.format_exc()}"
+                )
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _handle_remote_message(self, message: dict):
+        try:
+            data = json.loads(message["data"])
+        except (ValueError, TypeError):
+            return
+        if data.get("origin") == self.origin or not data.get("user_id"):
+            return
+        self._generations[data["user_id"]] += 1
+
+
+invalidation_bus = InvalidationBus()
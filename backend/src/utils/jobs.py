@@ -1,17 +1,31 @@
 from src.repositories.agent import agent_repo
+from src.repositories.log import log_repo
+from src.core.settings import get_settings
 
 from src.db.session import async_session
 from logging import getLogger
+from src.utils.catalog_cache import catalog_cache
 from src.utils.db_initial_healthcheck import preflight_db_availability_check
 
 
 logger = getLogger(__name__)
+settings = get_settings()
 
 
 async def run_startup_jobs():
     await preflight_db_availability_check()
     async with async_session() as db:
-        await agent_repo.set_all_agents_inactive(db=db)
+        inactive_count = await agent_repo.set_all_agents_inactive(db=db)
+    logger.debug(f"Set {inactive_count} agents as inactive")
+    # every catalog has changed, cached catalogs of the previous run must not be served
+    await catalog_cache.bump_all()
+
+    async with async_session() as db:
+        await log_repo.maintain_partitions(
+            db=db,
+            precreate_days=settings.LOG_PARTITIONS_PRECREATE_DAYS,
+            retention_days=settings.LOG_RETENTION_DAYS,
+        )
 
     logger.debug("Initial startup jobs complete")
     return
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import traceback
+from collections import defaultdict
+from logging import getLogger
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import WebSocketDisconnect
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
+from src.schemas.ws.log import FrontendLogBatchDTO, LogEntry
+from src.utils.websocket import FrontendConnection
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+AGENT_LOGS_CHANNEL_PREFIX = "agent_logs:"
+
+
+class LogSubscriptionHub:
+    """
+    Routes agent logs to the frontend sockets subscribed to their session.
+
+    Logs are pushed once per `push_interval_ms` as a single batch per socket instead of one frame per log.
+    Logs of sessions without subscribers on this replica are discarded right away,
+    so the cost of log streaming depends on the number of subscribers and not on the total log volume.
+
+    Logs inserted by other backend replicas are received through redis pub/sub,
+    every session has its own channel and a replica only listens to the sessions it has subscribers for.
+    Logs are published only to the channels other replicas listen to, sessions nobody follows cost
+    a single PUBSUB NUMSUB per batch.
+    """
+
+    def __init__(
+        self,
+        redis_uri: str = settings.REDIS_PUBSUB_URI,
+        push_interval_ms: int = settings.AGENT_LOG_PUSH_INTERVAL_MS,
+        send_timeout_ms: int = settings.AGENT_LOG_PUSH_SEND_TIMEOUT_MS,
+    ):
+        self.push_interval = push_interval_ms / 1000
+        self.send_timeout = send_timeout_ms / 1000
+        # distinguishes logs published by this replica, these are already delivered locally
+        self.origin = uuid4().hex
+
+        self._redis = aioredis.from_url(redis_uri)
+        self._subscribers: dict[str, set[FrontendConnection]] = defaultdict(set)
+        self._pending: dict[str, list[dict]] = defaultdict(list)
+        self._closing = False
+        self._pusher: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, session_id: str, connection: FrontendConnection):
+        self._subscribers[str(session_id)].add(connection)
+
+    def unsubscribe(self, session_id: str, connection: FrontendConnection):
+        session_id = str(session_id)
+        connections = self._subscribers.get(session_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            self._subscribers.pop(session_id, None)
+            self._pending.pop(session_id, None)
+
+    async def start(self):
+        self._closing = False
+        self._pusher = asyncio.create_task(self._run_pusher())
+        self._listener = asyncio.create_task(self._run_listener())
+        logger.debug("Log subscription hub started")
+
+    async def stop(self):
+        self._closing = True
+        for task in (self._listener, self._pusher):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = self._pusher = None
+        await self._redis.aclose()
+        logger.debug("Log subscription hub stopped")
+
+    async def publish(self, logs: list[LogEntry]):
+        """Queue logs for local subscribers and publish them to the other replicas."""
+        by_session: dict[str, list[dict]] = defaultdict(list)
+        for log in logs:
+            by_session[str(log.session_id)].append(log.model_dump(mode="json"))
+
+        for session_id, session_logs in by_session.items():
+            self._enqueue(session_id=session_id, logs=session_logs)
+
+        try:
+            channels = {
+                session_id: f"{AGENT_LOGS_CHANNEL_PREFIX}{session_id}"
+                for session_id in by_session
+            }
+            listeners = {
+                channel.decode() if isinstance(channel, bytes) else channel: count
+                for channel, count in await self._redis.pubsub_numsub(
+                    *channels.values()
+                )
+            }
+            # the listener of this replica is subscribed to the sessions of its own subscribers
+            remote_sessions = [
+                session_id
+                for session_id, channel in channels.items()
+                if listeners.get(channel, 0) - (session_id in self._subscribers) > 0
+            ]
+            if not remote_sessions:
+                return
+
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for session_id in remote_sessions:
+                    pipe.publish(
+                        channels[session_id],
+                        json.dumps(
+                            {"origin": self.origin, "logs": by_session[session_id]}
+                        ),
+                    )
+                await pipe.execute()
+        except Exception:
+            logger.debug(
+                f"Could not publish agent logs to redis: {traceback.format_exc()}"
+            )
+
+    def _enqueue(self, session_id: str, logs: list[dict]):
+        if session_id not in self._subscribers:
+            return
+        self._pending[session_id].extend(logs)
+
+    async def _run_pusher(self):
+        while not self._closing:
+            await asyncio.sleep(self.push_interval)
+            if not self._pending:
+                continue
+
+            pending, self._pending = self._pending, defaultdict(list)
+            sends = []
+            for session_id, logs in pending.items():
+                frame = FrontendLogBatchDTO(type="agent_logs", logs=logs)
+                payload = frame.model_dump_json()
+                for connection in list(self._subscribers.get(session_id, ())):
+                    sends.append(self._send(session_id, connection, payload))
+
+            # a slow socket must not delay pushes to the others
+            await asyncio.gather(*sends)
+
+    async def _send(
+        self, session_id: str, connection: FrontendConnection, payload: str
+    ):
+        try:
+            sent = await connection.try_send_text(payload, timeout=self.send_timeout)
+        except (WebSocketDisconnect, RuntimeError):
+            # the socket is closed, starlette raises RuntimeError on sends after close
+            logger.debug(
+                f"Frontend socket of session '{session_id}' is closed, unsubscribing it"
+            )
+            self.unsubscribe(session_id=session_id, connection=connection)
+            return
+        except Exception:
+            logger.debug(
+                f"Could not push agent logs of session '{session_id}': {traceback.format_exc()}"
+            )
+            return
+        if not sent:
+            # the socket is busy with a large response, the socket stays subscribed and gets the next batches
+            logger.debug(
+                f"Frontend socket of session '{session_id}' is busy, dropping agent logs batch"
+            )
+
+    async def _run_listener(self):
+        while not self._closing:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            listened: set[str] = set()
+            try:
+                while not self._closing:
+                    wanted = {
+                        f"{AGENT_LOGS_CHANNEL_PREFIX}{session_id}"
+                        for session_id in self._subscribers
+                    }
+                    if wanted - listened:
+                        await pubsub.subscribe(*(wanted - listened))
+                    if listened - wanted:
+                        await pubsub.unsubscribe(*(listened - wanted))
+                    listened = wanted
+
+                    if not listened:
+                        await asyncio.sleep(self.push_interval)
+                        continue
+
+                    message = await pubsub.get_message(timeout=self.push_interval)
+                    if message:
+                        self._handle_remote_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error(
+                    f"Agent logs redis listener failed, reconnecting: {traceback.format_exc()}"
+                )
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _handle_remote_message(self, message: dict):
+        try:
+            data = json.loads(message["data"])
+        except (ValueError, TypeError):
+            return
+        if data.get("origin") == self.origin:
+            return
+
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        self._enqueue(
+            session_id=channel.removeprefix(AGENT_LOGS_CHANNEL_PREFIX),
+            logs=data.get("logs", []),
+        )
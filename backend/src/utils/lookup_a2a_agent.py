@@ -1,45 +1,62 @@
-import asyncio
 import logging
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.session import async_session
-from src.repositories.a2a import a2a_repo, lookup_agent_well_known
+from src.repositories.a2a import a2a_repo, lookup_agent_well_known, well_known_url
+from src.schemas.a2a.schemas import A2AAgentCardSchema
+from src.utils.catalog_cache import catalog_cache, fingerprint
 from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator
+from src.utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
 
-async def lookup_and_update_agent_card(server_url: str, headers: dict = {}):
-    async with async_session() as db:
-        card_info = await lookup_agent_well_known(url=server_url, headers=headers)
-        if not card_info.is_active:
-            async with async_session() as db:
-                await a2a_repo.set_as_inactive(db=db, server_url=server_url)
-
-            validator = FlowValidator()
-            async with async_session() as db:
-                await validator.trigger_flow_validation_on_agent_state_change(
-                    db=db, agent_type=AgentType.a2a
-                )
-        card = await a2a_repo.update_card(
-            db=db, server_url=server_url, card_in=card_info
-        )
-        return card
-
-
-async def lookup_a2a_agents(headers: dict = {}):
-    async with async_session() as db:
-        urls = await a2a_repo.get_all_card_server_urls(db)
+async def bump_catalog_versions_on_change(
+    db: AsyncSession, server_url: str, card_info: A2AAgentCardSchema
+):
+    creator_ids = await a2a_repo.list_creator_ids_by_url(db=db, server_url=server_url)
+    await catalog_cache.bump_on_fingerprint_change(
+        kind=AgentType.a2a.value,
+        url=server_url,
+        fingerprint=fingerprint(card_info),
+        user_ids=creator_ids,
+    )
 
-    tasks = []
-    for url in urls:
-        tasks.append(
-            asyncio.create_task(
-                lookup_and_update_agent_card(server_url=url, headers=headers)
-            )
-        )
 
-    cards = await asyncio.gather(*tasks)
-    logger.info(f"Updated info about {len(cards)} A2A agents")
+async def lookup_and_update_agent_card(server_url: str, headers: dict = {}) -> bool:
+    card_info = await lookup_agent_well_known(
+        url=server_url, headers=headers, conditional=True
+    )
+    if not card_info:
+        # well-known endpoint responded, but without a card
+        card_info = A2AAgentCardSchema(is_active=False)
+
+    async with async_session() as db:
+        try:
+            changed_card_ids = await a2a_repo.set_is_active(
+                db=db, server_url=server_url, is_active=card_info.is_active
+            )
+            # only flows with cards that went up or down need to be revalidated
+            await FlowValidator().revalidate_flows_of_agents(
+                db=db, agent_ids=changed_card_ids, agent_type=AgentType.a2a
+            )
+            if not card_info.is_modified:
+                # 304: card content in the db is up to date
+                if changed_card_ids:
+                    creator_ids = await a2a_repo.list_creator_ids_by_url(
+                        db=db, server_url=server_url
+                    )
+                    await catalog_cache.bump(*creator_ids)
+                return card_info.is_active
+
+            await a2a_repo.update_card(db=db, server_url=server_url, card_in=card_info)
+            await bump_catalog_versions_on_change(
+                db=db, server_url=server_url, card_info=card_info
+            )
+        except Exception:
+            # card may not have been stored, next lookup must fetch it in full
+            http_client.forget(well_known_url(server_url))
+            raise
 
-    return
+    return card_info.is_active
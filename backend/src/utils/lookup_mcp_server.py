@@ -1,43 +1,324 @@
-import asyncio
 import logging
+import traceback
+from typing import NamedTuple, Optional
+from uuid import UUID
 
+import httpx
+from mcp.shared.exceptions import McpError
+from mcp.types import ListToolsResult
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
 from src.db.session import async_session
-from src.repositories.mcp import lookup_mcp_server, mcp_repo
+from src.repositories.mcp import (
+    combine_tool_digests,
+    list_mcp_server_tool_pages,
+    mcp_repo,
+)
+from src.utils.catalog_cache import catalog_cache
 from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator
+from src.utils.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
+TOOL_SYNC_PROGRESS_KEY = "mcp_tool_sync:{url}"
+TOOL_SYNC_SEEN_KEY = "mcp_tool_sync:{url}:seen"
+# names of db tools checked against the seen set at once
+SEEN_CHECK_BATCH_SIZE = 500
+# pages of a fingerprint check are kept to be synced without listing them again, up to this many tools
+FINGERPRINT_CHECK_BUFFER_TOOLS = 1000
 
-async def lookup_and_update_mcp_server(url: str, headers={}, cursor=None):
-    data = await lookup_mcp_server(url=url, headers=headers, cursor=cursor)
 
-    if data.is_active:
-        async with async_session() as db:
-            return await mcp_repo.update_mcp_server_resources(
-                db=db, mcp_server_url=url, obj_in=data
+class ToolSyncState(NamedTuple):
+    cursor: Optional[str]
+    digest: int
+
+
+class ToolSyncProgress:
+    """
+    Progress of a paginated tool sync of a mcp server, kept in redis:
+    cursor of the next page, running digest of the listed tools and names of the listed tools.
+    When a sync is interrupted, the next probe resumes from the stored cursor instead of the first page.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        url: str,
+        ttl: int = settings.MCP_TOOL_SYNC_PROGRESS_TTL_SECONDS,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.progress_key = TOOL_SYNC_PROGRESS_KEY.format(url=url)
+        self.seen_key = TOOL_SYNC_SEEN_KEY.format(url=url)
+
+    async def load(self) -> Optional[ToolSyncState]:
+        state = await self.redis.hgetall(self.progress_key)
+        if not state.get(b"cursor"):
+            return None
+        return ToolSyncState(
+            cursor=state[b"cursor"].decode(), digest=int(state[b"digest"], 16)
+        )
+
+    async def save_page(self, cursor: Optional[str], digest: int, names: list[str]):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if names:
+                pipe.sadd(self.seen_key, *names)
+            pipe.hset(
+                self.progress_key,
+                mapping={"cursor": cursor or "", "digest": f"{digest:064x}"},
+            )
+            pipe.expire(self.seen_key, self.ttl)
+            pipe.expire(self.progress_key, self.ttl)
+            await pipe.execute()
+
+    async def filter_unseen(self, names: list[str]) -> list[str]:
+        unseen = []
+        for i in range(0, len(names), SEEN_CHECK_BATCH_SIZE):
+            batch = names[i : i + SEEN_CHECK_BATCH_SIZE]
+            is_seen = await self.redis.smismember(self.seen_key, batch)
+            unseen += [name for name, seen in zip(batch, is_seen) if not seen]
+        return unseen
+
+    async def clear(self):
+        await self.redis.delete(self.progress_key, self.seen_key)
+
+
+class ToolListing(NamedTuple):
+    pages: int
+    is_complete: bool
+    digest: int
+    # pages of the listing, None if they held more than FINGERPRINT_CHECK_BUFFER_TOOLS tools
+    buffered_pages: Optional[list[ListToolsResult]]
+
+
+async def hash_mcp_server_tools(
+    url: str, headers: Optional[dict] = None
+) -> ToolListing:
+    """
+    List tools of the mcp server computing only their digest, without writing to the db or redis.
+    """
+    pages = 0
+    digest = 0
+    buffered_pages: Optional[list[ListToolsResult]] = []
+    buffered_tools = 0
+    is_complete = False
+
+    async def on_page(page: ListToolsResult):
+        nonlocal pages, digest, buffered_pages, buffered_tools
+        digest = combine_tool_digests(digest, page.tools)
+        if buffered_pages is not None:
+            buffered_tools += len(page.tools)
+            if buffered_tools <= FINGERPRINT_CHECK_BUFFER_TOOLS:
+                buffered_pages.append(page)
+            else:
+                buffered_pages = None
+        pages += 1
+
+    try:
+        await list_mcp_server_tool_pages(url=url, on_page=on_page, headers=headers)
+        is_complete = True
+    except* (OSError, httpx.ConnectError, httpx.HTTPStatusError, McpError):
+        logger.warning(
+            f"Tool listing of MCP server {url} stopped after {pages} pages: {traceback.format_exc()}"
+        )
+
+    return ToolListing(
+        pages=pages,
+        is_complete=is_complete,
+        digest=digest,
+        buffered_pages=buffered_pages if is_complete else None,
+    )
+
+
+class ToolSyncResult(NamedTuple):
+    # False if the server could not be reached before the first page
+    is_reachable: bool
+    # False if the listing stopped before the last page
+    is_complete: bool
+    fingerprint: Optional[str]
+    changed_tools: int
+    removed_tool_ids: list[UUID]
+    restored_tool_ids: list[UUID]
+
+
+async def sync_mcp_server_tools(
+    url: str,
+    server_ids: list[UUID],
+    progress: ToolSyncProgress,
+    headers: Optional[dict] = None,
+    cursor: Optional[str] = None,
+    fingerprint: Optional[str] = None,
+) -> ToolSyncResult:
+    """
+    Stream tools of the mcp server into the db page by page.
+    Changed tools of every page are written right away, tools that are no longer listed
+    are retired once the last page is synced.
+
+    With the `fingerprint` of the stored tools, the tools are first only hashed:
+    an unchanged server costs the listing alone, without db or redis writes.
+    """
+    state = await progress.load()
+    is_resumed = cursor is None and state is not None
+    pages_to_sync: Optional[list[ListToolsResult]] = None
+    if not is_resumed and cursor is None and fingerprint is not None:
+        listing = await hash_mcp_server_tools(url=url, headers=headers)
+        if not listing.is_complete:
+            return ToolSyncResult(
+                is_reachable=listing.pages > 0,
+                is_complete=False,
+                fingerprint=None,
+                changed_tools=0,
+                removed_tool_ids=[],
+                restored_tool_ids=[],
+            )
+        if f"{listing.digest:064x}" == fingerprint:
+            return ToolSyncResult(
+                is_reachable=True,
+                is_complete=True,
+                fingerprint=fingerprint,
+                changed_tools=0,
+                removed_tool_ids=[],
+                restored_tool_ids=[],
             )
+        # tools have changed, small listings are synced from the pages at hand
+        pages_to_sync = listing.buffered_pages
 
+    if is_resumed:
+        cursor, digest = state.cursor, state.digest
+        logger.debug(f"Resuming tool sync of MCP server {url} from cursor {cursor}")
     else:
+        digest = 0
+        await progress.clear()
+
+    pages = 0
+    changed_tools = 0
+    restored_tool_ids = []
+    is_complete = False
+
+    async def on_page(page: ListToolsResult):
+        nonlocal pages, changed_tools, digest
         async with async_session() as db:
-            await mcp_repo.set_as_inactive(db=db, server_url=url)
+            changes = await mcp_repo.upsert_tools_page(
+                db=db, server_ids=server_ids, tools=page.tools
+            )
+        changed_tools += changes.changed
+        restored_tool_ids.extend(changes.restored_tool_ids)
+        digest = combine_tool_digests(digest, page.tools)
+        await progress.save_page(
+            cursor=page.nextCursor, digest=digest, names=[t.name for t in page.tools]
+        )
+        pages += 1
+
+    try:
+        if pages_to_sync is not None:
+            for page in pages_to_sync:
+                await on_page(page)
+        else:
+            await list_mcp_server_tool_pages(
+                url=url, on_page=on_page, headers=headers, cursor=cursor
+            )
+        is_complete = True
+    except* (OSError, httpx.ConnectError, httpx.HTTPStatusError, McpError):
+        logger.warning(
+            f"Tool sync of MCP server {url} stopped after {pages} pages: {traceback.format_exc()}"
+        )
+
+    if not is_complete and not pages and is_resumed:
+        # cursor of the previous run may have expired on the server, start over
+        await progress.clear()
+        return await sync_mcp_server_tools(
+            url=url, server_ids=server_ids, progress=progress, headers=headers
+        )
 
-    validator = FlowValidator()
+    if not is_complete:
+        return ToolSyncResult(
+            is_reachable=pages > 0,
+            is_complete=False,
+            fingerprint=None,
+            changed_tools=changed_tools,
+            removed_tool_ids=[],
+            restored_tool_ids=restored_tool_ids,
+        )
+
+    fingerprint = f"{digest:064x}"
     async with async_session() as db:
-        await validator.trigger_flow_validation_on_agent_state_change(
-            db=db, agent_type=AgentType.mcp
+        db_tools = await mcp_repo.list_tool_ids_and_names(db=db, server_ids=server_ids)
+        unseen = set(await progress.filter_unseen(list({n for _, n in db_tools})))
+        removed_tool_ids = [id_ for id_, name in db_tools if name in unseen]
+        await mcp_repo.retire_tools(db=db, tool_ids=removed_tool_ids)
+        await mcp_repo.set_tools_fingerprint(
+            db=db, server_url=url, fingerprint=fingerprint
         )
+    await progress.clear()
+
+    return ToolSyncResult(
+        is_reachable=True,
+        is_complete=True,
+        fingerprint=fingerprint,
+        changed_tools=changed_tools,
+        removed_tool_ids=removed_tool_ids,
+        restored_tool_ids=restored_tool_ids,
+    )
 
 
-async def lookup_mcp_servers():
+async def bump_catalog_versions_on_change(url: str, fingerprint: str):
     async with async_session() as db:
-        urls: list[str] = await mcp_repo.list_remote_urls_of_all_servers(db=db)
-        tasks = []
+        creator_ids = await mcp_repo.list_creator_ids_by_url(db=db, server_url=url)
+    await catalog_cache.bump_on_fingerprint_change(
+        kind=AgentType.mcp.value,
+        url=url,
+        fingerprint=fingerprint,
+        user_ids=creator_ids,
+    )
 
-        for url in urls:
-            task = asyncio.create_task(lookup_and_update_mcp_server(url=url))
-            tasks.append(task)
 
-        results = await asyncio.gather(*tasks)
-        logger.info(f"Updated info about {len(results)} MCP servers")
-    return
+async def lookup_and_update_mcp_server(url: str, headers={}, cursor=None) -> bool:
+    """
+    Probe the mcp server and sync its tools into the db.
+    A sync interrupted midway keeps the synced pages and is resumed by the next probe.
+
+    Returns:
+        is_active state of the server
+    """
+    async with async_session() as db:
+        server_ids = await mcp_repo.list_server_ids_by_url(db=db, server_url=url)
+        fingerprint = await mcp_repo.get_tools_fingerprint(db=db, server_url=url)
+
+    result = await sync_mcp_server_tools(
+        url=url,
+        server_ids=server_ids,
+        progress=ToolSyncProgress(redis=redis_client.client(), url=url),
+        headers=headers,
+        cursor=cursor,
+        fingerprint=fingerprint,
+    )
+
+    is_active = result.is_reachable
+    async with async_session() as db:
+        changed_server_ids = await mcp_repo.set_is_active(
+            db=db, server_url=url, is_active=is_active
+        )
+
+        # only flows with tools of servers that went up or down, or with retired or restored tools
+        # need to be revalidated
+        tool_ids = [*result.removed_tool_ids, *result.restored_tool_ids]
+        if changed_server_ids:
+            tool_ids += await mcp_repo.list_tool_ids_by_server_ids(
+                db=db, server_ids=changed_server_ids
+            )
+        await FlowValidator().revalidate_flows_of_agents(
+            db=db, agent_ids=tool_ids, agent_type=AgentType.mcp
+        )
+
+    if result.is_complete or not is_active:
+        await bump_catalog_versions_on_change(
+            url=url, fingerprint=f"{is_active}:{result.fingerprint}"
+        )
+    elif result.changed_tools or changed_server_ids:
+        # partial sync, the fingerprint of the full tool list is not known yet
+        async with async_session() as db:
+            creator_ids = await mcp_repo.list_creator_ids_by_url(db=db, server_url=url)
+        await catalog_cache.bump(*creator_ids)
+    return is_active
@@ -3,17 +3,17 @@ from logging import getLogger
 from traceback import format_exc
 from typing import Optional
 
-from fastapi import WebSocket
 from genai_session.session import GenAISession
 from genai_session.utils.naming_enums import ErrorType, WSMessageType
 from pydantic import ValidationError
 from src.db.session import async_session
 from src.repositories.agent import agent_repo
 from src.repositories.flow import agentflow_repo
-from src.repositories.log import log_repo
 from src.repositories.user import user_repo
 from src.schemas.api.agent.schemas import AgentUpdate
-from src.schemas.ws.log import FrontendLogEntryDTO, LogCreate, LogEntry
+from src.schemas.ws.log import LogCreate
+from src.utils.agent_log import AgentLogBuffer
+from src.utils.catalog_cache import catalog_cache
 from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator, generate_alias
 from src.utils.validate_uuid import validate_agent_or_send_err
@@ -37,10 +37,6 @@ async def message_handler_validator(
     request_id: str = "",
     jwt_token: Optional[str] = None,
 ):
-    # NOTE: websocket connection must be initialized by the frontend before it will be accessible here
-    # if websocket is not initialized it won't dump logs to the frontend
-    websocket: WebSocket = state.frontend_ws
-
     try:
         if message_type == WSMessageType.AGENT_REGISTER.value:
             try:
@@ -77,16 +73,21 @@ async def message_handler_validator(
                         alias=alias,
                     )
 
+                    was_active = valid_agent.is_active
                     updated_agent = await agent_repo.update(
                         db=db,
                         db_obj=valid_agent,
                         obj_in=agent_in,
                     )
-                    flow_validator = FlowValidator()
-                    await flow_validator.trigger_flow_validation_on_agent_state_change(
-                        db=db, agent_type=AgentType.genai
-                    )
+                    if not was_active:
+                        # flows with this agent may be complete again
+                        await FlowValidator().revalidate_flows_of_agents(
+                            db=db,
+                            agent_ids=[updated_agent.id],
+                            agent_type=AgentType.genai,
+                        )
                     await db.refresh(updated_agent)
+                    await catalog_cache.bump(updated_agent.creator_id)
                     logger.debug(f"Agent updated: {str(updated_agent.id)}")
 
             except ValidationError as e:
@@ -118,7 +119,7 @@ async def message_handler_validator(
                     )
                     if set_inactive_flows:
                         logger.debug(
-                            f"Flows set as inactive: {''.join(set_inactive_flows)}"
+                            f"Flows set as inactive: {', '.join(set_inactive_flows)}"
                         )
 
                     inactive_agent = await agent_repo.set_agent_as_inactive(
@@ -126,6 +127,7 @@ async def message_handler_validator(
                     )
                     if inactive_agent:
                         logger.debug(f"Set agent as inactive: {agent_uuid}")
+                    await catalog_cache.bump(agent.creator_id)
 
             except ValidationError:
                 logger.error(
@@ -149,16 +151,12 @@ async def message_handler_validator(
                         log_level=log_level,
                         agent_id=agent_uuid,
                     )
-                    async with async_session() as db:
-                        log_entry = await log_repo.create(db, obj_in=log_in)
-                        logger.debug(f"Inserted log for {session_id=}, {request_id=}")
-                        log_out = LogEntry(**log_entry.__dict__)
-
-                        if websocket:
-                            response = FrontendLogEntryDTO(
-                                type=message_type, log=log_out
-                            )
-                            await websocket.send_text(response.model_dump_json())
+                    # logs are inserted in batches and pushed to the frontend by the buffer worker
+                    log_buffer: AgentLogBuffer = state.log_buffer
+                    if not log_buffer.put(log_in):
+                        logger.debug(
+                            f"Log buffer is full, log for {session_id=}, {request_id=} was not buffered"
+                        )
 
                 except Exception:
                     logger.error(f"Unexpected error occured: {traceback.format_exc()}")
@@ -1,5 +1,10 @@
+import base64
+import binascii
+import json
 import typing
+from datetime import datetime
 
+from fastapi import HTTPException
 from pydantic import BaseModel
 from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -67,3 +72,17 @@ async def paginate(
 ) -> dict:
     paginator = Paginator(db, query, page, per_page)
     return await paginator.get_response(cast_to=cast_to)
+
+
+def encode_cursor(created_at: datetime, id_: int) -> str:
+    """Encode the (created_at, id) keyset of the last returned row as an opaque url-safe cursor."""
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": id_})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
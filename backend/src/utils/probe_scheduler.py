@@ -0,0 +1,224 @@
+import asyncio
+import random
+import time
+import traceback
+from logging import getLogger
+from typing import Awaitable, Callable, Optional
+
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
+from src.db.session import async_session
+from src.repositories.a2a import a2a_repo
+from src.repositories.mcp import mcp_repo
+from src.utils.enums import AgentType
+from src.utils.lookup_a2a_agent import lookup_and_update_agent_card
+from src.utils.lookup_mcp_server import lookup_and_update_mcp_server
+from src.utils.redis_client import LoopScopedRedis, redis_client
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+PROBE_SCHEDULE_KEY = "probe_schedule"
+PROBE_STATE_KEY = "probe_state:{endpoint}"
+PROBE_RECONCILED_KEY = "probe_schedule:reconciled"
+# recent state changes after which an endpoint is considered flapping
+FLAPPING_THRESHOLD = 2
+
+
+class ProbeScheduler:
+    """
+    Health probes of registered mcp servers and a2a agents, each endpoint on its own schedule.
+
+    Next probe time of every endpoint is kept in a redis sorted set, a tick only probes the endpoints that are due:
+    - alive and stable endpoints are probed every `base_interval` seconds
+    - dead endpoints back off exponentially up to `max_interval` seconds
+    - flapping endpoints (state changed on recent probes) are probed every `flapping_interval` seconds
+    Every interval is randomized by `jitter` so probes of a large fleet don't line up,
+    and at most `max_concurrency` probes run at the same time.
+    Probe state lives in redis, so it survives restarts of the workers.
+
+    Endpoints are added to and removed from the schedule when they are registered or deleted,
+    the schedule is reconciled with the database once per `base_interval` to catch anything those missed.
+    """
+
+    def __init__(
+        self,
+        redis: LoopScopedRedis = redis_client,
+        base_interval: int = settings.PROBE_BASE_INTERVAL_SECONDS,
+        max_interval: int = settings.PROBE_MAX_INTERVAL_SECONDS,
+        flapping_interval: int = settings.PROBE_FLAPPING_INTERVAL_SECONDS,
+        jitter: float = settings.PROBE_JITTER_RATIO,
+        max_concurrency: int = settings.PROBE_MAX_CONCURRENCY,
+        max_per_tick: int = settings.PROBE_MAX_PER_TICK,
+    ):
+        self.redis = redis
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.flapping_interval = flapping_interval
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.max_per_tick = max_per_tick
+        self.probes: dict[str, Callable[[str], Awaitable[bool]]] = {
+            AgentType.mcp.value: lambda url: lookup_and_update_mcp_server(url=url),
+            AgentType.a2a.value: lambda url: lookup_and_update_agent_card(
+                server_url=url
+            ),
+        }
+
+    def _client(self) -> aioredis.Redis:
+        return self.redis.client()
+
+    @staticmethod
+    def _endpoint(kind: str, url: str) -> str:
+        return f"{kind}:{url}"
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def next_interval(self, is_active: bool, failures: int, flaps: int) -> float:
+        if flaps >= FLAPPING_THRESHOLD:
+            interval = self.flapping_interval
+        elif not is_active:
+            interval = min(
+                self.base_interval * 2 ** max(failures - 1, 0), self.max_interval
+            )
+        else:
+            interval = self.base_interval
+        return self._jittered(interval)
+
+    async def _list_endpoints(self) -> set[str]:
+        async with async_session() as db:
+            mcp_urls = await mcp_repo.list_remote_urls_of_all_servers(db=db)
+            a2a_urls = await a2a_repo.get_all_card_server_urls(db=db)
+        return {
+            *(self._endpoint(AgentType.mcp.value, url) for url in mcp_urls if url),
+            *(self._endpoint(AgentType.a2a.value, url) for url in a2a_urls if url),
+        }
+
+    async def schedule(self, kind: str, url: str):
+        """Schedule probes of a newly registered endpoint, spread over the base interval."""
+        try:
+            await self._client().zadd(
+                PROBE_SCHEDULE_KEY,
+                {
+                    self._endpoint(kind, url): time.time()
+                    + random.uniform(0, self.base_interval)
+                },
+                nx=True,
+            )
+        except Exception:
+            logger.error(
+                f"Could not schedule probes of '{url}': {traceback.format_exc()}"
+            )
+
+    async def unschedule(self, kind: str, url: str):
+        """Stop probing an endpoint that is no longer registered."""
+        endpoint = self._endpoint(kind, url)
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                pipe.zrem(PROBE_SCHEDULE_KEY, endpoint)
+                pipe.delete(PROBE_STATE_KEY.format(endpoint=endpoint))
+                await pipe.execute()
+        except Exception:
+            logger.error(
+                f"Could not unschedule probes of '{url}': {traceback.format_exc()}"
+            )
+
+    async def _reconcile_schedule(self, redis: aioredis.Redis, now: float):
+        """Sync the schedule with the database, at most once per base interval across all workers."""
+        if not await redis.set(
+            PROBE_RECONCILED_KEY, int(now), nx=True, ex=self.base_interval
+        ):
+            return
+        await self._sync_schedule(redis=redis, now=now)
+
+    async def _sync_schedule(self, redis: aioredis.Redis, now: float):
+        """Schedule registered endpoints that are missing from the schedule and forget the removed ones."""
+        endpoints = await self._list_endpoints()
+        scheduled = {e.decode() for e in await redis.zrange(PROBE_SCHEDULE_KEY, 0, -1)}
+
+        async with redis.pipeline(transaction=False) as pipe:
+            if new := endpoints - scheduled:
+                # spread the first probes of new endpoints over the base interval
+                pipe.zadd(
+                    PROBE_SCHEDULE_KEY,
+                    {e: now + random.uniform(0, self.base_interval) for e in new},
+                    nx=True,
+                )
+            if removed := scheduled - endpoints:
+                pipe.zrem(PROBE_SCHEDULE_KEY, *removed)
+                pipe.delete(*(PROBE_STATE_KEY.format(endpoint=e) for e in removed))
+            await pipe.execute()
+
+    async def _probe(
+        self, redis: aioredis.Redis, endpoint: str, semaphore: asyncio.Semaphore
+    ):
+        kind, url = endpoint.split(":", 1)
+        probe = self.probes.get(kind)
+        if not probe:
+            await redis.zrem(PROBE_SCHEDULE_KEY, endpoint)
+            return
+
+        async with semaphore:
+            try:
+                is_active = await probe(url)
+            except Exception:
+                logger.error(f"Probe of '{endpoint}' failed: {traceback.format_exc()}")
+                is_active = False
+
+        state_key = PROBE_STATE_KEY.format(endpoint=endpoint)
+        state = await redis.hgetall(state_key)
+        failures = int(state.get(b"failures", 0))
+        flaps = int(state.get(b"flaps", 0))
+        last_active: Optional[bool] = (
+            state[b"is_active"] == b"1" if b"is_active" in state else None
+        )
+
+        failures = 0 if is_active else failures + 1
+        # every state change counts, every stable probe forgives one
+        if last_active is not None and last_active != is_active:
+            flaps += 1
+        else:
+            flaps = max(flaps - 1, 0)
+
+        interval = self.next_interval(
+            is_active=is_active, failures=failures, flaps=flaps
+        )
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                state_key,
+                mapping={
+                    "is_active": int(is_active),
+                    "failures": failures,
+                    "flaps": flaps,
+                    "probed_at": time.time(),
+                },
+            )
+            # xx: endpoint may have been removed while it was probed
+            pipe.zadd(PROBE_SCHEDULE_KEY, {endpoint: time.time() + interval}, xx=True)
+            await pipe.execute()
+
+    async def tick(self):
+        """Probe the endpoints that are due, to be run every few seconds."""
+        redis = self._client()
+        now = time.time()
+        await self._reconcile_schedule(redis=redis, now=now)
+
+        # endpoints over the limit stay due and are probed on the next ticks
+        due = [
+            e.decode()
+            for e in await redis.zrangebyscore(
+                PROBE_SCHEDULE_KEY, "-inf", now, start=0, num=self.max_per_tick
+            )
+        ]
+        if not due:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(
+            *(self._probe(redis=redis, endpoint=e, semaphore=semaphore) for e in due)
+        )
+        logger.info(f"Probed {len(due)} MCP servers and A2A agents")
+
+
+probe_scheduler = ProbeScheduler()
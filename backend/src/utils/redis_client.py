@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+
+from redis import asyncio as aioredis
+from src.core.settings import get_settings
+
+settings = get_settings()
+
+
+class LoopScopedRedis:
+    """
+    Redis client shared by everything running on an event loop: the app loop, or the persistent celery worker loop.
+
+    Connections of a client are bound to the loop they were opened in. When the client is requested from
+    another loop, the previous client is closed on its own loop if that loop still runs,
+    connections of a loop that is already closed went away with it.
+    """
+
+    def __init__(self, redis_uri: str = settings.REDIS_PUBSUB_URI):
+        self.redis_uri = redis_uri
+        self._redis: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def client(self) -> aioredis.Redis:
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._loop is not loop:
+            self._discard()
+            self._redis = aioredis.from_url(self.redis_uri)
+            self._loop = loop
+        return self._redis
+
+    def _discard(self):
+        if self._redis is None:
+            return
+        if self._loop.is_running() and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._redis.aclose(), self._loop)
+        self._redis = None
+        self._loop = None
+
+    async def close(self):
+        if self._redis is None:
+            return
+        if self._loop is asyncio.get_running_loop():
+            await self._redis.aclose()
+            self._redis = None
+            self._loop = None
+        else:
+            self._discard()
+
+
+redis_client = LoopScopedRedis()
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Optional
+
+from src.schemas.ws.frontend import LLMPropertiesDecryptCreds
+from src.utils.invalidation import InvalidationBus, invalidation_bus
+
+
+class SessionContext:
+    """
+    Per frontend connection cache of the data that is looked up on every chat turn
+    and rarely changes during a chat: whether the chat exists and the resolved llm properties.
+
+    Everything is dropped once the user's generation on the invalidation bus changes
+    or after `ttl_seconds`, the latter covers invalidations missed while redis was unavailable.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        ttl_seconds: int,
+        bus: InvalidationBus = invalidation_bus,
+    ):
+        self.user_id = str(user_id)
+        self.ttl = ttl_seconds
+        self.bus = bus
+        # concurrent turns of a fresh session must not create the chat twice
+        self.chat_lock = asyncio.Lock()
+
+        self._chat_exists = False
+        self._llm_props: dict[tuple[str, str], LLMPropertiesDecryptCreds] = {}
+        self._generation = bus.generation(self.user_id)
+        self._expires_at = time.monotonic() + self.ttl
+
+    def _revalidate(self):
+        generation = self.bus.generation(self.user_id)
+        if generation == self._generation and time.monotonic() < self._expires_at:
+            return
+
+        self._chat_exists = False
+        self._llm_props.clear()
+        self._generation = generation
+        self._expires_at = time.monotonic() + self.ttl
+
+    @property
+    def chat_exists(self) -> bool:
+        self._revalidate()
+        return self._chat_exists
+
+    @property
+    def generation(self) -> int:
+        """Generation to pass to the setters, taken before the values to cache are looked up."""
+        self._revalidate()
+        return self._generation
+
+    def set_chat_exists(self, generation: int):
+        self._revalidate()
+        if generation == self._generation:
+            self._chat_exists = True
+
+    def get_llm_props(
+        self, provider: str, config_name: str
+    ) -> Optional[LLMPropertiesDecryptCreds]:
+        self._revalidate()
+        return self._llm_props.get((provider, config_name))
+
+    def set_llm_props(
+        self,
+        provider: str,
+        config_name: str,
+        props: LLMPropertiesDecryptCreds,
+        generation: int,
+    ):
+        self._revalidate()
+        # values looked up before an invalidation are not cached
+        if generation == self._generation:
+            self._llm_props[(provider, config_name)] = props
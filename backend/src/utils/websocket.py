@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 from fastapi import Depends, Header, WebSocket, status
 
@@ -85,3 +86,49 @@ async def get_current_ws_user(
     except jwt.DecodeError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
+
+
+class FrontendConnection:
+    """
+    Frontend websocket shared by concurrently handled requests and the log subscription hub.
+    Writes are serialized, so frames sent from different tasks never interleave.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    async def send_text(self, data: str):
+        async with self._send_lock:
+            await self.websocket.send_text(data)
+
+    async def try_send_text(self, data: str, timeout: float) -> bool:
+        """
+        Send the frame unless the socket stays busy with other frames for longer than `timeout`.
+        Only the wait for the socket is bounded, a frame that started is always written in full.
+        """
+        try:
+            await asyncio.wait_for(self._send_lock.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        try:
+            await self.websocket.send_text(data)
+        finally:
+            self._send_lock.release()
+        return True
+
+    async def send_json(self, data: dict):
+        async with self._send_lock:
+            await self.websocket.send_json(data)
+
+    async def close(self, code: int, reason: Optional[str] = None):
+        async with self._send_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                await self.websocket.close(code=code, reason=reason)
+            except RuntimeError:
+                # the socket was already closed by the client or the server
+                pass
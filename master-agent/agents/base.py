@@ -1,9 +1,11 @@
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Any
+from functools import cache
+from typing import Any, Optional
 
 from langchain.chat_models.base import BaseChatModel
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import BaseMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.constants import END, START
 from langgraph.graph.state import CompiledStateGraph, StateGraph
@@ -13,13 +15,37 @@ from models.enums import Nodes
 from models.exceptions import UnknownAgentTypeException
 from models.states import MasterAgentState
 from utils.common import filter_and_order_by_ids, remove_last_underscore_segment
+from utils.tool_retrieval import ToolRetriever
 
 
 class BaseMasterAgent(ABC):
-    def __init__(self, model: BaseChatModel, agents: list[dict[str, Any]]) -> None:
+    def __init__(
+            self,
+            model: BaseChatModel,
+            agents: list[dict[str, Any]],
+            tool_retriever: Optional[ToolRetriever] = None,
+            catalog_version: Optional[str] = None,
+            parallel_tool_calls: bool = False,
+            max_parallel_tool_calls: int = 4,
+            tool_call_timeout: Optional[float] = None
+    ) -> None:
         self.model = model
         self.agents = agents
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_parallel_tool_calls = max_parallel_tool_calls
+        self.tool_call_timeout = tool_call_timeout
         self._agents_to_bind_to_llm = [item["agent_schema"] for item in agents]
+        self.tool_retriever = tool_retriever
+        self._tool_index = tool_retriever.get_index(agents=agents, catalog_version=catalog_version) \
+            if tool_retriever else None
+
+    def agents_to_bind(self, messages: list[BaseMessage]) -> list[dict[str, Any]]:
+        """
+        Schemas of the agents to bind to the LLM on the current step, only the relevant ones if retrieval is enabled.
+        """
+        if not self.tool_retriever:
+            return self._agents_to_bind_to_llm
+        return [item["agent_schema"] for item in self.tool_retriever.select(index=self._tool_index, messages=messages)]
 
     @abstractmethod
     def select_agent(self, state: MasterAgentState):
@@ -36,17 +62,49 @@ class BaseMasterAgent(ABC):
 
     async def execute_agent(self, state: MasterAgentState, config: RunnableConfig):
         """
-        Calls remote agent selected by Supervisor using AIConnector library.
+        Calls remote agents selected by Supervisor using AIConnector library.
+        In parallel mode all tool calls of the last message are executed concurrently, the first one otherwise.
         """
+        messages = state.messages
+        agent_calls = messages[-1].tool_calls
+        if not self.parallel_tool_calls:
+            agent_calls = agent_calls[:1]
+
+        if len(agent_calls) == 1:
+            agent_call_message, trace = await self._execute_agent_call(
+                agent_call=agent_calls[0], messages=messages, config=config, timeout=self.tool_call_timeout
+            )
+            return {"messages": [agent_call_message], "trace": [trace]}
+
+        semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
+
+        async def execute(agent_call: dict[str, Any]):
+            async with semaphore:
+                return await self._execute_agent_call(
+                    agent_call=agent_call, messages=messages, config=config, timeout=self.tool_call_timeout
+                )
+
+        logger.info(f"Invoking {len(agent_calls)} agents in parallel")
+        # gather keeps the order of the tool calls, so results are appended in the order the model requested them
+        results = await asyncio.gather(*(execute(agent_call) for agent_call in agent_calls))
+        return {
+            "messages": [agent_call_message for agent_call_message, _ in results],
+            "trace": [trace for _, trace in results]
+        }
+
+    async def _execute_agent_call(
+            self,
+            agent_call: dict[str, Any],
+            messages: list[BaseMessage],
+            config: RunnableConfig,
+            timeout: Optional[float] = None
+    ) -> tuple[ToolMessage, dict[str, Any]]:
         from connectors.entities import AgentTypeEnum, GenAIConfig, GenAIFlowConfig, MCPConfig, A2AConfig
         from connectors.factory import ConnectorFactory
 
-        messages = state.messages
-        agent_call = messages[-1].tool_calls[0]
         agent_name = agent_call["name"]
-
-        agent_to_execute = [agent for agent in self.agents if agent["name"] == agent_name][0]
-        agent_type = agent_to_execute["type"]
+        agent_to_execute = next((agent for agent in self.agents if agent["name"] == agent_name), {})
+        agent_type = agent_to_execute.get("type")
 
         try:
             if agent_type == AgentTypeEnum.gen_ai.value:
@@ -66,7 +124,11 @@ class BaseMasterAgent(ABC):
                     ),
                     model=self.model,
                     messages=messages[:-1].copy(),  # exclude last AI message
-                    session=config.get("configurable", {}).get("session")
+                    session=config.get("configurable", {}).get("session"),
+                    flow=agent_to_execute.get("flow", []),
+                    dependencies=agent_to_execute.get("flow_dependencies"),
+                    bindings=agent_to_execute.get("flow_bindings"),
+                    arguments=agent_call["args"]
                 )
             elif agent_type == AgentTypeEnum.mcp.value:
                 agent_config = MCPConfig(
@@ -89,7 +151,7 @@ class BaseMasterAgent(ABC):
             connector = ConnectorFactory.get_connector(agent_config)
 
             logger.info(f"Invoking {agent_name} ({agent_type}) with parameters: {agent_call["args"]}")
-            response, trace = await connector.invoke()
+            response, trace = await asyncio.wait_for(connector.invoke(), timeout=timeout)
             logger.success(f"Agent {agent_name} response: {response}")
 
             agent_call_message = ToolMessage(
@@ -97,10 +159,13 @@ class BaseMasterAgent(ABC):
                 name=agent_to_execute.get("name"),
                 tool_call_id=agent_call["id"],
             )
-            return {"messages": [agent_call_message], "trace": [trace]}
+            return agent_call_message, trace
 
         except Exception as e:
-            error_message = f"Unexpected error while invoking {agent_name}: {e}"
+            if isinstance(e, asyncio.TimeoutError):
+                error_message = f"{agent_name} did not respond within {timeout} seconds"
+            else:
+                error_message = f"Unexpected error while invoking {agent_name}: {e}"
             logger.exception(error_message)
 
             trace = {
@@ -109,31 +174,76 @@ class BaseMasterAgent(ABC):
                 "output": error_message,
                 "is_success": False
             }
-            return {
-                "messages": ToolMessage(
-                    content=error_message,
-                    name=agent_to_execute.get("name")
-                ),
-                "trace": [trace]
-            }
+            agent_call_message = ToolMessage(
+                content=error_message,
+                name=agent_to_execute.get("name"),
+                tool_call_id=agent_call["id"],
+            )
+            return agent_call_message, trace
 
     @property
     def graph(self) -> CompiledStateGraph:
         """
-        Execution graph of Master Agent.
+        Execution graph of Master Agent, compiled once and shared by all master agents.
+        The agent running the graph is passed in the config, use `ainvoke` to run it.
         """
-        workflow = StateGraph(MasterAgentState)
-
-        workflow.add_node(Nodes.supervisor.value, self.select_agent)
-        workflow.add_node(Nodes.execute_agent.value, self.execute_agent)
+        return master_agent_graph()
 
-        workflow.add_edge(START, Nodes.supervisor.value)
-        workflow.add_conditional_edges(
-            Nodes.supervisor.value,
-            self.should_continue,
-            [Nodes.execute_agent.value, END]
+    async def ainvoke(self, messages: list[BaseMessage], config: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """
+        Runs the shared execution graph with this agent, returns the final state.
+        """
+        config = config or {}
+        return await self.graph.ainvoke(
+            input={"messages": messages},
+            config={**config, "configurable": {**config.get("configurable", {}), MASTER_AGENT_CONFIG_KEY: self}}
         )
-        workflow.add_edge(Nodes.execute_agent.value, Nodes.supervisor.value)
 
-        compiled_graph = workflow.compile()
-        return compiled_graph
+
+MASTER_AGENT_CONFIG_KEY = "master_agent"
+
+
+def _master_agent(config: RunnableConfig) -> BaseMasterAgent:
+    return config["configurable"][MASTER_AGENT_CONFIG_KEY]
+
+
+async def _select_agent(state: MasterAgentState, config: RunnableConfig):
+    return await _master_agent(config).select_agent(state)
+
+
+async def _execute_agent(state: MasterAgentState, config: RunnableConfig):
+    return await _master_agent(config).execute_agent(state, config)
+
+
+def _should_continue(state: MasterAgentState, config: RunnableConfig):
+    return _master_agent(config).should_continue(state)
+
+
+def build_master_agent_graph() -> CompiledStateGraph:
+    """
+    Builds and compiles the execution graph of Master Agent.
+    Nodes dispatch to the master agent passed in `config["configurable"]["master_agent"]`,
+    so the graph doesn't depend on the model or the agents of a request.
+    """
+    workflow = StateGraph(MasterAgentState)
+
+    workflow.add_node(Nodes.supervisor.value, _select_agent)
+    workflow.add_node(Nodes.execute_agent.value, _execute_agent)
+
+    workflow.add_edge(START, Nodes.supervisor.value)
+    workflow.add_conditional_edges(
+        Nodes.supervisor.value,
+        _should_continue,
+        [Nodes.execute_agent.value, END]
+    )
+    workflow.add_edge(Nodes.execute_agent.value, Nodes.supervisor.value)
+
+    return workflow.compile()
+
+
+@cache
+def master_agent_graph() -> CompiledStateGraph:
+    """
+    Execution graph shared by all master agents, compiled on first use.
+    """
+    return build_master_agent_graph()
@@ -1,22 +1,167 @@
-from typing import Any
+import asyncio
+import json
+import uuid
+from typing import Any, Optional
 
+import jmespath
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from loguru import logger
 
 from agents.base import BaseMasterAgent
+from models.exceptions import InvalidFlowException
 from models.states import MasterAgentState
 from utils.agents import select_agent_and_resolve_parameters
 from utils.tracing import trace_execution_time
 
 
+def parse_step_output(content: Any) -> Any:
+    """
+    Output of a step as json, agents commonly respond with json encoded as a string.
+    """
+    for _ in range(2):
+        if not isinstance(content, str):
+            break
+        try:
+            content = json.loads(content)
+        except ValueError:
+            break
+    return content
+
+
 class FlowMasterAgent(BaseMasterAgent):
     def __init__(
             self,
             model: BaseChatModel,
             agents: list[dict[str, Any]], # ordered list of agents to execute
+            dependencies: Optional[list[list[int]]] = None,  # positions of the steps each step depends on
+            bindings: Optional[list[Optional[dict[str, str]]]] = None  # argument bindings of each step
     ) -> None:
         super().__init__(model=model, agents=agents)
+        for name, per_step in (("dependencies", dependencies), ("bindings", bindings)):
+            if per_step is not None and len(per_step) != len(agents):
+                raise InvalidFlowException(f"Flow has {len(agents)} steps, but {name} of {len(per_step)} steps")
+        self.dependencies = dependencies or [[position - 1] if position else [] for position in range(len(agents))]
+        self.bindings = bindings or [None] * len(agents)
+
+    @property
+    def is_linear(self) -> bool:
+        """
+        Every step depends only on the previous one, the flow is executed by the graph step by step.
+        """
+        return all(
+            deps == ([position - 1] if position else []) for position, deps in enumerate(self.dependencies)
+        )
+
+    @property
+    def has_bindings(self) -> bool:
+        return any(self.bindings)
+
+    def resolve_bound_call(
+            self,
+            position: int,
+            context: dict[str, Any]
+    ) -> AIMessage:
+        """
+        Tool call of a step with argument bindings, arguments are evaluated from the context instead of asking the LLM.
+        """
+        arguments = {
+            argument: jmespath.search(expression, context)
+            for argument, expression in self.bindings[position].items()
+        }
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": self.agents[position]["name"], "args": arguments, "id": f"call_{uuid.uuid4().hex}"}]
+        )
+
+    async def run_dag(
+            self,
+            messages: list[BaseMessage],
+            config: RunnableConfig,
+            arguments: Optional[dict[str, Any]] = None
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """
+        Executes the flow as a DAG: every step starts as soon as the steps it depends on are done,
+        so independent branches run concurrently and the flow takes as long as its critical path.
+        A step sees the conversation and the calls and responses of all the steps it transitively depends on.
+        Steps with argument bindings are called with arguments evaluated from
+        `input` (arguments of the flow), `message` (last user message) and `steps` (outputs of the steps),
+        without resolving them with the LLM.
+
+        Returns:
+            response of the flow (responses of the steps nothing depends on) and traces of the steps in flow order
+        """
+        ancestors: list[set[int]] = []
+        for deps in self.dependencies:
+            ancestors.append(set(deps).union(*(ancestors[d] for d in deps)))
+        sinks = set(range(len(self.agents))) - {d for deps in self.dependencies for d in deps}
+
+        last_message = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        context = {
+            "input": arguments or {},
+            "message": last_message.content if last_message else None,
+            "steps": [None] * len(self.agents),
+        }
+        results: list[Optional[list[BaseMessage]]] = [None] * len(self.agents)
+        traces: list[list[dict[str, Any]]] = [[] for _ in self.agents]
+        errors: dict[int, str] = {}
+        tasks: list[asyncio.Task] = []
+
+        async def run_step(position: int):
+            deps = self.dependencies[position]
+            await asyncio.gather(*(tasks[d] for d in deps))
+            if failed := [d for d in deps if d in errors]:
+                errors[position] = errors[failed[0]]
+                return
+
+            agent_to_execute = self.agents[position]
+            step_messages = [
+                *messages,
+                *(message for ancestor in sorted(ancestors[position]) for message in results[ancestor])
+            ]
+            trace = {
+                "name": "MasterAgent",
+                "input": step_messages[-1].model_dump(),
+            }
+            try:
+                async with trace_execution_time(trace=trace):
+                    if self.bindings[position]:
+                        response = self.resolve_bound_call(position=position, context=context)
+                    else:
+                        logger.info(f"Resolving parameters for {agent_to_execute.get("name")} in the flow")
+                        response = await select_agent_and_resolve_parameters(
+                            model=self.model,
+                            messages=step_messages,
+                            agents=[agent_to_execute["agent_schema"]],
+                            agent_choice=True  # force the current agent to be called
+                        )
+                trace.update({"output": response.model_dump(), "is_success": True})
+
+                agent_call_message, agent_trace = await self._execute_agent_call(
+                    agent_call=response.tool_calls[0], messages=[*step_messages, response], config=config
+                )
+                results[position] = [response, agent_call_message]
+                context["steps"][position] = parse_step_output(agent_call_message.content)
+                traces[position] = [trace, agent_trace]
+
+            except Exception as e:
+                error_message = f"Unexpected error while resolving parameters for agent in the flow: {e}"
+                logger.exception(error_message)
+                trace.update({"output": error_message, "is_success": False})
+                traces[position] = [trace]
+                errors[position] = error_message
+
+        for position in range(len(self.agents)):
+            # steps depend only on earlier steps, their tasks already exist
+            tasks.append(asyncio.create_task(run_step(position)))
+        await asyncio.gather(*tasks)
+
+        flow_trace = [trace for step_traces in traces for trace in step_traces]
+        if errors:
+            return errors[min(errors)], flow_trace
+        response = "\n\n".join(str(results[sink][-1].content) for sink in sorted(sinks))
+        return response, flow_trace
 
     async def select_agent(self, state: MasterAgentState):
         messages = state.messages
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage
@@ -7,6 +7,7 @@ from loguru import logger
 from agents.base import BaseMasterAgent
 from models.states import MasterAgentState
 from utils.agents import select_agent_and_resolve_parameters
+from utils.tool_retrieval import ToolRetriever
 from utils.tracing import trace_execution_time
 
 
@@ -14,7 +15,12 @@ class ReActMasterAgent(BaseMasterAgent):
     def __init__(
             self,
             model: BaseChatModel,
-            agents: list[dict[str, Any]]
+            agents: list[dict[str, Any]],
+            tool_retriever: Optional[ToolRetriever] = None,
+            catalog_version: Optional[str] = None,
+            parallel_tool_calls: bool = False,
+            max_parallel_tool_calls: int = 4,
+            tool_call_timeout: Optional[float] = None
     ) -> None:
         """
         Supervisor agent building on top of ReAct framework to automatically execute available agents and flows.
@@ -23,9 +29,21 @@ class ReActMasterAgent(BaseMasterAgent):
         Args:
             model (BaseChatModel): Langchain chat model (preferably OpenAI or Azure OpenAI)
             agents (list[dict[str, Any]]): List of available agents
+            tool_retriever (Optional[ToolRetriever]): Selects the agents relevant to the conversation, all agents are bound if not set
+            catalog_version (Optional[str]): Version of the agents catalog, used to reuse the retrieval index
+            parallel_tool_calls (bool): Allow the model to select several agents at once and execute them concurrently
+            max_parallel_tool_calls (int): Max number of agents executed at the same time
+            tool_call_timeout (Optional[float]): Seconds to wait for a single agent response, no limit if not set
         """
-        super().__init__(model, agents)
-        self._agents_to_bind_to_llm = [item["agent_schema"] for item in agents]
+        super().__init__(
+            model,
+            agents,
+            tool_retriever=tool_retriever,
+            catalog_version=catalog_version,
+            parallel_tool_calls=parallel_tool_calls,
+            max_parallel_tool_calls=max_parallel_tool_calls,
+            tool_call_timeout=tool_call_timeout
+        )
 
     async def select_agent(self, state: MasterAgentState):
         """
@@ -44,11 +62,13 @@ class ReActMasterAgent(BaseMasterAgent):
                 response = await select_agent_and_resolve_parameters(
                     model=self.model,
                     messages=messages,
-                    agents=self._agents_to_bind_to_llm
+                    agents=self.agents_to_bind(messages),
+                    parallel_tool_calls=self.parallel_tool_calls
                 )
 
             if response.tool_calls:
-                logger.success(f"Selected {response.tool_calls[0]["name"]} with args {response.tool_calls[0]["args"]}")
+                for tool_call in response.tool_calls:
+                    logger.success(f"Selected {tool_call["name"]} with args {tool_call["args"]}")
             else:
                 logger.success(f"No agent is selected, generating final response")
 
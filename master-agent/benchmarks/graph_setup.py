@@ -0,0 +1,67 @@
+"""
+Per-turn setup cost of the master agent graph: compiling a new graph on every turn vs reusing the shared one.
+
+Each turn creates a master agent over a catalog of agents and runs the graph for a single supervisor step
+with a stub model, so the numbers show graph setup and invocation overhead only, without LLM or agent calls.
+
+Run from the master-agent directory:
+    python -m benchmarks.graph_setup --turns 200 --agents 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.base import MASTER_AGENT_CONFIG_KEY, BaseMasterAgent, build_master_agent_graph, master_agent_graph
+from models.states import MasterAgentState
+
+
+class StubMasterAgent(BaseMasterAgent):
+    async def select_agent(self, state: MasterAgentState):
+        return {"messages": [AIMessage(content="done")], "trace": []}
+
+
+def make_agents(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": str(i),
+            "name": f"agent_{i}",
+            "type": "mcp",
+            "agent_schema": {"type": "function", "function": {"name": f"agent_{i}", "description": f"Agent {i}"}},
+        }
+        for i in range(count)
+    ]
+
+
+async def run_turn(agents: list[dict[str, Any]], shared: bool) -> float:
+    start = time.perf_counter()
+    master_agent = StubMasterAgent(model=None, agents=agents)
+    graph = master_agent_graph() if shared else build_master_agent_graph()
+    await graph.ainvoke(
+        input={"messages": [HumanMessage(content="hello")]},
+        config={"configurable": {MASTER_AGENT_CONFIG_KEY: master_agent}}
+    )
+    return time.perf_counter() - start
+
+
+async def main(turns: int, agents_count: int):
+    agents = make_agents(agents_count)
+    master_agent_graph()  # compiled at startup in main.py
+
+    for label, shared in (("compile per turn", False), ("shared graph", True)):
+        timings = [await run_turn(agents=agents, shared=shared) for _ in range(turns)]
+        print(
+            f"{label:>18}: mean {statistics.mean(timings) * 1000:.2f} ms, "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--agents", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(turns=args.turns, agents_count=args.agents))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -24,4 +26,23 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(
         default="GenAI-ddc5e9f5-c340-4dcc-9872-d7f098b6b172",
         alias="SECRET_KEY"
-    )
\ No newline at end of file
+    )
+    # Tool retrieval: only top k agents relevant to the conversation are bound to the LLM, 0 binds all of them
+    TOOL_RETRIEVAL_TOP_K: int = Field(
+        default=20, alias="TOOL_RETRIEVAL_TOP_K"
+    )
+    # names of the agents bound to the LLM on every step, regardless of their relevance
+    TOOL_RETRIEVAL_ALWAYS_INCLUDE: list[str] = Field(
+        default=[], alias="TOOL_RETRIEVAL_ALWAYS_INCLUDE"
+    )
+    # Parallel tool calls: the model may select several agents at once, executed concurrently
+    PARALLEL_TOOL_CALLS: bool = Field(
+        default=False, alias="PARALLEL_TOOL_CALLS"
+    )
+    MAX_PARALLEL_TOOL_CALLS: int = Field(
+        default=4, alias="MAX_PARALLEL_TOOL_CALLS"
+    )
+    # seconds to wait for a single agent response, no limit if not set
+    TOOL_CALL_TIMEOUT_SECONDS: Optional[float] = Field(
+        default=None, alias="TOOL_CALL_TIMEOUT_SECONDS"
+    )
@@ -2,13 +2,14 @@ import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 from genai_session.session import GenAISession
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
 
 from agents.flow_master_agent import FlowMasterAgent
+from models.exceptions import InvalidFlowException
 
 
 class AgentTypeEnum(Enum):
@@ -63,13 +64,24 @@ class GenAIFlowConfig(AgentConfig):
     model: BaseChatModel
     messages: list[BaseMessage]
     session: GenAISession
+    dependencies: Optional[list[list[int]]] = None  # positions of the steps each step depends on, None if linear
+    bindings: Optional[list[Optional[dict[str, str]]]] = None  # argument bindings of each step
+    arguments: dict = field(default_factory=dict)  # arguments the flow was called with
+    flow: list[str] = field(default_factory=list)  # ids of the agents of the flow steps, in flow order
     flow_master_agent: FlowMasterAgent = field(init=False)
 
     def __post_init__(self):
         self.agent_type = AgentTypeEnum.flow.value
+        if len(self.agents) != len(self.flow):
+            # dependencies and bindings refer to positions of the steps, they can't be applied to the remaining steps
+            available = {agent["id"] for agent in self.agents}
+            missing = [agent_id for agent_id in self.flow if agent_id not in available]
+            raise InvalidFlowException(f"Flow {self.name} can't be executed, agents of its steps are not available: {missing}")
         self.flow_master_agent = FlowMasterAgent(
             model=self.model,
-            agents=self.agents
+            agents=self.agents,
+            dependencies=self.dependencies,
+            bindings=self.bindings
         )
 
 
@@ -169,9 +169,20 @@ class GenAIFlowConnector(ConnectorStrategy):
             "type": config.agent_type
         }
 
+        flow_master_agent = config.flow_master_agent
+        if not flow_master_agent.is_linear or flow_master_agent.has_bindings:
+            # independent branches of the flow run concurrently, bound steps are called without the LLM
+            async with trace_execution_time(trace=trace):
+                response, trace["flow"] = await flow_master_agent.run_dag(
+                    messages=config.messages.copy(),
+                    config={"configurable": {"session": session}},
+                    arguments=config.arguments
+                )
+            return response, trace
+
         async with trace_execution_time(trace=trace):
-            final_state = await config.flow_master_agent.graph.ainvoke(
-                input={"messages": config.messages.copy()},
+            final_state = await flow_master_agent.ainvoke(
+                messages=config.messages.copy(),
                 config={"configurable": {"session": session}}
             )
 
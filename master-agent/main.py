@@ -6,17 +6,26 @@ from genai_session.utils.context import GenAIContext
 from langchain_core.messages import SystemMessage
 from loguru import logger
 
+from agents.base import master_agent_graph
 from agents.react_master_agent import ReActMasterAgent
 from config.settings import Settings
 from llms import LLMFactory
 from prompts import FILE_RELATED_SYSTEM_PROMPT, MEXICAN_OIL_FORECASTING_PROMPT
-from utils.agents import get_agents
-from utils.chat_history import get_chat_history
 from utils.common import attach_files_to_message
+from utils.tool_retrieval import ToolRetriever
+from utils.turn_context import get_turn_context
 import re
 
 app_settings = Settings()
 
+# compiled once, shared by the master agents of all requests
+master_agent_graph()
+
+tool_retriever = ToolRetriever(
+    top_k=app_settings.TOOL_RETRIEVAL_TOP_K,
+    always_include=app_settings.TOOL_RETRIEVAL_ALWAYS_INCLUDE
+)
+
 session = GenAISession(
     api_key=app_settings.MASTER_AGENT_API_KEY,
     ws_url=app_settings.ROUTER_WS_URL
@@ -35,6 +44,16 @@ async def receive_message(
     try:
         graph_config = {"configurable": {"session": session}, "recursion_limit": 100}  # recursion_limit can be adjusted
 
+        chat_history, agents, request_files, catalog_version = await get_turn_context(
+            f"{app_settings.BACKEND_API_URL}/internal/turn-context",
+            session_id=session_id,
+            user_id=user_id,
+            api_key=app_settings.MASTER_BE_API_KEY,
+            max_last_messages=configs.get("max_last_messages", 5),
+            request_id=agent_context.request_id,
+        )
+        files = files or request_files
+
         base_system_prompt = configs.get("system_prompt")
         user_system_prompt = configs.get("user_prompt")
 
@@ -48,36 +67,26 @@ async def receive_message(
             
         system_prompt = f"{system_prompt}\n\n{FILE_RELATED_SYSTEM_PROMPT}"
 
-        chat_history = await get_chat_history(
-            f"{app_settings.BACKEND_API_URL}/chat",
-            session_id=session_id,
-            user_id=user_id,
-            api_key=app_settings.MASTER_BE_API_KEY,
-            max_last_messages=configs.get("max_last_messages", 5)
-        )
-
         chat_history[-1] = attach_files_to_message(message=chat_history[-1], files=files) if files else chat_history[-1]
         init_messages = [
             SystemMessage(content=system_prompt),
             *chat_history
         ]
 
-        agents = await get_agents(
-            url=f"{app_settings.BACKEND_API_URL}/agents/active",
-            agent_type="all",
-            api_key=app_settings.MASTER_BE_API_KEY,
-            user_id=user_id
-        )
-
         llm = LLMFactory.create(configs=configs)
-        master_agent = ReActMasterAgent(model=llm, agents=agents)
+        master_agent = ReActMasterAgent(
+            model=llm,
+            agents=agents,
+            tool_retriever=tool_retriever,
+            catalog_version=catalog_version,
+            parallel_tool_calls=app_settings.PARALLEL_TOOL_CALLS,
+            max_parallel_tool_calls=app_settings.MAX_PARALLEL_TOOL_CALLS,
+            tool_call_timeout=app_settings.TOOL_CALL_TIMEOUT_SECONDS
+        )
 
         logger.info("Running Master Agent")
 
-        final_state = await master_agent.graph.ainvoke(
-            input={"messages": init_messages},
-            config=graph_config
-        )
+        final_state = await master_agent.ainvoke(messages=init_messages, config=graph_config)
 
         response = final_state["messages"][-1].content
 
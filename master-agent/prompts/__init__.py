@@ -1 +1 @@
-from prompts.prompts import FILE_RELATED_SYSTEM_PROMPT  # noqa: F401
+from prompts.prompts import FILE_RELATED_SYSTEM_PROMPT, MEXICAN_OIL_FORECASTING_PROMPT  # noqa: F401
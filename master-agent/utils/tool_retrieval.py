@@ -0,0 +1,129 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+CAMEL_CASE_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(CAMEL_CASE_PATTERN.sub(" ", text).lower())
+
+
+def schema_text(value: Any) -> str:
+    """
+    Flattens agent schema to text: names, titles and descriptions of the agent and of its parameters.
+    """
+    if isinstance(value, dict):
+        return " ".join(f"{key} {schema_text(item)}" for key, item in value.items())
+    if isinstance(value, list):
+        return " ".join(schema_text(item) for item in value)
+    if isinstance(value, str):
+        return value
+    return ""
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over agent names, descriptions and schemas.
+    """
+
+    def __init__(self, agents: list[dict[str, Any]], k1: float = 1.5, b: float = 0.75) -> None:
+        self.agents = agents
+        self.k1 = k1
+        self.b = b
+
+        self._term_freqs = [Counter(tokenize(self._document(agent))) for agent in agents]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+
+        doc_freqs = Counter(term for tf in self._term_freqs for term in tf)
+        n = len(agents)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+
+    @staticmethod
+    def _document(agent: dict[str, Any]) -> str:
+        return f"{agent.get('name', '')} {schema_text(agent.get('agent_schema', {}))}"
+
+    def _score(self, doc: int, query_terms: list[str]) -> float:
+        tf = self._term_freqs[doc]
+        norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / (self._avg_length or 1))
+        score = 0.0
+        for term in query_terms:
+            if freq := tf.get(term):
+                score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return score
+
+    def top_k(self, query: str, k: int) -> list[dict[str, Any]]:
+        """
+        Returns k agents most relevant to the query, best first. Agents not matching any term are left out.
+        """
+        query_terms = [term for term in set(tokenize(query)) if term in self._idf]
+        scores = [(self._score(doc, query_terms), doc) for doc in range(len(self.agents))]
+        ranked = sorted((item for item in scores if item[0] > 0), key=lambda item: -item[0])
+        return [self.agents[doc] for _, doc in ranked[:k]]
+
+
+class ToolRetriever:
+    """
+    Selects the agents to bind to the LLM on a supervisor step, so the prompt doesn't grow with the catalog.
+
+    Indexes are cached by catalog version (etag of the active agents catalog of the backend),
+    an index is built only for a catalog that has not been seen before.
+    """
+
+    def __init__(self, top_k: int, always_include: list[str], max_indexes: int = 128) -> None:
+        self.top_k = top_k
+        self.always_include = set(always_include)
+        self.max_indexes = max_indexes
+        self._indexes: OrderedDict[str, BM25Index] = OrderedDict()
+
+    def get_index(self, agents: list[dict[str, Any]], catalog_version: Optional[str]) -> BM25Index:
+        if catalog_version is None:
+            return BM25Index(agents=agents)
+
+        if index := self._indexes.get(catalog_version):
+            self._indexes.move_to_end(catalog_version)
+            return index
+
+        index = BM25Index(agents=agents)
+        self._indexes[catalog_version] = index
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+        return index
+
+    @staticmethod
+    def conversation_query(messages: list[BaseMessage], last_messages: int = 3) -> str:
+        """
+        Query of the current step: the latest user request and the messages that followed it.
+        """
+        conversation = [message for message in messages if not isinstance(message, SystemMessage)]
+        last_request = next(
+            (i for i in range(len(conversation) - 1, -1, -1) if isinstance(conversation[i], HumanMessage)),
+            max(len(conversation) - last_messages, 0)
+        )
+        recent = conversation[last_request:][-last_messages:]
+        if last_request < len(conversation) and conversation[last_request] not in recent:
+            recent = [conversation[last_request], *recent]
+        return " ".join(str(message.content) for message in recent)
+
+    def select(self, index: BM25Index, messages: list[BaseMessage]) -> list[dict[str, Any]]:
+        """
+        Returns the top k agents relevant to the conversation and the always included ones, in catalog order.
+        All agents are returned when the catalog is not larger than k, k is 0, or no agent matches the conversation.
+        """
+        if not self.top_k or len(index.agents) <= self.top_k:
+            return index.agents
+
+        relevant = index.top_k(query=self.conversation_query(messages), k=self.top_k)
+        if not relevant:
+            return index.agents
+
+        selected = {id(agent) for agent in relevant}
+        return [
+            agent for agent in index.agents
+            if id(agent) in selected or agent.get("name") in self.always_include
+        ]
@@ -0,0 +1,39 @@
+from typing import Any, Optional
+
+import httpx
+from langchain_core.messages import BaseMessage
+
+from utils.chat_history import chat_history_to_messages
+
+
+async def get_turn_context(
+        url: str,
+        session_id: str,
+        user_id: str,
+        api_key: str,
+        max_last_messages: int,
+        request_id: Optional[str] = None,
+) -> tuple[list[BaseMessage], list[dict[str, Any]], list[dict[str, Any]], Optional[str]]:
+    """
+    Fetches chat history, active agents and files of the request with a single backend call.
+
+    Returns:
+        chat history messages (oldest first), active agents, files metadata and version of the agents catalog
+    """
+    params = {"session_id": session_id, "user_id": user_id, "max_last_messages": max_last_messages}
+    if request_id:
+        params["request_id"] = request_id
+
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers={"X-API-KEY": api_key}, params=params)
+
+        response.raise_for_status()
+        turn_context = response.json()
+
+    messages = chat_history_to_messages(chat_history=turn_context["messages"])
+    return (
+        messages,
+        turn_context["agents"]["active_connections"],
+        turn_context["files"],
+        turn_context.get("catalog_version")
+    )
@@ -973,3 +973,110 @@ async def test_agentflows_patch_agentflow_that_dows_not_exist(
 
             except asyncio.CancelledError:
                 logging.info("Background task has been properly cancelled.")
+
+
+@pytest.mark.asyncio
+async def test_agentflows_patch_flow_dependencies(
+    user_jwt_token: str,
+    agent_factory: Callable[[str], Awaitable[AgentDTOWithJWT]],
+    crud_flow_output_factory: Callable[[str, str, list, bool], dict],
+):
+    dummy_agents = [await agent_factory(user_jwt_token) for _ in range(3)]
+    sessions = [GenAISession(jwt_token=dummy_agent.jwt) for dummy_agent in dummy_agents]
+
+    for session, dummy_agent in zip(sessions, dummy_agents):
+
+        @session.bind(name=dummy_agent.name, description=dummy_agent.description)
+        async def example_agent(agent_context=""):
+            return True
+
+    event_tasks = []
+    try:
+        for session in sessions:
+            event_tasks.append(asyncio.create_task(session.process_events()))
+            await asyncio.sleep(0.1)
+
+        linear_flow = [
+            {"id": session.agent_id, "type": "genai"} for session in sessions
+        ]
+
+        await http_client.post(
+            path=AGENTFLOWS_REGISTER_FLOW,
+            json={
+                "name": AIRFLOW_NAME,
+                "description": AIRFLOW_DESCRIPTION,
+                "flow": linear_flow,
+            },
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        [agentflow] = await http_client.get(
+            path=AGENTFLOWS,
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+        agentflow_id = agentflow["id"]
+
+        # the first two steps become independent branches joined by the last step
+        dag_flow = [
+            {"id": sessions[0].agent_id, "type": "genai", "depends_on": []},
+            {"id": sessions[1].agent_id, "type": "genai", "depends_on": []},
+            {"id": sessions[2].agent_id, "type": "genai", "depends_on": [0, 1]},
+        ]
+
+        await http_client.patch(
+            path=AGENTFLOW_ID.format(agentflow_id=agentflow_id),
+            json={
+                "name": AIRFLOW_NAME,
+                "description": AIRFLOW_DESCRIPTION,
+                "flow": dag_flow,
+            },
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        # the second step can't wait for the last one
+        await http_client.patch(
+            path=AGENTFLOW_ID.format(agentflow_id=agentflow_id),
+            json={
+                "name": AIRFLOW_NAME,
+                "description": AIRFLOW_DESCRIPTION,
+                "flow": [
+                    {"id": sessions[0].agent_id, "type": "genai", "depends_on": []},
+                    {"id": sessions[1].agent_id, "type": "genai", "depends_on": [2]},
+                    {"id": sessions[2].agent_id, "type": "genai", "depends_on": [0]},
+                ],
+            },
+            expected_status_codes=[400, 422],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        agentflows = await http_client.get(
+            path=AGENTFLOWS,
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        assert len(agentflows) == 1
+
+        [agentflow] = agentflows
+
+        agentflow.pop("created_at")
+        agentflow.pop("updated_at")
+
+        assert agentflow.pop("id") == agentflow_id
+
+        assert agentflows == [
+            crud_flow_output_factory(AIRFLOW_NAME, AIRFLOW_DESCRIPTION, dag_flow, True)
+        ]
+
+    finally:
+        for task in event_tasks:
+            task.cancel()
+
+            try:
+                await task
+
+            except asyncio.CancelledError:
+                logging.info("Background task has been properly cancelled.")
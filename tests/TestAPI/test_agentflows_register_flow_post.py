@@ -875,3 +875,177 @@ async def test_agentflows_register_agentflows_with_another_agentflow_id_as_agent
 
             except asyncio.CancelledError:
                 logging.info("Background task has been properly cancelled.")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "depends_on",
+    [
+        ([[1], []]),
+        ([[], [1]]),
+        ([[], [], [0, 0]]),
+        ([[], [-1]]),
+    ],
+    ids=[
+        "register flow with step depending on a later step",
+        "register flow with step depending on itself",
+        "register flow with duplicated dependency",
+        "register flow with negative dependency",
+    ],
+)
+async def test_agentflows_register_agentflow_with_invalid_dependencies(
+    depends_on, user_jwt_token: str
+):
+    json_data = {
+        "name": "Agenflow Name",
+        "description": "Agentflow Description",
+        "flow": [
+            {"id": str(uuid.uuid4()), "type": "genai", "depends_on": step_depends_on}
+            for step_depends_on in depends_on
+        ],
+    }
+
+    await http_client.post(
+        path=AGENTFLOWS_REGISTER_FLOW,
+        json=json_data,
+        expected_status_codes=[400, 422],
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+    agentflows = await http_client.get(
+        path=AGENTFLOWS,
+        expected_status_codes=[200],
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+    assert agentflows == []
+
+
+@pytest.mark.asyncio
+async def test_agentflows_register_agentflow_with_dependencies(
+    user_jwt_token: str,
+    agent_factory: Callable[[str], Awaitable[AgentDTOWithJWT]],
+    crud_flow_output_factory: Callable[[str, str, list[dict], bool], dict],
+):
+    AGENTFLOW_NAME = "Airflow Name"
+    AGENTFLOW_DESCRIPTION = "Airflow Description"
+
+    dummy_agents = [await agent_factory(user_jwt_token) for _ in range(3)]
+    sessions = [GenAISession(jwt_token=dummy_agent.jwt) for dummy_agent in dummy_agents]
+
+    for session, dummy_agent in zip(sessions, dummy_agents):
+
+        @session.bind(name=dummy_agent.name, description=dummy_agent.description)
+        async def example_agent(agent_context=""):
+            return True
+
+    event_tasks = []
+    try:
+        for session in sessions:
+            event_tasks.append(asyncio.create_task(session.process_events()))
+            await asyncio.sleep(0.1)
+
+        # two independent branches joined by the last step
+        flow = [
+            {"id": sessions[0].agent_id, "type": "genai", "depends_on": []},
+            {"id": sessions[1].agent_id, "type": "genai", "depends_on": []},
+            {"id": sessions[2].agent_id, "type": "genai", "depends_on": [0, 1]},
+        ]
+
+        await http_client.post(
+            path=AGENTFLOWS_REGISTER_FLOW,
+            json={
+                "name": AGENTFLOW_NAME,
+                "description": AGENTFLOW_DESCRIPTION,
+                "flow": flow,
+            },
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        agentflows = await http_client.get(
+            path=AGENTFLOWS,
+            expected_status_codes=[200],
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+
+        assert len(agentflows) == 1
+
+        [agentflow] = agentflows
+
+        agentflow.pop("created_at")
+        agentflow.pop("updated_at")
+
+        assert agentflow.pop("id")
+
+        assert agentflows == [
+            crud_flow_output_factory(AGENTFLOW_NAME, AGENTFLOW_DESCRIPTION, flow, True)
+        ]
+
+    finally:
+        for task in event_tasks:
+            task.cancel()
+
+            try:
+                await task
+
+            except asyncio.CancelledError:
+                logging.info("Background task has been properly cancelled.")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "bindings",
+    [
+        ({"data": "steps[-1]"}),
+        ({"data": "steps[*].records"}),
+        ({"data": "steps[0:2]"}),
+        ({"data": "steps"}),
+        ({"data": "@"}),
+        ({"data": "steps[1].records"}),
+        ({"data": "steps[0].records["}),
+        ({"data": " "}),
+    ],
+    ids=[
+        "register flow with binding of a negative step index",
+        "register flow with binding projecting all steps",
+        "register flow with binding slicing steps",
+        "register flow with binding of all steps",
+        "register flow with binding of the whole context",
+        "register flow with binding of a step the step does not depend on",
+        "register flow with binding of invalid JMESPath expression",
+        "register flow with empty binding",
+    ],
+)
+async def test_agentflows_register_agentflow_with_invalid_bindings(
+    bindings, user_jwt_token: str
+):
+    json_data = {
+        "name": "Agenflow Name",
+        "description": "Agentflow Description",
+        "flow": [
+            {"id": str(uuid.uuid4()), "type": "genai", "depends_on": []},
+            {"id": str(uuid.uuid4()), "type": "genai", "depends_on": []},
+            {
+                "id": str(uuid.uuid4()),
+                "type": "genai",
+                "depends_on": [0],
+                "bindings": bindings,
+            },
+        ],
+    }
+
+    await http_client.post(
+        path=AGENTFLOWS_REGISTER_FLOW,
+        json=json_data,
+        expected_status_codes=[400, 422],
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+    agentflows = await http_client.get(
+        path=AGENTFLOWS,
+        expected_status_codes=[200],
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+    assert agentflows == []